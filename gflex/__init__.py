@@ -5,3 +5,24 @@ from gflex import *
 from f1d import *
 from f2d import *
 from base import *
+
+# Helper modules (and Sweep) are imported on first use, so that a plain 
+# "import gflex" pays only for the models themselves
+_submodules = ('sweep', 'batch', 'asciicache', 'timeseries', 'banded')
+
+if sys.version_info < (3, 7):
+  # No module-level __getattr__ before Python 3.7: import them now
+  import sweep
+  from sweep import Sweep
+  import batch
+  import asciicache
+  import timeseries
+  import banded
+else:
+  def __getattr__(name):
+    import importlib
+    if name in _submodules:
+      return importlib.import_module(name)
+    elif name == 'Sweep':
+      return importlib.import_module('sweep').Sweep
+    raise AttributeError("module 'gflex' has no attribute '" + name + "'")
@@ -0,0 +1,178 @@
+"""
+This file is part of gFlex.
+gFlex computes lithospheric flexural isostasy with heterogeneous rigidity
+Copyright (C) 2010-2018 Andrew D. Wickert
+
+gFlex is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+gFlex is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with gFlex.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+from __future__ import division, print_function # No automatic floor division
+import sys, os
+import re
+import hashlib
+import numpy as np
+
+# BINARY CACHE OF ASCII GRIDS
+# Parsing a large ASCII grid takes far longer than reading the same numbers
+# from a numpy binary, which can moreover be memory-mapped. The first time
+# an ASCII input is read, its values are therefore saved to a .npy file: 
+# either a hidden "sidecar" next to it, or a file in a cache directory. The
+# name of that file holds the size and modification time of the input (and,
+# in a cache directory, a hash of its full path), so that a changed input
+# is simply not found in the cache, and is parsed and cached again.
+
+def _key(path):
+  """
+  Modification time (ns) and size of a file, as part of a file name
+  """
+  stat = os.stat(path)
+  mtime = getattr(stat, 'st_mtime_ns', None)
+  if mtime is None:
+    mtime = int(stat.st_mtime * 1E9) # Python 2
+  return '%x-%d' % (mtime, stat.st_size)
+
+def _prefix(path, cache_dir=None):
+  """
+  Directory and start of the names of the cache files of "path"
+  """
+  path = os.path.realpath(path)
+  directory, name = os.path.split(path)
+  if cache_dir is None:
+    return directory, '.' + name + '.'
+  digest = hashlib.sha1(path.encode('utf-8')).hexdigest()[:16]
+  return cache_dir, digest + '-' + name + '.'
+
+def cache_file(path, cache_dir=None):
+  """
+  Path of the binary copy of the ASCII grid at "path" in its current state:
+  a hidden file next to it, or (if given) in "cache_dir".
+  """
+  directory, prefix = _prefix(path, cache_dir)
+  return os.path.join(directory, prefix + _key(path) + '.npy')
+
+def _remove_stale(path, cache_dir=None):
+  """
+  Removes the cache files of earlier versions of the file at "path"
+  """
+  directory, prefix = _prefix(path, cache_dir)
+  current = os.path.basename(cache_file(path, cache_dir))
+  pattern = re.compile(re.escape(prefix) + r'[0-9a-f]+-[0-9]+\.npy$')
+  for name in os.listdir(directory):
+    if name != current and pattern.match(name):
+      try:
+        os.remove(os.path.join(directory, name))
+      except OSError:
+        pass
+
+def is_fresh(path, cache_dir=None):
+  """
+  True if the ASCII grid at "path" has a cache file for its current state
+  """
+  return os.path.isfile(cache_file(path, cache_dir))
+
+def load(path, cache_dir=None):
+  """
+  Returns the values of the ASCII grid at "path": memory-mapped (read-only)
+  from its cache file if there is one for the file as it is now; otherwise
+  parsed, and cached for the next time. If the cache cannot be written
+  (e.g., a read-only directory), the parsed array is returned as it is.
+  """
+  cached = cache_file(path, cache_dir)
+  if os.path.isfile(cached):
+    try:
+      return np.load(cached, mmap_mode='r')
+    except Exception:
+      pass # e.g., truncated: parse and write it again
+  out = np.loadtxt(path)
+  # Written under a temporary name and then renamed, so that another 
+  # process never sees a partial file
+  temporary = cached + '.' + str(os.getpid()) + '.tmp'
+  try:
+    if cache_dir is not None and not os.path.isdir(cache_dir):
+      os.makedirs(cache_dir)
+    with open(temporary, 'wb') as f:
+      np.save(f, out)
+    try:
+      os.rename(temporary, cached)
+    except OSError:
+      os.remove(temporary) # Windows: written meanwhile by another process
+    _remove_stale(path, cache_dir)
+  except (IOError, OSError):
+    return out
+  return np.load(cached, mmap_mode='r')
+
+def prewarm(paths, cache_dir=None, Quiet=False):
+  """
+  Caches every ASCII grid in "paths" (files, or directories that are 
+  searched recursively). Hidden files, numpy binaries and files that are 
+  not grids of numbers (e.g., configuration files) are skipped.
+  Returns the number of files that were parsed and the number that were
+  already cached.
+  """
+  if isinstance(paths, str):
+    paths = [paths]
+  files = []
+  for path in paths:
+    if os.path.isdir(path):
+      for directory, subdirectories, names in os.walk(path):
+        subdirectories[:] = sorted(name for name in subdirectories
+                                   if not name.startswith('.'))
+        files += [os.path.join(directory, name) for name in sorted(names)
+                  if not name.startswith('.')]
+    else:
+      files.append(path)
+  if cache_dir is not None:
+    # Not its own contents
+    cache_dir_real = os.path.realpath(cache_dir) + os.sep
+    files = [path for path in files 
+             if not os.path.realpath(path).startswith(cache_dir_real)]
+  parsed = 0
+  fresh = 0
+  for path in files:
+    with open(path, 'rb') as f:
+      if f.read(6) == b'\x93NUMPY':
+        continue
+    if is_fresh(path, cache_dir):
+      fresh += 1
+      continue
+    try:
+      load(path, cache_dir)
+    except Exception:
+      continue # Not a grid of numbers
+    parsed += 1
+    if not Quiet:
+      print("Cached", path)
+  return parsed, fresh
+
+def main(argv=None):
+  """
+  Command line: gflex cache <file or directory> ... [-d <cache directory>]
+  """
+  import argparse
+  parser = argparse.ArgumentParser(prog='gflex cache',
+             description='Saves binary copies of the ASCII grids (loads, '+\
+                         'elastic thickness, point coordinates) in the given '+\
+                         'files and directories, so that runs with '+\
+                         'ascii_cache set memory-map them instead of parsing '+\
+                         'them.')
+  parser.add_argument('paths', nargs='+', help='files, or directories to search')
+  parser.add_argument('-d', '--cache-dir', default=None,
+                      help='cache directory, as ascii_cache in the configuration '+\
+                           'file (default: hidden files next to the inputs)')
+  parser.add_argument('-q', '--quiet', action='store_true',
+                      help='do not list the files that are cached')
+  args = parser.parse_args(argv)
+  parsed, fresh = prewarm(args.paths, args.cache_dir, Quiet=args.quiet)
+  print(parsed, "files cached;", fresh, "already cached")
@@ -0,0 +1,210 @@
+"""
+This file is part of gFlex.
+gFlex computes lithospheric flexural isostasy with heterogeneous rigidity
+Copyright (C) 2010-2018 Andrew D. Wickert
+
+gFlex is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+gFlex is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with gFlex.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+from __future__ import division, print_function # No automatic floor division
+import numpy as np
+
+# BANDED DIRECT SOLUTIONS FOR 1D FINITE DIFFERENCES
+# The 1D coefficient matrix is pentadiagonal, apart from (with periodic 
+# b.c.'s) a few entries in its corners that wrap around the ends. Its LU 
+# factorization as a band matrix (LAPACK gbtrf) and each solution with it 
+# (gbtrs) take time and memory in proportion to the number of nodes, with
+# none of the overhead of a general sparse factorization.
+
+class PentadiagonalLU(object):
+  """
+  LU factorization of a (cyclic) pentadiagonal matrix, given as a scipy 
+  sparse matrix, with the same solve(b) as scipy.sparse.linalg.splu.
+
+  The band (offsets -2 to 2) is factorized with partial pivoting. Entries
+  outside it (the corners of a periodic system) are A - B = U W: U holds
+  the columns of the identity for the k rows in which they are, and W 
+  (k x n) those rows of A - B. By the Woodbury identity,
+
+    A^-1 b = B^-1 (b - U c), where c = (I + W B^-1 U)^-1 W B^-1 b
+
+  so each solution takes two band solutions and a k x k solve (k = 4 for
+  periodic b.c.'s); the k x k "capacitance" matrix is factorized once.
+  Raises ValueError if the band is singular or there are more than 
+  "max_corners" rows with entries outside it.
+  """
+  kl = 2
+  ku = 2
+
+  def __init__(self, matrix, max_corners=8):
+    from scipy.linalg.lapack import dgbtrf
+    from scipy import sparse
+    A = sparse.csr_matrix(matrix)
+    if not A.has_canonical_format:
+      A = A.copy()
+      A.sum_duplicates()
+    n = A.shape[0]
+    rows = np.repeat(np.arange(n, dtype=A.indices.dtype), np.diff(A.indptr))
+    offsets = A.indices - rows
+    # LAPACK band storage: A[i,j] is ab[kl+ku+i-j, j]; the top kl rows are
+    # workspace for the fill-in of pivoting
+    ab = np.zeros((2*self.kl + self.ku + 1, n), order='F') # factorized in place
+    inside = (offsets >= -self.kl) & (offsets <= self.ku)
+    ab[self.kl + self.ku - offsets[inside], A.indices[inside]] = A.data[inside]
+    outside = ~inside & (A.data != 0)
+    rows, cols, values = rows[outside], A.indices[outside], A.data[outside]
+    del offsets, inside, outside
+    corner_rows = np.unique(rows)
+    if len(corner_rows) > max_corners:
+      raise ValueError("Too many entries outside of the band")
+    # Row sums of the band, B * 1 (see band_solve)
+    self.band_row_sums = A.dot(np.ones(n))
+    np.subtract.at(self.band_row_sums, rows, values)
+    self.band_row_sums_max = np.abs(self.band_row_sums).max()
+    self.n = n
+    self.lu, self.ipiv, info = dgbtrf(ab, self.kl, self.ku, overwrite_ab=1)
+    if info != 0:
+      raise ValueError("Singular band matrix")
+    self.corners = None
+    if len(corner_rows):
+      self.corners = corner_rows
+      self.W = sparse.csr_matrix((values, (np.searchsorted(corner_rows, rows), cols)),
+                                 shape=(len(corner_rows), n))
+      k = len(corner_rows)
+      U = np.zeros((n, k))
+      U[corner_rows, np.arange(k)] = 1.
+      capacitance = np.eye(k) + self.W.dot(self.band_solve(U))
+      if np.linalg.cond(capacitance) > 1E12:
+        raise ValueError("Singular capacitance matrix")
+      self.capacitance = np.linalg.inv(capacitance)
+
+  def band_solve(self, b):
+    """
+    Solution with the band B alone; b is (n,) or (n, nrhs)
+
+    Solutions for local loads decay exponentially away from them, down into
+    subnormal numbers, on which arithmetic is many times slower; and as 
+    these round to the same value rather than to zero, they can fill most 
+    of a long profile. So the solution is found shifted by a constant, 
+    "shift", far too small to change any value that matters (the solution 
+    of B x' = b + shift * B * 1 is x' = x + shift), but large enough to keep 
+    every value away from the subnormal range, and the shift is then taken
+    back out.
+    """
+    from scipy.linalg.lapack import dgbtrs
+    b2 = np.array(b, dtype=float, order='F').reshape(self.n, -1, order='F')
+    scale = np.abs(b2).max(axis=0)
+    shift = 1E-100 * scale / self.band_row_sums_max
+    b2 += self.band_row_sums[:,None] * shift
+    x, info = dgbtrs(self.lu, self.kl, self.ku, b2, self.ipiv, overwrite_b=1)
+    if info != 0:
+      raise ValueError("Band solution failed")
+    x -= shift
+    return x.reshape(np.shape(b), order='F')
+
+  def solve(self, b):
+    """
+    x = solve(b): solution of A x = b; b is (n,) or (n, nrhs)
+    """
+    y = self.band_solve(b)
+    if self.corners is None:
+      return y
+    c = self.capacitance.dot(self.W.dot(y))
+    b = np.array(b, dtype=float)
+    b[self.corners] -= c
+    return self.band_solve(b)
+
+class PentadiagonalBatchLU(PentadiagonalLU):
+  """
+  LU factorizations of many independent (cyclic) pentadiagonal systems of
+  the same size, for solving them together. The coefficients of row i of 
+  system p are given as (n, m) arrays, node first:
+
+    l2[i,p] x[i-2] + l1[i,p] x[i-1] + c0[i,p] x[i] + r1[i,p] x[i+1] 
+    + r2[i,p] x[i+2]
+
+  in which entries that fall outside of a system are ignored, or, if 
+  "periodic", wrap around its ends. The systems are placed one after 
+  another along the band of a single matrix, with no coupling between them,
+  so that one LAPACK call factorizes them all (with partial pivoting) and 
+  one more solves them all. For periodic systems, the corners of each are 
+  handled as in PentadiagonalLU, with a 4 x 4 capacitance matrix per system;
+  as the systems are independent, the band solutions that these need are 
+  found for all of them at once.
+
+  solve(b) takes b as (m*n,) or (m*n, nrhs), system by system: b[p*n + i].
+  """
+
+  def __init__(self, l2, l1, c0, r1, r2, periodic=False):
+    from scipy.linalg.lapack import dgbtrf
+    n, m = c0.shape
+    if periodic and n < 5:
+      raise ValueError("Periodic systems need at least 5 nodes")
+    N = n*m
+    node = np.arange(n)
+    ab = np.zeros((2*self.kl + self.ku + 1, N), order='F') # factorized in place
+    self.band_row_sums = np.zeros(N)
+    for offset, coefficients in zip([-2, -1, 0, 1, 2], [l2, l1, c0, r1, r2]):
+      # Row p*n+i, column p*n+i+offset, if that is in system p
+      inside = (node + offset >= 0) & (node + offset < n)
+      values = np.where(inside[:,None], coefficients, 0.).T.ravel()
+      if offset >= 0:
+        ab[self.kl + self.ku - offset, offset:] = values[:N-offset]
+      else:
+        ab[self.kl + self.ku - offset, :N+offset] = values[-offset:]
+      self.band_row_sums += values
+    self.band_row_sums_max = np.abs(self.band_row_sums).max()
+    self.n = N
+    self.nodes = n
+    self.lu, self.ipiv, info = dgbtrf(ab, self.kl, self.ku, overwrite_ab=1)
+    if info != 0:
+      raise ValueError("Singular band matrix")
+    self.corners = None
+    if periodic:
+      # Rows (and columns) with wrap-around entries, and those entries, W,
+      # for each system: (m, 4 rows, 4 columns)
+      self.corners = np.array([0, 1, n-2, n-1])
+      self.W = np.zeros((m, 4, 4))
+      self.W[:,0,2] = l2[0]
+      self.W[:,0,3] = l1[0]
+      self.W[:,1,3] = l2[1]
+      self.W[:,2,0] = r2[-2]
+      self.W[:,3,0] = r1[-1]
+      self.W[:,3,1] = r2[-1]
+      # B^-1 U, at the corners, for all systems at once
+      U = np.zeros((m, n, 4))
+      U[:, self.corners, np.arange(4)] = 1.
+      Z = self.band_solve(U.reshape(N, 4)).reshape(m, n, 4)[:, self.corners]
+      capacitance = np.eye(4) + np.matmul(self.W, Z)
+      if np.linalg.cond(capacitance).max() > 1E12:
+        raise ValueError("Singular capacitance matrix")
+      self.capacitance = np.linalg.inv(capacitance)
+
+  def solve(self, b):
+    """
+    x = solve(b): solutions of all of the systems; b is (m*n,) or
+    (m*n, nrhs), system by system
+    """
+    y = self.band_solve(b)
+    if self.corners is None:
+      return y
+    m = self.n // self.nodes
+    shape = (m, self.nodes) + np.shape(b)[1:]
+    yc = y.reshape(shape)[:, self.corners]
+    # c = C^-1 W y, for each system and right-hand side
+    c = np.einsum('pij,pjk,pk...->pi...', self.capacitance, self.W, yc)
+    b = np.array(b, dtype=float).reshape(shape)
+    b[:, self.corners] -= c
+    return self.band_solve(b.reshape(np.shape(y)))
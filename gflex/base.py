@@ -23,7 +23,7 @@ from six.moves import configparser
 import numpy as np
 import time # For efficiency counting
 import types # For flow control
-from matplotlib import pyplot as plt
+import glob
 from _version import __version__
 
 class Utility(object):
@@ -87,6 +87,23 @@ class Utility(object):
           print(specialReturnMessage)
         sys.exit("Exiting.")
 
+  def configDefault(self, vartype, category, name, default):
+    """
+    Defines self.<name> for an optional parameter that has a default value.
+    A value that is already set (e.g., by a setter) is kept; otherwise it is
+    read from the configuration file if it is there, and falls back to
+    "default" if it is not (or if it is left blank).
+    """
+    var = getattr(self, name, None)
+    if var is None and self.filename:
+      if self.config.has_option(category, name) \
+         and self.config.get(category, name) != '':
+        var = self.configGet(vartype, category, name)
+    if var is None:
+      var = default
+    setattr(self, name, var)
+    return var
+
   def readyCoeff(self):
     from scipy import sparse
     if sparse.issparse(self.coeff_matrix):
@@ -101,35 +118,20 @@ class Utility(object):
     """
     Returns the great circle distance between two points.
     Useful when using the SAS_NG solution in lat/lon coordinates
-    Modified from http://www.johndcook.com/blog/python_longitude_latitude/
     It should be able to take numpy arrays.
     """
 
-    # Convert latitude and longitude to
-    # spherical coordinates in radians.
-    degrees_to_radians = np.pi/180.0
-         
-    # theta = colatitude = 90 - latitude
-    theta1rad = (90.0 - lat1)*degrees_to_radians
-    theta2rad = (90.0 - lat2)*degrees_to_radians
-         
-    # lambda = longitude
-    lambda1rad = long1*degrees_to_radians
-    lambda2rad = long2*degrees_to_radians
-         
-    # Compute spherical distance from spherical coordinates.
-         
-    # For two locations in spherical coordinates
-    # (1, theta, phi) and (1, theta, phi)
-    # cosine( arc length ) =
-    #    sin(theta) * sin(theta') * cos(theta-theta') + cos(phi) * cos(phi')
-    # distance = radius * arc length
-     
-    cos_arc_length = np.sin(theta1rad) * np.sin(theta2rad) * \
-                     np.cos(lambda1rad - lambda2rad) + \
-                     np.cos(theta1rad) * np.cos(theta2rad)
-    arc = np.arccos( cos_arc_length )
- 
+    # Haversine formula: unlike the arccos of the spherical law of cosines,
+    # this keeps its precision at short distances (and is 0, rather than
+    # NaN, for coincident points)
+    lat1rad = np.radians(lat1)
+    lat2rad = np.radians(lat2)
+    half_dlat = (lat2rad - lat1rad)/2.
+    half_dlong = np.radians(long2 - long1)/2.
+    haversine = np.sin(half_dlat)**2 + \
+                np.cos(lat1rad) * np.cos(lat2rad) * np.sin(half_dlong)**2
+    arc = 2 * np.arcsin( np.sqrt( np.minimum(haversine, 1.) ) )
+
     great_circle_distance = radius * arc
     
     return great_circle_distance
@@ -190,40 +192,99 @@ class Utility(object):
     with the loaded file.
     var is a string on input
     output is a numpy array or a None-type object (success vs. failure)
+
+    The path is used as it is (absolute, or relative to the current working
+    directory) if there is a file there, and otherwise relative to the 
+    configuration file. A numpy binary (.npy) file is memory-mapped 
+    read-only: it is read from disk as it is used, rather than copied into
+    memory. Anything else is read as an ASCII grid; with "ascii_cache" set
+    (to "sidecar", or to a cache directory), its values are kept in a 
+    binary copy that is memory-mapped in later runs (see asciicache.py).
     """
-    out = None
+    path = None
+    for candidate in [var, os.path.join(getattr(self, 'inpath', None) or '', var)]:
+      if os.path.isfile(candidate):
+        path = candidate
+        break
+    if path is None:
+      if close_on_fail:
+        print("Cannot find "+var+" file")
+        print(""+var+" path = " + var)
+        print("Looked relative to model python files.")
+        print("Also looked relative to configuration file path,")
+        print("  ", getattr(self, 'inpath', None))
+        print("Exiting.")
+        sys.exit()
+      return None
+    # numpy binaries start with this "magic string", whatever their extension
+    with open(path, 'rb') as f:
+      binary = f.read(6) == b'\x93NUMPY'
     try:
-      # First see if it is a full path or directly links from the current
-      # working directory
-      out = np.load(var)
-      if self.Verbose: print("Loading "+var+" from numpy binary")
-    except:
-      try:
-        out = np.loadtxt(var)
+      if binary:
+        out = np.load(path, mmap_mode='r')
+        if self.Verbose: print("Loading "+var+" from numpy binary (memory-mapped)")
+      elif self.configDefault("string", "input", "ascii_cache", ''):
+        import asciicache
+        cache_dir = None
+        if self.ascii_cache != 'sidecar':
+          cache_dir = os.path.join(getattr(self, 'inpath', None) or '', self.ascii_cache)
+        if self.Verbose and asciicache.is_fresh(path, cache_dir):
+          print("Loading "+var+" from binary cache (memory-mapped)")
+        elif self.Verbose:
+          print("Loading "+var+" ASCII and caching it")
+        out = asciicache.load(path, cache_dir)
+      else:
+        out = np.loadtxt(path)
         if self.Verbose: print("Loading "+var+" ASCII")
-      except:
-        # Then see if it is relative to the location of the configuration file
-        try:
-          out = load(self.inpath + var)
-          if self.Verbose: print("Loading "+var+" from numpy binary")
-        except:
-          try:
-            out = np.loadtxt(self.inpath + var)
-            if self.Verbose: print("Loading "+var+" ASCII")
-          # If failure
-          except:
-            if close_on_fail:
-              print("Cannot find "+var+" file")
-              print(""+var+" path = " + var)
-              print("Looked relative to model python files.")
-              print("Also looked relative to configuration file path,")
-              print("  ", self.inpath)
-              print("Exiting.")
-              sys.exit()
-            else:
-              pass
+    except Exception as e:
+      if close_on_fail:
+        sys.exit("Cannot read "+path+": "+str(e))
+      return None
     return out
 
+  def memmapNpz(self, path):
+    """
+    Returns a dictionary of the arrays in an uncompressed .npz file (as 
+    written by numpy.savez), each memory-mapped (copy-on-write) from the 
+    file rather than read into memory. numpy.load cannot memory-map the 
+    members of an archive, but as these are stored uncompressed, each is a
+    plain .npy file at some offset within it.
+    """
+    import zipfile, struct
+    arrays = {}
+    zf = zipfile.ZipFile(path)
+    try:
+      members = zf.infolist()
+    finally:
+      zf.close()
+    f = open(path, 'rb')
+    try:
+      for info in members:
+        name = info.filename
+        if name[-4:] == '.npy':
+          name = name[:-4]
+        if info.compress_type != zipfile.ZIP_STORED:
+          arrays[name] = np.load(path)[name]
+          continue
+        # Skip the local file header, which has its own name and extra field
+        f.seek(info.header_offset)
+        header = f.read(30)
+        name_length, extra_length = struct.unpack('<HH', header[26:30])
+        f.seek(info.header_offset + 30 + name_length + extra_length)
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+          shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+          shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        if np.prod(shape) == 0:
+          arrays[name] = np.zeros(shape, dtype=dtype)
+        else:
+          arrays[name] = np.memmap(path, dtype=dtype, mode='c', offset=f.tell(),
+                                   shape=shape, order='F' if fortran_order else 'C')
+    finally:
+      f.close()
+    return arrays
+
 class Plotting(object):
   # Plot, if desired
   # 1D all here, 2D in functions
@@ -237,8 +298,13 @@ class Plotting(object):
     #  self.plotChoice
     #except:
     #  self.plotChoice = None
-    _aspect_ratio = self.qs.shape[0]/float(self.qs.shape[1]) # height/width
     if self.plotChoice:
+      # Only loaded here: most runs do not plot
+      from matplotlib import pyplot as plt
+      if self.dimension == 2 and self.Method != 'SAS_NG':
+        _aspect_ratio = self.qs.shape[0]/float(self.qs.shape[1]) # height/width
+      else:
+        _aspect_ratio = 1.
       if self.Verbose: print("Starting to plot " + self.plotChoice)
       if self.dimension == 1:
         if self.plotChoice == 'q':
@@ -284,7 +350,7 @@ class Plotting(object):
           plt.tight_layout()
           plt.show()
         elif self.plotChoice == 'combo':
-          plt.figure(1, figsize=(4, 4*_aspect_ratio))
+          fig = plt.figure(1, figsize=(4, 4*_aspect_ratio))
           titletext='Loads and Lithospheric Deflections'
           ax = fig.add_subplot(1,1,1)
           # Plot undeflected load
@@ -314,7 +380,7 @@ class Plotting(object):
           try:
             self.Te
             if self.Method == "FD":
-              if type(self.Te) is np.ndarray:
+              if isinstance(self.Te, np.ndarray):
                 if (self.Te != (self.Te).mean()).any():
                   plt.title(titletext,fontsize=16)       
                 else:
@@ -381,6 +447,7 @@ class Plotting(object):
     """
     Plot if you want to - for troubleshooting - 1 figure
     """
+    from matplotlib import pyplot as plt
     if self.latlon:
       plt.imshow(z, extent=(0, self.dx*z.shape[1], self.dy*z.shape[0], 0)) #,interpolation='nearest'
       plt.xlabel('longitude [deg E]', fontsize=12, fontweight='bold')
@@ -397,6 +464,7 @@ class Plotting(object):
     """
     Plot multiple subplot figure for 2D array
     """
+    from matplotlib import pyplot as plt
     # Could more elegantly just call surfplot twice
     # And also could include xyzinterp as an option inside surfplot.
     # Noted here in case anyone wants to take that on in the future...
@@ -429,6 +497,7 @@ class Plotting(object):
     """
     Interpolates and plots ungridded model outputs from SAS_NG solution
     """
+    from matplotlib import pyplot as plt
     # Help from http://wiki.scipy.org/Cookbook/Matplotlib/Gridding_irregularly_spaced_data
     
     if self.Verbose:
@@ -569,6 +638,22 @@ class Flexure(Utility, Plotting):
     except:
       self.PlanetaryRadius = None
 
+    # Finite difference coefficient matrix bookkeeping: the hash of the
+    # inputs that the matrix was built from, and its cached LU factorization
+    # (or preconditioner, for iterative solutions), so that repeated calls to
+    # run() need only back-substitute
+    self.coeff_matrix_key = None
+    self.coeff_matrix_built = None
+    self.coeff_factor = None
+    self.coeff_factor_of = None
+    self.coeff_precond = None
+    self.coeff_precond_of = None
+    self.coeff_precond_type = None
+    self.coeff_multigrid = None
+    self.coeff_multigrid_of = None
+    # Whether the last iterative (or multigrid) solution met its tolerance
+    self.iterative_converged = True
+
   def initialize(self, filename=None):
     # Values from configuration file
 
@@ -685,6 +770,10 @@ class Flexure(Utility, Plotting):
       self.E  = self.configGet("float", "parameter", "YoungsModulus")
       self.nu = self.configGet("float", "parameter", "PoissonsRatio")
     
+    # Time series of loads, in place of a single load grid (see run_series)
+    self.configDefault("string", "timeseries", "LoadHistory", None)
+    self.configDefault("string", "timeseries", "DeflectionHistoryOut", None)
+
     # Stop program if there is no q0 defined or if it is None-type
     try:
       self.q0
@@ -699,18 +788,20 @@ class Flexure(Utility, Plotting):
         try:
           self.qs
         except:
-          sys.exit("Must define q0, q, or qs by this stage in the initialization step\n"+\
-                   "from either configuration file (string) or direct array import")
+          if self.LoadHistory is None:
+            sys.exit("Must define q0, q, or qs by this stage in the initialization step\n"+\
+                     "from either configuration file (string) or direct array import")
 
     # Ignore this if no q0 set
     try:
       self.q0
     except:
       self.q0 = None
-    if self.q0 == '':
-      self.q0 = None
-    if type(self.q0) == str:
-      self.q0 = self.loadFile(self.q0) # Won't do this if q0 is None
+    if isinstance(self.q0, str):
+      if self.q0 == '':
+        self.q0 = None
+      else:
+        self.q0 = self.loadFile(self.q0) # Won't do this if q0 is None
           
     # Check consistency of dimensions
     if self.q0 is not None:
@@ -730,7 +821,8 @@ class Flexure(Utility, Plotting):
     # Ensure that Te is of floating-point type to avoid integer math
     # and floor division
     try:
-      self.Te = self.Te.astype(float) # array
+      # Not copied if already floating point (e.g., a memory-mapped grid)
+      self.Te = self.Te.astype(float, copy=False) # array
     except:
       # Integer scalar Te does not seem to be a problem, but taking this step
       # anyway for consistency
@@ -750,6 +842,17 @@ class Flexure(Utility, Plotting):
       del self.coeff_matrix
     except:
       pass
+    self.coeff_matrix_key = None
+    self.coeff_matrix_built = None
+    self.coeff_factor = None
+    self.coeff_factor_of = None
+    self.coeff_precond = None
+    self.coeff_precond_of = None
+    self.coeff_precond_type = None
+    self.coeff_multigrid = None
+    self.coeff_multigrid_of = None
+    self.sas_kernel = None
+    self.sas_kernel_of = None
     if self.Quiet==False:
       print("")
 
@@ -843,6 +946,30 @@ class Flexure(Utility, Plotting):
                        +"Exiting.")
           else:
             sys.exit("For a flexural solution, grid must be 1D or 2D. Exiting.")
+    elif self.Method == 'FFT':
+      # Spectral solution boundary conditions: periodic in both directions
+      # of an axis, or NoOutsideLoads (the default if left blank)
+      pairs = [['BC_W', 'BC_E']]
+      if self.dimension == 2:
+        pairs += [['BC_S', 'BC_N']]
+      for pair in pairs:
+        for bc in pair:
+          try:
+            getattr(self, bc)
+          except:
+            setattr(self, bc, '')
+          if getattr(self, bc) == '':
+            setattr(self, bc, 'NoOutsideLoads')
+        bcs = [getattr(self, bc) for bc in pair]
+        if (bcs[0] == 'Periodic') != (bcs[1] == 'Periodic'):
+          sys.exit("Periodic boundary conditions must be applied on both sides\n"+\
+                   "of the domain. Exiting.")
+        for bc in bcs:
+          if bc != 'Periodic' and bc != 'NoOutsideLoads':
+            sys.exit("'"+bc+"' is not an acceptable FFT boundary condition.\n"\
+                     +"Acceptable boundary conditions are:\n"\
+                     +"['Periodic' 'NoOutsideLoads']\n"\
+                     +"Exiting.")
     else:
       # Analytical solution boundary conditions
       # If they aren't set, it is because no input file has been used
@@ -916,14 +1043,671 @@ class Flexure(Utility, Plotting):
     # Only if they are both defined and are arrays
     # Both being arrays is a possible bug in this check routine that I have 
     # intentionally introduced
-    if type(self.Te) == np.ndarray and type(self.qs) == np.ndarray:
+    if isinstance(self.Te, np.ndarray) and isinstance(self.qs, np.ndarray):
       # Doesn't touch non-arrays or 1D arrays
-      if type(self.Te) is np.ndarray:
+      if isinstance(self.Te, np.ndarray):
         if (np.array(self.Te.shape) != np.array(self.qs.shape)).any():
           sys.exit("q0 and Te arrays have incompatible shapes. Exiting.")
       else:
         if self.Debug: print("Te and qs array sizes pass consistency check")
 
+  # Coefficient matrices, their factorizations, and SAS kernels, shared by
+  # every model object in this process: None (default) for none, or a 
+  # dict in which share_operators() keeps up to shared_operators_size of the
+  # most recently used, keyed by the inputs that they are found from
+  shared_operators = None
+  shared_operators_size = 8
+
+  @classmethod
+  def share_operators(cls, size=8):
+    """
+    Keeps up to "size" coefficient matrices (with their factorizations) and
+    SAS kernels in memory for all model objects in this process, so that 
+    runs on the same plate, e.g., of many configuration files, build each 
+    only once. size=0 stops sharing.
+    """
+    if size:
+      if Flexure.shared_operators is None:
+        Flexure.shared_operators = {}
+      Flexure.shared_operators_size = size
+    else:
+      Flexure.shared_operators = None
+
+  def shared_get(self, key):
+    """
+    The shared item for "key", or None
+    """
+    shared = Flexure.shared_operators
+    if shared is None or key not in shared:
+      return None
+    # Marks it as the most recently used
+    value = shared.pop(key)[1]
+    shared[key] = (time.time(), value)
+    return value
+
+  def shared_put(self, key, value):
+    """
+    Shares an item, evicting the least recently used beyond the limit
+    """
+    shared = Flexure.shared_operators
+    if shared is None:
+      return
+    shared[key] = (time.time(), value)
+    while len(shared) > Flexure.shared_operators_size:
+      del shared[min(shared, key=lambda k: shared[k][0])]
+
+  # Version of the finite difference coefficient matrices, in the key of
+  # each: raised whenever their assembly changes, so that matrices built by
+  # older code (e.g., in an on-disk cache) are not reused
+  fd_operator_version = 2
+
+  def fd_operator_key(self):
+    """
+    Returns a hash of everything that goes into the finite difference
+    coefficient matrix: elastic thickness, grid spacing, elastic properties,
+    density contrast, gravity, boundary conditions, plate solution type, 
+    and the assembly method and its version. If this changes between runs,
+    the coefficient matrix must be rebuilt.
+    """
+    import hashlib
+    h = hashlib.sha1()
+    Te = np.ascontiguousarray(self.Te, dtype=float)
+    for item in [self.fd_operator_version, getattr(self, 'Assembly', None),
+                 self.dimension, self.qs.shape, Te.shape,
+                 self.dx, getattr(self, 'dy', None),
+                 self.E, self.nu, self.drho, self.g,
+                 self.BC_W, self.BC_E,
+                 getattr(self, 'BC_N', None), getattr(self, 'BC_S', None),
+                 getattr(self, 'PlateSolutionType', None)]:
+      h.update(repr(item).encode('utf-8'))
+    h.update(Te.tobytes())
+    return h.hexdigest()
+
+  def coeff_matrix_record(self):
+    """
+    Remembers which inputs the just-built coefficient matrix belongs to
+    (and shares it, if shared_operators is on)
+    """
+    from scipy import sparse
+    self.coeff_matrix_key = self.fd_operator_key()
+    self.coeff_matrix_built = self.coeff_matrix
+    if sparse.issparse(self.coeff_matrix):
+      self.shared_put(('coeff_matrix', self.coeff_matrix_key), self.coeff_matrix)
+
+  def coeff_matrix_check(self):
+    """
+    Discards a coefficient matrix that was built here for a plate whose
+    properties have since changed (e.g., by a setter between calls to run()).
+    A coefficient matrix that was supplied from outside is always kept.
+    """
+    if self.coeff_matrix is not None \
+       and self.coeff_matrix is self.coeff_matrix_built \
+       and self.Te is not None:
+      if self.coeff_matrix_key != self.fd_operator_key():
+        if self.Verbose:
+          print("Plate properties changed: rebuilding coefficient matrix")
+        self.coeff_matrix = None
+
+  def coeff_matrix_cache_path(self):
+    """
+    Returns the path to the file in the on-disk coefficient matrix cache 
+    for the current plate (named by fd_operator_key), or None if there is
+    no cache ("CoeffMatrixCache" is the directory for it).
+    """
+    self.configDefault("string", "numerical", "CoeffMatrixCache", None)
+    if not self.CoeffMatrixCache:
+      return None
+    return os.path.join(self.CoeffMatrixCache, 'gflex-'+self.fd_operator_key()+'.npz')
+
+  def coeff_matrix_load(self):
+    """
+    Loads the coefficient matrix for the current plate from the shared
+    matrices in memory (see share_operators) or the on-disk cache, if it is
+    in either, and returns True if it was. Arrays from the disk are 
+    memory-mapped, so processes that share a cached matrix share its pages.
+    """
+    from scipy import sparse
+    shared = self.shared_get(('coeff_matrix', self.fd_operator_key()))
+    if shared is not None:
+      self.coeff_matrix = shared
+      return True
+    path = self.coeff_matrix_cache_path()
+    if path is None or not os.path.isfile(path):
+      return False
+    try:
+      arrays = self.memmapNpz(path)
+      self.coeff_matrix = sparse.csr_matrix((arrays['data'], arrays['indices'],
+                                             arrays['indptr']),
+                                            shape=tuple(arrays['shape']), copy=False)
+      # Marks it as recently used, for eviction
+      os.utime(path, None)
+    except Exception as e:
+      # A damaged or vanished file is rebuilt (and replaced)
+      if self.Quiet == False:
+        print("Could not load cached coefficient matrix", path+":", e)
+      self.coeff_matrix = None
+      return False
+    if self.Verbose:
+      print("Loaded coefficient matrix from cache:", path)
+    return True
+
+  def coeff_matrix_save(self):
+    """
+    Saves the coefficient matrix to the on-disk cache, if there is one, as
+    its CSR arrays in an uncompressed .npz file. Then, if the cache is
+    larger than "CoeffMatrixCacheSize" (in MB; default 1024), evicts the
+    least recently used matrices.
+    """
+    from scipy import sparse
+    import glob, tempfile
+    path = self.coeff_matrix_cache_path()
+    if path is None or not sparse.issparse(self.coeff_matrix):
+      return
+    self.configDefault("float", "numerical", "CoeffMatrixCacheSize", 1024.)
+    A = sparse.csr_matrix(self.coeff_matrix)
+    try:
+      os.makedirs(self.CoeffMatrixCache)
+    except OSError:
+      if not os.path.isdir(self.CoeffMatrixCache):
+        raise
+    # Written to a temporary file and then moved into place, so that other
+    # processes never see a partial file
+    fd, tmp = tempfile.mkstemp(suffix='.npz.tmp', dir=self.CoeffMatrixCache)
+    try:
+      f = os.fdopen(fd, 'wb')
+      try:
+        np.savez(f, data=A.data, indices=A.indices, indptr=A.indptr,
+                 shape=np.array(A.shape))
+      finally:
+        f.close()
+      try:
+        os.replace(tmp, path)
+      except AttributeError:
+        # Python 2
+        os.rename(tmp, path)
+    except Exception:
+      os.remove(tmp)
+      raise
+    if self.Verbose:
+      print("Saved coefficient matrix to cache:", path)
+    # Least recently used first
+    files = []
+    for name in glob.glob(os.path.join(self.CoeffMatrixCache, 'gflex-*.npz')):
+      try:
+        st = os.stat(name)
+      except OSError:
+        continue
+      files.append((st.st_mtime, st.st_size, name))
+    files.sort()
+    total = sum(size for mtime, size, name in files)
+    for mtime, size, name in files:
+      if total <= self.CoeffMatrixCacheSize * 2**20:
+        break
+      if name == path:
+        continue
+      try:
+        os.remove(name)
+        if self.Verbose:
+          print("Evicted coefficient matrix from cache:", name)
+      except OSError:
+        # Another process got there first
+        pass
+      total -= size
+
+  def coeff_matrix_factorization(self):
+    """
+    Returns the sparse LU factorization (scipy.sparse.linalg.splu) of the
+    coefficient matrix. It is computed once and reused for every subsequent
+    solve against the same matrix, so that repeated runs with new loads cost
+    only a forward and a back substitution.
+    """
+    if self.coeff_factor is None or self.coeff_factor_of is not self.coeff_matrix:
+      # A shared factorization is for the shared matrix of the same plate
+      key = ('factorization', self.coeff_matrix_key)
+      built = self.coeff_matrix is self.coeff_matrix_built
+      self.coeff_factor = None
+      if built:
+        self.coeff_factor = self.shared_get(key)
+      if self.coeff_factor is None:
+        if self.Debug:
+          print("Factorizing coefficient matrix")
+        self.coeff_factor = self.fd_factorize()
+        if built:
+          self.shared_put(key, self.coeff_factor)
+      self.coeff_factor_of = self.coeff_matrix
+    return self.coeff_factor
+
+  def fd_factorize(self):
+    """
+    Direct factorization of the coefficient matrix, for 
+    coeff_matrix_factorization: general sparse LU (scipy.sparse.linalg.splu)
+    """
+    from scipy.sparse.linalg import splu
+    return splu(self.coeff_matrix.tocsc())
+
+  def fd_preconditioner(self):
+    """
+    Returns the preconditioner for iterative solutions, as a
+    scipy.sparse.linalg.LinearOperator that approximates the inverse of the
+    coefficient matrix (or None). Like the LU factorization, it is built once
+    per coefficient matrix and reused. Options ("Preconditioner"):
+
+    * ilu: incomplete LU factorization (scipy.sparse.linalg.spilu)
+    * block-jacobi: exact solution within each of "PreconditionerBlocks"
+      (default 4) strips of rows of cells, ignoring the coupling between
+      strips; blocks must be large relative to the flexural wavelength to
+      be of much help
+    * spectral: FFT solution for a plate of the mean rigidity, using the
+      wavenumber response of the finite difference stencil
+    * multigrid: one multigrid V-cycle (2D only; see multigrid.py)
+    * none
+
+    A matrix-free operator (Assembly = 'matrixfree') can only be used with
+    multigrid (its default), spectral, or none.
+    """
+    from scipy import sparse
+    from scipy.sparse.linalg import LinearOperator
+    A = self.coeff_matrix
+    if sparse.issparse(A):
+      self.configDefault("string", "numerical", "Preconditioner", 'ilu')
+    else:
+      self.configDefault("string", "numerical", "Preconditioner", 'multigrid')
+      if self.Preconditioner in ['ilu', 'block-jacobi']:
+        sys.exit("The '"+self.Preconditioner+"' preconditioner needs the coefficient\n"+\
+                 "matrix: choose multigrid, spectral, or none for a matrix-free\n"+\
+                 "operator. Exiting.")
+    if self.coeff_precond is not None \
+       and self.coeff_precond_of is self.coeff_matrix \
+       and self.coeff_precond_type == self.Preconditioner:
+      return self.coeff_precond
+    n = A.shape[0]
+    if self.Preconditioner == 'none':
+      M = None
+    elif self.Preconditioner == 'ilu':
+      from scipy.sparse.linalg import spilu
+      ilu = spilu(A.tocsc(), drop_tol=1E-5, fill_factor=20)
+      M = LinearOperator((n, n), ilu.solve)
+    elif self.Preconditioner == 'block-jacobi':
+      from scipy.sparse import csc_matrix
+      from scipy.sparse.linalg import splu
+      self.configDefault("integer", "numerical", "PreconditionerBlocks", 4)
+      A = A.tocoo()
+      # Number of unknowns per block: whole rows of cells in 2D
+      rows = self.qs.shape[0]
+      nblock = -(-rows // self.PreconditionerBlocks) * (n // rows)
+      inblock = A.row // nblock == A.col // nblock
+      blocks = splu(csc_matrix((A.data[inblock], (A.row[inblock], A.col[inblock])), shape=A.shape))
+      M = LinearOperator((n, n), blocks.solve)
+    elif self.Preconditioner == 'spectral':
+      M = LinearOperator((n, n), self.spectral_preconditioner())
+    elif self.Preconditioner == 'multigrid':
+      if self.dimension != 2:
+        sys.exit("The multigrid preconditioner is for 2D grids only. Exiting.")
+      M = self.fd_multigrid().operator()
+    else:
+      sys.exit("Preconditioner must be 'ilu', 'block-jacobi', 'spectral',\n"+\
+               "'multigrid', or 'none'. Exiting.")
+    self.coeff_precond = M
+    self.coeff_precond_of = self.coeff_matrix
+    self.coeff_precond_type = self.Preconditioner
+    return M
+
+  def spectral_preconditioner(self):
+    """
+    Returns a function that solves the finite difference equations for a
+    plate with the mean flexural rigidity, by fast transforms. Each axis is
+    treated as if extended to make it periodic: by reflection about the edge
+    cells (exact for Mirror b.c.'s, and close for 0Slope0Shear), by 
+    antisymmetric reflection about the cells outside the grid (for 
+    0Displacement0Slope), or not at all (Periodic). The reflected extensions
+    are not built: they are equivalent to discrete cosine and sine 
+    transforms (type I) of the grid itself. This is a poor approximation 
+    for 0Moment0Shear (free) edges and for strongly varying Te, with which
+    the iterations may not converge: use ilu or multigrid for these.
+    """
+    from scipy import fftpack
+    D = np.mean(self.E*np.asarray(self.Te, dtype=float)**3/(12*(1-self.nu**2)))
+    shape = self.qs.shape
+    if self.dimension == 1:
+      spacings = [self.dx]
+      BCs = [(self.BC_W, self.BC_E)]
+    else:
+      spacings = [self.dy, self.dx]
+      BCs = [(self.BC_N, self.BC_S), (self.BC_W, self.BC_E)]
+    kinds = []
+    # Second-difference operator in wavenumber space, for each axis, and the
+    # scaling of each transform and its inverse
+    lap = 0.
+    scale = 1.
+    for axis in range(self.dimension):
+      n = shape[axis]
+      if 'Periodic' in BCs[axis] or n < 3:
+        kinds.append('periodic')
+        kd = 2*np.pi * np.fft.fftfreq(n)
+      elif BCs[axis] == ('0Displacement0Slope', '0Displacement0Slope'):
+        kinds.append('odd')
+        kd = np.pi * np.arange(1, n+1) / (n+1)
+        scale *= 2*(n+1)
+      else:
+        kinds.append('even')
+        kd = np.pi * np.arange(n) / (n-1)
+        scale *= 2*(n-1)
+      kshape = [1] * self.dimension
+      kshape[axis] = -1
+      lap = lap + ((2 - 2*np.cos(kd)) / spacings[axis]**2).reshape(kshape)
+    response = 1. / (D * lap**2 + self.drho * self.g) / scale
+    real = [axis for axis in range(self.dimension) if kinds[axis] != 'periodic']
+    periodic = [axis for axis in range(self.dimension) if kinds[axis] == 'periodic']
+    def transform(r):
+      # Type I cosine and sine transforms are their own inverses, to scale
+      for axis in real:
+        if kinds[axis] == 'even':
+          r = fftpack.dct(r, type=1, axis=axis)
+        else:
+          r = fftpack.dst(r, type=1, axis=axis)
+      return r
+    def solve(r):
+      r = transform(r.reshape(shape))
+      if len(periodic):
+        r = np.fft.fftn(r, axes=periodic)
+        r *= response
+        r = np.fft.ifftn(r, axes=periodic).real
+      else:
+        r *= response
+      return transform(r).ravel()
+    return solve
+
+  def fd_initial_guess(self, b):
+    """
+    x0 = fd_initial_guess(b)
+
+    Starting point for an iterative solution of coeff_matrix * x = b, from
+    the solutions of earlier runs of this model ("WarmStart"):
+
+    * previous (default): the last solution
+    * extrapolate: linear extrapolation from the last two solutions, for
+      loads that change steadily from run to run (e.g., by time step)
+    * none: zero
+
+    Successive loads in a time series or coupled model often differ only a
+    little, so the solution starts close to the answer. A guess whose 
+    residual is no smaller than that of zero (|b|), or that is for a grid of
+    another size, is not used; nor is an extrapolation that is worse than
+    the last solution. Returns None to start from zero.
+    """
+    self.configDefault("string", "numerical", "WarmStart", 'previous')
+    if self.WarmStart not in ('previous', 'extrapolate', 'none'):
+      sys.exit("WarmStart must be 'previous', 'extrapolate', or 'none'. Exiting.")
+    solutions = [x for x in getattr(self, 'fd_solutions', None) or []
+                 if x.shape == b.shape]
+    if self.WarmStart == 'none' or not solutions:
+      return None
+    guesses = [solutions[-1]]
+    if self.WarmStart == 'extrapolate' and len(solutions) > 1:
+      guesses.insert(0, 2*solutions[-1] - solutions[-2])
+    best = None
+    rnorm_best = np.linalg.norm(b)
+    for x0 in guesses:
+      rnorm = np.linalg.norm(b - self.coeff_matrix.dot(x0))
+      if rnorm < rnorm_best:
+        best = x0
+        rnorm_best = rnorm
+    if self.Debug:
+      print("Warm start:", best is not None)
+    return best
+
+  def fd_record_solution(self, x):
+    """
+    Keeps the last two iterative solutions, for fd_initial_guess, and adds 
+    the number of iterations that this one took to the list for all runs,
+    iterative_iterations_per_run
+    """
+    self.fd_solutions = (getattr(self, 'fd_solutions', None) or [])[-1:] + [x]
+    if getattr(self, 'iterative_iterations_per_run', None) is None:
+      self.iterative_iterations_per_run = []
+    self.iterative_iterations_per_run.append(self.iterative_iterations)
+
+  def fd_iterative_solve(self, b, x0=None, M=None):
+    """
+    x = fd_iterative_solve(b, x0=None, M=None)
+
+    Solves coeff_matrix * x = b by a preconditioned Krylov method
+    ("IterativeMethod": lgmres [default], gmres, bicgstab, or cg; cg is
+    only appropriate for symmetric b.c.'s), starting from x0 (or 0), with
+    the preconditioner M (or that given by "Preconditioner").
+
+    The tolerance, iterative_ConvergenceTolerance, is in meters of
+    deflection: the iterations stop when the norm of the residual, divided
+    by the isostatic restoring stress per meter (drho*g), falls below it.
+    This bounds the deflection error only where drho*g is the smallest 
+    response of the plate to a unit deflection: for uniform Te with 
+    periodic b.c.'s, whose operator is symmetric. Otherwise, the error may
+    be larger than the tolerance by the ratio of drho*g to the smallest 
+    singular value of the coefficient matrix: on small test grids, up to 
+    ~2 for Mirror or 0Slope0Shear edges (~4 with a step in Te), and ~10 
+    for 0Moment0Shear (free) edges. The bound is on the 2-norm of the error, so
+    it holds in each cell, but the residual is as the Krylov method 
+    measures it.
+
+    At most "IterativeMaxIterations" (default 1000) iterations are taken
+    (for gmres, rounded up to whole restart cycles of 20).
+    The number of iterations is stored in iterative_iterations (for 
+    lgmres, each iteration is an outer cycle of up to 30 inner iterations;
+    for gmres, these are inner iterations), and whether the tolerance was
+    met in iterative_converged. If it was not, x is still returned, with a
+    warning that is shown even when Quiet. The history of the relative residual norm
+    is stored in iterative_residuals: for gmres, that of the preconditioned
+    system, which it reports itself; for the other methods, only with 
+    Debug, as each costs one more product with the matrix.
+    """
+    from scipy.sparse.linalg import lgmres, gmres, bicgstab, cg
+    self.configDefault("string", "numerical", "IterativeMethod", 'lgmres')
+    self.configDefault("integer", "numerical", "IterativeMaxIterations", 1000)
+    methods = {'lgmres': lgmres, 'gmres': gmres, 'bicgstab': bicgstab, 'cg': cg}
+    if self.IterativeMethod not in methods:
+      sys.exit("IterativeMethod must be 'lgmres', 'gmres', 'bicgstab', or 'cg'. Exiting.")
+    tol = getattr(self, 'iterative_ConvergenceTolerance', None)
+    if tol is None:
+      tol = 1E-3
+    A = self.coeff_matrix
+    if M is None:
+      M = self.fd_preconditioner()
+      preconditioner = self.Preconditioner
+    else:
+      preconditioner = 'given'
+    bnorm = np.linalg.norm(b)
+    # One entry per iteration: its residual, or None if not recorded
+    steps = []
+    kwargs = {'M': M, 'x0': x0, 'atol': tol * self.drho * self.g,
+              'maxiter': self.IterativeMaxIterations}
+    if self.IterativeMethod == 'gmres':
+      # scipy counts restart cycles, but inner iterations are reported
+      kwargs['restart'] = 20
+      kwargs['maxiter'] = -(-self.IterativeMaxIterations // 20)
+      kwargs['callback'] = steps.append
+      kwargs['callback_type'] = 'pr_norm'
+    elif self.Debug and bnorm > 0:
+      kwargs['callback'] = lambda xk: steps.append( \
+                             np.linalg.norm(b - A.dot(xk)) / bnorm )
+    else:
+      kwargs['callback'] = lambda xk: steps.append(None)
+    x, info = self.krylov(methods[self.IterativeMethod], A, b, **kwargs)
+    self.iterative_iterations = len(steps)
+    self.iterative_residuals = [r for r in steps if r is not None]
+    self.iterative_converged = (info == 0)
+    if self.Verbose:
+      print("Iterative solution:", self.IterativeMethod, "with", \
+            preconditioner, "preconditioner;", self.iterative_iterations, \
+            "iterations;", ["did not converge", "converged"][self.iterative_converged], \
+            "to a tolerance of", tol, "m")
+    if info != 0:
+      # Shown even when Quiet: this deflection is not to be trusted
+      print("Warning: iterative solution did not converge to", tol, "m in", \
+            self.iterative_iterations, "iterations")
+      print("  (scipy.sparse.linalg info =", str(info)+"; see IterativeMaxIterations)")
+    return x
+
+  def krylov(self, method, A, b, **kwargs):
+    """
+    Calls a scipy.sparse.linalg Krylov solver with no relative tolerance,
+    which is named "rtol" in SciPy >= 1.12 and "tol" in older versions
+    """
+    import scipy
+    version = tuple(int(v) for v in scipy.__version__.split('.')[:2])
+    if version >= (1, 12):
+      kwargs['rtol'] = 0.
+    else:
+      kwargs['tol'] = 0.
+    return method(A, b, **kwargs)
+
+  def run_batch(self, qs_stack, out=None, block_size=None):
+    """
+    w_stack = run_batch(qs_stack)
+
+    Finite difference solution for many load grids on the same plate.
+    qs_stack holds the load grids (stresses) along its first axis:
+    (nloads, nx) for F1D and (nloads, ny, nx) for F2D. These are solved
+    against a single coefficient matrix. With the direct solver, the matrix is
+    factorized once and the loads are back-substituted in blocks of
+    block_size columns; by default, blocks are sized to use ~128 MB. The
+    iterative and multigrid solvers take the loads one at a time.
+
+    Returns the stack of deflections, which is written into "out" if this
+    is given. Afterwards, qs and w hold the last load grid and its deflection.
+    Call in place of run(), after initialize().
+    """
+    qs_stack = np.asarray(qs_stack, dtype=float)
+    if self.Method != 'FD':
+      sys.exit("Batch solutions are only available for the finite difference\n"+\
+               "method (Method = 'FD'). Exiting.")
+    if qs_stack.ndim != self.dimension + 1 or len(qs_stack) == 0:
+      sys.exit("Stack of loads must have the shape (nloads, "+\
+               ["nx", "ny, nx"][self.dimension-1]+"). Yours is: "+\
+               str(qs_stack.shape))
+    if out is None:
+      out = np.empty(qs_stack.shape)
+    elif out.shape != qs_stack.shape:
+      sys.exit("Output array for batch solution must have the same shape as\n"+\
+               "the stack of loads. Exiting.")
+
+    self.qs = qs_stack[0]
+    self.bc_check()
+    self.solver_start_time = time.time()
+    Flexure.FD(self)
+    self.fd_coeff_matrix()
+
+    nloads = qs_stack.shape[0]
+    if self.Solver in ["iterative", "Iterative", "multigrid", "Multigrid"]:
+      # One load at a time, with no factorization of the matrix
+      unconverged = []
+      for k in range(nloads):
+        self.qs = qs_stack[k]
+        self.fd_solve()
+        out[k] = self.w
+        if not self.iterative_converged:
+          unconverged.append(k)
+      self.iterative_converged = not unconverged
+      if unconverged:
+        # Shown even when Quiet: these deflections are not to be trusted
+        print("Warning: iterative solutions of", len(unconverged), "of", nloads,
+              "loads did not converge (loads", str(unconverged)+")")
+    else:
+      n = int(np.prod(qs_stack.shape[1:]))
+      if block_size is None:
+        # Right-hand sides, solutions, and a working copy of each block
+        block_size = max(1, int(2**27 // (3 * 8 * n)))
+      lu = self.coeff_matrix_factorization()
+      for k in range(0, nloads, block_size):
+        qblock = qs_stack[k:k+block_size].reshape(-1, n).T
+        wblock = lu.solve(np.asfortranarray(qblock))
+        out[k:k+block_size] = -wblock.T.reshape(qblock.shape[1:2] + qs_stack.shape[1:])
+      self.qs = qs_stack[-1]
+      self.w = out[-1].copy()
+
+    self.time_to_solve = time.time() - self.solver_start_time
+    if self.Quiet == False:
+      print("Time to solve", nloads, "load grids [s]:", self.time_to_solve)
+    return out
+
+  def run_series(self, frames=None, out=None, nframes=None, prefetch=True):
+    """
+    for w in flex.run_series(frames): ...
+
+    Solves a time series of load grids (stresses, qs) on one plate, and
+    yields the deflection of each frame as it is solved. "frames" is any
+    iterable of load grids: e.g., a generator, or an array with the frames 
+    along its first axis, such as a .npy file memory-mapped by 
+    numpy.load(path, mmap_mode='r'). By default, it is "LoadHistory": such
+    an array, the path of a file of one, or a wildcard pattern for files of
+    one frame each, which are loaded (see loadFile) in sorted order.
+
+    The coefficient matrix and its factorization (FD) or the SAS kernel
+    are made for the first frame and reused for the rest. With "prefetch",
+    the next frame is read in a background thread while this one is solved.
+
+    "out" (by default, "DeflectionHistoryOut") is an array, or the path of
+    a .npy file to create, (frame, ...), to which each deflection is 
+    written as it is solved. A file is made for "nframes" frames (by 
+    default, the number of frames given, if this is known), and is complete
+    once the generator has finished. Afterwards, qs and w hold the last 
+    frame. Call in place of run(), after initialize() (for which, as for
+    run_batch, qs may be set to the first frame if LoadHistory is not set).
+    """
+    if self.Method == 'SAS_NG':
+      sys.exit("Time series are of gridded loads: Method must be 'FD', 'FFT',\n"+\
+               "or 'SAS'. Exiting.")
+    if frames is None:
+      frames = self.LoadHistory
+    if frames is None:
+      sys.exit("No time series of loads (LoadHistory) given. Exiting.")
+    if type(frames) == str:
+      if glob.has_magic(frames):
+        paths = sorted(glob.glob(frames))
+        if not paths:
+          paths = sorted(glob.glob(os.path.join(getattr(self, 'inpath', None) or '', frames)))
+        if not paths:
+          sys.exit("No files of loads match "+frames+". Exiting.")
+        frames = (self.loadFile(path) for path in paths)
+        if nframes is None:
+          nframes = len(paths)
+      else:
+        frames = self.loadFile(frames)
+    if nframes is None and hasattr(frames, '__len__'):
+      nframes = len(frames)
+    if out is None:
+      out = self.DeflectionHistoryOut
+    if prefetch:
+      import timeseries
+      frames = timeseries.prefetch(frames)
+
+    start = time.time()
+    nsolved = 0
+    converged = True
+    for qs in frames:
+      self.qs = np.asarray(qs, dtype=float)
+      self.run()
+      if not self.iterative_converged:
+        # Shown even when Quiet: this deflection is not to be trusted
+        print("Warning: iterative solution of frame", nsolved, "did not converge")
+        converged = False
+      if type(out) == str:
+        if nframes is None:
+          sys.exit("The number of frames is needed to write them to "+out+"\n"+\
+                   "Exiting.")
+        out = np.lib.format.open_memmap(out, mode='w+', dtype=float,
+                                        shape=(nframes,) + np.shape(self.w))
+      if out is not None:
+        out[nsolved] = self.w
+      nsolved += 1
+      yield self.w
+    # Whether every frame converged
+    self.iterative_converged = converged
+    if isinstance(out, np.memmap):
+      out.flush()
+    self.time_to_solve = time.time() - start
+    if self.Quiet == False:
+      print("Time to solve", nsolved, "frames [s]:", self.time_to_solve)
+
   ### need to determine its interface, it is best to have a uniform interface
   ### no matter it is 1D or 2D; but if it can't be that way, we can set up a
   ### variable-length arguments, which is the way how Python overloads functions.
@@ -943,7 +1727,7 @@ class Flexure(Utility, Plotting):
     try:
       self.qs
     except:
-      self.qs = self.q0.copy()
+      self.qs = self.q0
       # Remove self.q0 to avoid issues with multiply-defined inputs
       # q0 is the parsable input to either a qs grid or contains (x,(y),q)
       del self.q0
@@ -966,24 +1750,26 @@ class Flexure(Utility, Plotting):
     if self.filename:
       # In the case that it is iterative, find the convergence criterion
       self.iterative_ConvergenceTolerance = self.configGet("float", "numerical", "ConvergenceTolerance")    
-      # Try to import Te grid or scalar for the finite difference solution
-      try:
-        self.Te = self.configGet("float", "input", "ElasticThickness", optional=False)
-        if self.Te is None:
+      # Try to import Te grid or scalar for the finite difference solution,
+      # unless it has already been given (e.g., by a setter or a previous run)
+      if getattr(self, 'Te', None) is None:
+        try:
+          self.Te = self.configGet("float", "input", "ElasticThickness", optional=False)
+          if self.Te is None:
+            Tepath = self.configGet("string", "input", "ElasticThickness", optional=False)
+            self.Te = Tepath
+          else:
+            Tepath = None
+        except:
           Tepath = self.configGet("string", "input", "ElasticThickness", optional=False)
           self.Te = Tepath
-        else:
-          Tepath = None
-      except:
-        Tepath = self.configGet("string", "input", "ElasticThickness", optional=False)
-        self.Te = Tepath
-      if self.Te is None:
-        if self.coeff_matrix is not None:
-          pass
-        else:
-          # Have to bring this out here in case it was discovered in the 
-          # try statement that there is no value given
-          sys.exit("No input elastic thickness or coefficient matrix supplied.")
+        if self.Te is None:
+          if self.coeff_matrix is not None:
+            pass
+          else:
+            # Have to bring this out here in case it was discovered in the 
+            # try statement that there is no value given
+            sys.exit("No input elastic thickness or coefficient matrix supplied.")
     # or if getter/setter
     if type(self.Te) == str: 
       # Try to import Te grid or scalar for the finite difference solution
@@ -1011,9 +1797,85 @@ class Flexure(Utility, Plotting):
       if self.Te.any():
         self.TeArraySizeCheck()
     
-  ### need work
   def FFT(self):
-    pass
+    """
+    Set-up for the spectral (fast Fourier transform) solution method, for
+    plates of constant flexural rigidity
+    """
+    if self.Verbose:
+      print("Fast Fourier Transform Solution Technique")
+    if self.filename:
+      # Define the (scalar) elastic thickness, unless it has already been 
+      # given (e.g., by a setter or a previous run)
+      if getattr(self, 'Te', None) is None:
+        self.Te = self.configGet("float", "input", "ElasticThickness")
+    # Define a stress-based qs = q0
+    # But only if the latter has not already been defined
+    # (e.g., by the getters and setters)
+    try:
+      self.qs
+    except:
+      self.qs = self.q0
+      # Remove self.q0 to avoid issues with multiply-defined inputs
+      # q0 is the parsable input to either a qs grid or contains (x,(y),q)
+      del self.q0
+    # A Te array is fine if it is uniform
+    if not np.isscalar(self.Te):
+      Te = np.asarray(self.Te, dtype=float)
+      if (Te != Te.flat[0]).any():
+        sys.exit("The FFT solution method requires a constant elastic thickness.\n"+\
+                 "Use the finite difference method (FD) for variable Te. Exiting.")
+      self.Te = float(Te.flat[0])
+    if self.dimension == 1:
+      self.x = np.arange(self.dx/2., self.dx * self.qs.shape[0], self.dx)
+    else:
+      self.x = np.arange(self.dx/2., self.dx * self.qs.shape[1], self.dx)
+      self.y = np.arange(self.dy/2., self.dy * self.qs.shape[0], self.dy)
+
+  def fft_solve(self):
+    """
+    w = fft_solve()
+
+    Spectral solution for a plate of constant flexural rigidity, D:
+      w_hat(k) = -q_hat(k) / (D k^4 + drho g)
+    Periodic boundaries are those of the discrete Fourier transform itself.
+    Across NoOutsideLoads boundaries, the grid is zero-padded by four 
+    flexural wavelengths (to a fast FFT size), so that the response to loads 
+    on the far side of the periodic domain has decayed to negligible values.
+    """
+    self.D = self.E*self.Te**3/(12*(1-self.nu**2)) # Flexural rigidity
+    # The larger, 1D, flexural parameter sets the padding in both cases
+    alpha = (4*self.D/(self.drho*self.g))**.25
+    if self.dimension == 1:
+      spacings = [self.dx]
+      periodic = [self.BC_W == 'Periodic']
+    else:
+      spacings = [self.dy, self.dx]
+      periodic = [self.BC_N == 'Periodic', self.BC_W == 'Periodic']
+    from scipy.fftpack import next_fast_len
+    fftshape = []
+    for n, d, p in zip(self.qs.shape, spacings, periodic):
+      if p:
+        fftshape.append(n)
+      else:
+        fftshape.append(next_fast_len(n + int(np.ceil(8*np.pi*alpha/d))))
+    # Squared wavenumber magnitude on the (real-FFT) spectral grid
+    k2 = 0.
+    for axis in range(self.dimension):
+      if axis == self.dimension - 1:
+        k = 2*np.pi * np.fft.rfftfreq(fftshape[axis], spacings[axis])
+      else:
+        k = 2*np.pi * np.fft.fftfreq(fftshape[axis], spacings[axis])
+      kshape = [1] * self.dimension
+      kshape[axis] = -1
+      k2 = k2 + k.reshape(kshape)**2
+    axes = list(range(self.dimension))
+    qhat = np.fft.rfftn(self.qs, fftshape, axes)
+    # qs negative so bends down with positive load, bends up with neative load 
+    # (i.e. material removed)
+    what = -qhat / (self.D * k2**2 + self.drho * self.g)
+    w = np.fft.irfftn(what, fftshape, axes)
+    self.w = w[tuple(slice(0, n) for n in self.qs.shape)]
 
   # SAS and SAS_NG are the exact same here; leaving separate just for symmetry 
   # with other functions
@@ -1023,16 +1885,21 @@ class Flexure(Utility, Plotting):
     Set-up for the rectangularly-gridded superposition of analytical solutions 
     method for solving flexure
     """
-    if self.x is None:
-      self.x = np.arange(self.dx/2., self.dx * self.qs.shape[0], self.dx)
     if self.filename:
-      # Define the (scalar) elastic thickness
-      self.Te = self.configGet("float", "input", "ElasticThickness")
+      # Define the (scalar) elastic thickness, unless it has already been given
+      if getattr(self, 'Te', None) is None:
+        self.Te = self.configGet("float", "input", "ElasticThickness")
       # Define a stress-based qs = q0
-      self.qs = self.q0.copy()
-      # Remove self.q0 to avoid issues with multiply-defined inputs
-      # q0 is the parsable input to either a qs grid or contains (x,(y),q)
-      del self.q0
+      # But only if the latter has not already been defined
+      try:
+        self.qs
+      except:
+        self.qs = self.q0
+        # Remove self.q0 to avoid issues with multiply-defined inputs
+        # q0 is the parsable input to either a qs grid or contains (x,(y),q)
+        del self.q0
+    if self.x is None:
+      self.x = np.arange(self.dx/2., self.dx * self.qs.shape[0], self.dx)
     if self.dimension == 2:
       if self.y is None:
         self.y = np.arange(self.dy/2., self.dy * self.qs.shape[0], self.dy)
@@ -1042,7 +1909,7 @@ class Flexure(Utility, Plotting):
       try:
         self.qs
       except:
-        self.qs = self.q0.copy()
+        self.qs = self.q0
         # Remove self.q0 to avoid issues with multiply-defined inputs
         # q0 is the parsable input to either a qs grid or contains (x,(y),q)
         del self.q0
@@ -1054,8 +1921,9 @@ class Flexure(Utility, Plotting):
     method for solving flexure
     """
     if self.filename:
-      # Define the (scalar) elastic thickness
-      self.Te = self.configGet("float", "input", "ElasticThickness")
+      # Define the (scalar) elastic thickness, unless it has already been given
+      if getattr(self, 'Te', None) is None:
+        self.Te = self.configGet("float", "input", "ElasticThickness")
       # See if it wants to be run in lat/lon
       # Could put under in 2D if-statement, but could imagine an eventual desire
       # to change this and have 1D lat/lon profiles as well.
@@ -1082,7 +1950,7 @@ class Flexure(Utility, Plotting):
       try:
         # If these have already been set, e.g., by getters/setters, great!
         self.x
-        self.u
+        self.y
         self.q
       except:
         # Using [x, y, w] configuration file
@@ -1141,3 +2009,64 @@ class Flexure(Utility, Plotting):
     if self.xw is None:
       self.xw = self.x.copy()
 
+
+  # Working memory for each load-point pair in a block of the superposition
+  # (the distances and the temporary arrays of the solution for them) [bytes]
+  SAS_NG_pair_bytes = 128
+  # Number of (group of loads, tile of points) units of work into which the
+  # superposition is divided, at most; fixed, so the sums do not depend on
+  # the number of workers
+  superposition_units = 256
+
+  def superposition(self, kernel, q, sources, points):
+    """
+    w = superposition(kernel, q, sources, points)
+
+    Sums the solutions for point loads q at "sources" (an array of 
+    coordinates, one row per load) at the output "points" (one row per 
+    point). kernel(sources, points) returns the (loads, points) array of 
+    the solutions for unit loads.
+
+    The loads and points are taken in blocks of both, each of which is 
+    summed by a matrix-vector product, so the work is done in large arrays
+    rather than load by load. Blocks are as large as fit in
+    "SAS_NG_block_bytes" (default 4 MB) of working memory. Zero loads are
+    dropped before any of this.
+
+    The blocks of loads are summed in groups, and the groups' sums added in
+    order. With "n_workers" > 1 (0: one per CPU), the groups and blocks of
+    points are divided among that many processes (see 
+    pointloads.parallel_sum); the result is the same for any number.
+    """
+    self.configDefault("float", "numerical", "SAS_NG_block_bytes", 2.**22)
+    self.configDefault("int", "numerical", "n_workers", 1)
+    q = np.asarray(q, dtype=float)
+    loaded = q != 0
+    q = q[loaded]
+    sources = sources[loaded]
+    pairs = max(1, int(self.SAS_NG_block_bytes // self.SAS_NG_pair_bytes))
+    npoints = max(1, min(len(points), pairs))
+    nloads = max(1, pairs // npoints)
+    tiles = np.arange(0, len(q), nloads)
+    ntiles = max(1, -(-len(points) // npoints))
+    ngroups = max(1, min(len(tiles), self.superposition_units // ntiles))
+    groups = [list(group) for group in np.array_split(tiles, ngroups)]
+    n_workers = self.n_workers
+    if n_workers == 0:
+      import multiprocessing
+      n_workers = multiprocessing.cpu_count()
+    if n_workers > 1 and len(q):
+      try:
+        from multiprocessing import shared_memory
+      except ImportError:
+        sys.exit("n_workers > 1 requires Python 3.8 or later. Exiting.")
+      from pointloads import parallel_sum
+      return parallel_sum(kernel, q, sources, points, groups, nloads, npoints,
+                          n_workers)
+    from pointloads import group_sum
+    w = np.zeros(len(points))
+    for i in range(0, len(points), npoints):
+      wblock = w[i:i+npoints]
+      for group in groups:
+        wblock += group_sum(kernel, q, sources, points[i:i+npoints], group, nloads)
+    return w
@@ -0,0 +1,163 @@
+"""
+This file is part of gFlex.
+gFlex computes lithospheric flexural isostasy with heterogeneous rigidity
+Copyright (C) 2010-2018 Andrew D. Wickert
+
+gFlex is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+gFlex is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with gFlex.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+from __future__ import division, print_function # No automatic floor division
+import sys, os
+import time
+from base import WhichModel, Flexure
+from f1d import F1D
+from f2d import F2D
+
+# Columns of the summary table
+columns = ['config', 'status', 'dimension', 'method', 'time_total',
+           'time_to_solve', 'output']
+
+def run_file(filename):
+  """
+  Runs one configuration file, as the gflex command does, but without 
+  plotting, and returns a row of the summary table: {column: value}. A run
+  that fails (or exits) is reported in the "status" column, rather than
+  stopping the batch.
+  """
+  start = time.time()
+  row = dict( (column, '') for column in columns )
+  row['config'] = filename
+  try:
+    obj = WhichModel(filename)
+    if obj.dimension == 1:
+      obj = F1D(filename)
+    elif obj.dimension == 2:
+      obj = F2D(filename)
+    obj.initialize(filename)
+    row['dimension'] = obj.dimension
+    row['method'] = obj.Method
+    if obj.LoadHistory is not None:
+      for w in obj.run_series():
+        pass
+    else:
+      obj.run()
+    obj.finalize()
+    obj.outputDeflections()
+    row['time_to_solve'] = obj.time_to_solve
+    row['output'] = obj.DeflectionHistoryOut or obj.wOutFile or ''
+    if obj.iterative_converged:
+      row['status'] = 'ok'
+    else:
+      row['status'] = 'not converged'
+  except SystemExit as e:
+    row['status'] = 'exit'
+    if e.code:
+      row['status'] += ': '+str(e.code)
+  except Exception as e:
+    row['status'] = 'error: '+type(e).__name__+': '+str(e)
+  row['time_total'] = time.time() - start
+  return row
+
+def _initialize_worker(size):
+  Flexure.share_operators(size)
+
+def run_files(filenames, n_workers=1, shared_operators=8):
+  """
+  Runs many configuration files in this process, or divided among 
+  "n_workers" processes, and returns their rows of the summary table (in
+  the order of the files). Each process keeps up to "shared_operators" 
+  coefficient matrices (with their factorizations) and SAS kernels in 
+  memory, so files on the same plate share them.
+  """
+  if n_workers > 1 and len(filenames) > 1:
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(n_workers, initializer=_initialize_worker,
+                             initargs=(shared_operators,)) as pool:
+      return list(pool.map(run_file, filenames))
+  sharing = Flexure.shared_operators
+  size = Flexure.shared_operators_size
+  Flexure.share_operators(shared_operators)
+  try:
+    return [run_file(filename) for filename in filenames]
+  finally:
+    Flexure.shared_operators = sharing
+    Flexure.shared_operators_size = size
+
+def read_manifest(path):
+  """
+  Configuration files listed in a manifest: one per line, relative to the
+  manifest's directory unless absolute; blank lines and lines that start
+  with "#" are skipped
+  """
+  directory = os.path.dirname(os.path.abspath(path))
+  filenames = []
+  with open(path) as f:
+    for line in f:
+      line = line.strip()
+      if line and not line.startswith('#'):
+        filenames.append(os.path.join(directory, line))
+  return filenames
+
+def write_summary(rows, f):
+  """
+  Writes the summary table, tab-separated with a header line, to file f
+  """
+  f.write('\t'.join(columns) + '\n')
+  for row in rows:
+    values = []
+    for column in columns:
+      value = row[column]
+      if isinstance(value, float):
+        value = '%.6f' % value
+      values.append(str(value).replace('\t', ' ').replace('\n', ' '))
+    f.write('\t'.join(values) + '\n')
+
+def main(argv=None):
+  """
+  Command line: gflex <configuration file> <configuration file> ... 
+                  [-m MANIFEST] [-j WORKERS] [-s SUMMARY]
+  """
+  import argparse
+  parser = argparse.ArgumentParser(prog='gflex',
+             description='Runs many gFlex configuration files in one process '+\
+                         '(or a pool of them), sharing coefficient matrices '+\
+                         'and SAS kernels between runs on the same plate, and '+\
+                         'writes a table of their timings and output files. '+\
+                         'Plots are not made.')
+  parser.add_argument('filenames', nargs='*', help='configuration files')
+  parser.add_argument('-m', '--manifest', action='append', default=[],
+                      help='file listing configuration files, one per line')
+  parser.add_argument('-j', '--workers', type=int, default=1,
+                      help='number of worker processes (default 1)')
+  parser.add_argument('-s', '--summary',
+                      help='file for the summary table (default: print it)')
+  parser.add_argument('--shared-operators', type=int, default=8,
+                      help='coefficient matrices and SAS kernels kept in '+\
+                           'memory by each process (default 8)')
+  args = parser.parse_args(argv)
+  filenames = list(args.filenames)
+  for manifest in args.manifest:
+    filenames += read_manifest(manifest)
+  if not filenames:
+    parser.error('no configuration files given')
+  rows = run_files(filenames, args.workers, args.shared_operators)
+  if args.summary:
+    with open(args.summary, 'w') as f:
+      write_summary(rows, f)
+  else:
+    write_summary(rows, sys.stdout)
+  failed = [row for row in rows if row['status'] != 'ok']
+  if failed:
+    sys.exit(str(len(failed))+" of "+str(len(rows))+" runs failed.")
@@ -19,8 +19,8 @@ along with gFlex.  If not, see <http://www.gnu.org/licenses/>.
 
 from __future__ import division, print_function # No automatic floor division
 from base import *
-from scipy.sparse import spdiags
-from scipy.sparse.linalg import spsolve, isolve
+from pointloads import LineLoad
+from banded import PentadiagonalLU, PentadiagonalBatchLU
 
 class F1D(Flexure):
   def initialize(self, filename=None):
@@ -58,6 +58,66 @@ class F1D(Flexure):
     if self.Quiet == False:
       print("Time to solve [s]:", self.time_to_solve)
 
+  def run_profiles(self, Te, qs):
+    """
+    w = run_profiles(Te, qs)
+
+    Finite difference solutions for many independent profiles (e.g., swaths
+    across a mountain belt) that share this model's boundary conditions, 
+    grid spacing, and elastic and density parameters. qs holds the loads 
+    (stresses) of the profiles, (nprofiles, nx); Te is their elastic 
+    thicknesses, of the same shape, or one profile (nx) or a scalar for all
+    of them.
+
+    The coefficients of all of the profiles are assembled at once, by the 
+    same code as for one, and the profiles are solved together by one 
+    banded LU factorization (see banded.PentadiagonalBatchLU), which is 
+    kept for further loads on the same plates.
+
+    Returns the deflections, (nprofiles, nx), which are also left in w; 
+    the model's own Te and qs are left as they were. Call after 
+    initialize() (for which Te and qs may be set to those of any one 
+    profile), in place of run().
+    """
+    qs = np.asarray(qs, dtype=float)
+    if qs.ndim != 2:
+      sys.exit("Loads for run_profiles must have the shape (nprofiles, nx).\n"+\
+               "Yours is: "+str(qs.shape)+". Exiting.")
+    try:
+      Te = np.broadcast_to(np.asarray(Te, dtype=float), qs.shape)
+    except ValueError:
+      sys.exit("Te for run_profiles must be a scalar, (nx), or (nprofiles, nx),\n"+\
+               "to match the loads, "+str(qs.shape)+". Exiting.")
+    self.bc_check()
+    self.solver_start_time = time.time()
+    saved = dict( (name, self.__dict__[name]) for name in ['Te', 'qs', 'Te_unpadded']
+                  if name in self.__dict__ )
+    try:
+      # Nodes first, as the assembly for one profile indexes them
+      self.Te = np.ascontiguousarray(Te.T)
+      self.qs = qs.T
+      key = self.fd_operator_key()
+      if getattr(self, 'profiles_factor_of', None) != key:
+        self.elasprepFD()
+        self.BC_Rigidity()
+        self.get_coeff_values()
+        self.BC_Flexure()
+        self.profiles_factor = PentadiagonalBatchLU(self.l2, self.l1, self.c0,
+                                                    self.r1, self.r2,
+                                                    periodic=(self.BC_W == 'Periodic'))
+        self.profiles_factor_of = key
+    finally:
+      for name in ['Te', 'qs', 'Te_unpadded']:
+        self.__dict__.pop(name, None)
+      self.__dict__.update(saved)
+    # qs negative so bends down with positive load
+    self.w = self.profiles_factor.solve(-qs.ravel()).reshape(qs.shape)
+
+    self.time_to_solve = time.time() - self.solver_start_time
+    if self.Quiet == False:
+      print("Time to solve", qs.shape[0], "profiles [s]:", self.time_to_solve)
+    return self.w
+
   def finalize(self):
     # If elastic thickness has been padded, return it to its original
     # value, so this is not messed up for repeat operations in a 
@@ -66,6 +126,8 @@ class F1D(Flexure):
       self.Te = self.Te_unpadded
     except:
       pass
+    self.profiles_factor = None
+    self.profiles_factor_of = None
     if self.Verbose: print("F1D finalized")
     super(F1D, self).finalize()   
     
@@ -74,19 +136,23 @@ class F1D(Flexure):
   ########################################
   
   def FD(self):
+    self.fd_coeff_matrix()
+    self.fd_solve() # Get the deflection, "w"
+
+  def fd_coeff_matrix(self):
     self.gridded_x()
     # Only generate coefficient matrix if it is not already provided
+    # (or if the plate has changed since it was built here)
+    self.coeff_matrix_check()
     if self.coeff_matrix is not None:
       pass
     else:
       self.elasprepFD() # define dx4 and D within self
       self.BC_selector_and_coeff_matrix_creator()
-    self.fd_solve() # Get the deflection, "w"
 
   def FFT(self):
-    if self.plotChoice:
-      self.gridded_x()
-    sys.exit("The fast Fourier transform solution method is not yet implemented.")
+    self.gridded_x()
+    self.fft_solve()
     
   def SAS(self):
     self.gridded_x()
@@ -119,21 +185,23 @@ class F1D(Flexure):
     self.D = self.E*self.Te**3/(12*(1-self.nu**2)) # Flexural rigidity
     self.alpha = (4*self.D/(self.drho*self.g))**.25 # 1D flexural parameter
     self.coeff = self.alpha**3/(8*self.D)
+    # 'recursive' (default; O(N)) or 'direct' (sum of each load's solution
+    # at every point; O(N^2)). These give the same answer.
+    self.configDefault("string", "numerical", "SAS_evaluator", 'recursive')
+    if self.SAS_evaluator != 'recursive' and self.SAS_evaluator != 'direct':
+      sys.exit("SAS_evaluator must be 'recursive' or 'direct'. Exiting.")
 
   # UNIFORM DX ("GRIDDED"): LOADS PROVIDED AS AN ARRAY WITH KNOWN DX TO
   # CONVERT LOAD MAGNITUDE AT A POINT INTO MASS INTEGRATED ACROSS DX
 
   def spatialDomainGridded(self):
   
-    self.w = np.zeros(self.nx) # Deflection array
-    
-    for i in range(self.nx):
-      # Loop over locations that have loads, and sum
-      if self.qs[i]:
-        dist = abs(self._x_local[i]-self._x_local)
-        # -= b/c pos load leads to neg (downward) deflection
-        self.w -= self.qs[i] * self.coeff * self.dx * np.exp(-dist/self.alpha) * \
-          (np.cos(dist/self.alpha) + np.sin(dist/self.alpha))
+    if self.SAS_evaluator == 'recursive':
+      self.w = self.spatialDomainRecursive(self._x_local, self.qs * self.dx, self._x_local)
+      return
+
+    x = self._x_local.reshape(-1, 1)
+    self.w = self.superposition(LineLoad(self.coeff, self.alpha), self.qs * self.dx, x, x)
     # No need to return: w already belongs to "self"
     
 
@@ -144,19 +212,86 @@ class F1D(Flexure):
     """
     Superposition of analytical solutions without a gridded domain
     """
-    self.w = np.zeros(self.xw.shape)
+    if self.SAS_evaluator == 'recursive':
+      self.w = self.spatialDomainRecursive(self.x, self.q, self.xw)
+      return
+
+    w = self.superposition(LineLoad(self.coeff, self.alpha), self.q,
+                           np.reshape(self.x, (-1, 1)), np.reshape(self.xw, (-1, 1)))
+    self.w = w.reshape(np.shape(self.xw))
 
     if self.Debug:
       print("w = ")
       print(self.w.shape)
-    
-    for i in range(len(self.q)):
-      # More efficient if we have created some 0-load points
-      # (e.g., for where we want output)
-      if self.q[i] != 0:
-        dist = np.abs(self.xw - self.x[i])
-        self.w -= self.q[i] * self.coeff * np.exp(-dist/self.alpha) * \
-          ( np.cos(dist/self.alpha) + np.sin(dist/self.alpha) )
+
+  # RECURSIVE EVALUATION OF THE SUPERPOSITION
+
+  def spatialDomainRecursive(self, x, q, xw):
+    """
+    w = spatialDomainRecursive(x, q, xw)
+
+    Deflections at points xw due to line loads q [N/m] at points x, found
+    without approximation in O(N) (after sorting).
+
+    The solution for a line load,
+      exp(-d/alpha) * (cos(d/alpha) + sin(d/alpha)),
+    is the real part of (1-i) exp(-lambda d), with lambda = (1-i)/alpha.
+    The sum of these from all loads to the west of a point can therefore be
+    carried from one point to the next by multiplying by exp(-lambda dx) and
+    adding the new loads; the same is done from east to west for the loads
+    to the east.
+    """
+    x = np.asarray(x, dtype=float)
+    q = np.asarray(q, dtype=float)
+    xw = np.asarray(xw, dtype=float)
+    lam = (1 - 1j) / self.alpha
+
+    loaded = q != 0
+    order = np.argsort(x[loaded], kind='mergesort')
+    xs = x[loaded][order]
+    qs = q[loaded][order]
+    worder = np.argsort(xw.ravel(), kind='mergesort')
+    xws = xw.ravel()[worder]
+
+    # Loads at or to the west of each point, then those strictly to the east
+    # (found from the west-to-east sums along the mirrored axis)
+    west = self._decayingSums(xs, qs, xws, lam, 'right')
+    east = self._decayingSums(-xs[::-1], qs[::-1], -xws[::-1], lam, 'left')[::-1]
+
+    w = np.empty(xws.shape)
+    # Negative b/c pos load leads to neg (downward) deflection
+    w[worder] = -self.coeff * ((1 - 1j) * (west + east)).real
+    return w.reshape(xw.shape)
+
+  def _decayingSums(self, xs, qs, xws, lam, side):
+    """
+    For each output point xw (sorted), sums qs * exp(-lam * (xw - xs)) over
+    the sorted load points xs that are at or to the west of it (side='right')
+    or strictly to the west of it (side='left').
+    """
+    # Running sums at the load points themselves, S[j] = sum over m <= j of
+    # qs[m] * exp(-lam * (xs[j] - xs[m])). These are built in vectorized
+    # blocks: within a block, the exponentials are taken relative to the
+    # block's first point, so their growth is limited to exp(span/alpha)
+    span = 100. / lam.real
+    S = np.empty(xs.shape, dtype=complex)
+    a = 0
+    carry = 0.
+    while a < len(xs):
+      b = max(np.searchsorted(xs, xs[a] + span, side='right'), a+1)
+      grow = np.exp(lam * (xs[a:b] - xs[a]))
+      if a > 0:
+        carry = S[a-1] * np.exp(-lam * (xs[a] - xs[a-1]))
+      S[a:b] = (carry + np.cumsum(qs[a:b] * grow)) / grow
+      a = b
+    # Each output point picks up the running sum at the closest load point
+    # to its west, decayed over the distance between them
+    n = np.searchsorted(xs, xws, side=side)
+    out = np.zeros(xws.shape, dtype=complex)
+    has = n > 0
+    j = n[has] - 1
+    out[has] = S[j] * np.exp(-lam * (xws[has] - xs[j]))
+    return out
 
   ## FINITE DIFFERENCE
   ######################
@@ -188,15 +323,21 @@ class F1D(Flexure):
     # array
     self.BC_Rigidity()
     
-    # Second, build the coefficient arrays -- with the rigidity b.c.'s
-    self.get_coeff_values()
-
-    # Third, apply boundary conditions to the coeff_arrays to create the 
-    # flexural solution
-    self.BC_Flexure()
-    
-    # Fourth, construct the sparse diagonal array
-    self.build_diagonals()
+    if self.coeff_matrix_load():
+      # Built by an earlier run, and kept in the on-disk cache
+      pass
+    else:
+      # Second, build the coefficient arrays -- with the rigidity b.c.'s
+      self.get_coeff_values()
+
+      # Third, apply boundary conditions to the coeff_arrays to create the 
+      # flexural solution
+      self.BC_Flexure()
+      
+      # Fourth, construct the sparse diagonal array
+      self.build_diagonals()
+      self.coeff_matrix_save()
+    self.coeff_matrix_record()
     
     # Finally, compute the total time this process took    
     self.coeff_creation_time = time.time() - self.coeff_start_time
@@ -237,13 +378,15 @@ class F1D(Flexure):
     if np.isscalar(self.Te):
       self.D *= np.ones(self.qs.shape) # And leave Te as a scalar for checks
     else:
-      self.Te_unpadded = self.Te.copy()
+      self.Te_unpadded = self.Te
     # F2D keeps this inside the "else" and handles this differently, 
     # largely because it has different ways of computing the flexural
     # response with variable Te. We'll keep everything simpler here and 
     # just pad this array so it can be sent through the same process
-    # to create the coefficient arrays.
-    self.D = np.hstack([np.nan, self.D, np.nan])
+    # to create the coefficient arrays. Nodes are along the first axis (of 
+    # two, for many profiles at once: see run_profiles).
+    pad = np.nan * np.ones((1,) + self.D.shape[1:])
+    self.D = np.concatenate([pad, self.D, pad])
 
     ###############################################################
     # APPLY FLEXURAL RIGIDITY BOUNDARY CONDITIONS TO PADDED ARRAY #
@@ -259,7 +402,7 @@ class F1D(Flexure):
     if self.BC_Rigidity_W == "periodic":
       self.D[0] = self.D[-2]
     if self.BC_Rigidity_E == "periodic":
-      self.D[-1] = self.D[-3]
+      self.D[-1] = self.D[1]
     
   def get_coeff_values(self):
   
@@ -345,6 +488,7 @@ class F1D(Flexure):
     """
     Builds the diagonals for the coefficient array
     """
+    from scipy.sparse import spdiags
 
     ##########################################################
     # INCORPORATE BOUNDARY CONDITIONS INTO COEFFICIENT ARRAY #
@@ -364,11 +508,12 @@ class F1D(Flexure):
     if self.coeff_matrix is not None:
       pass
     elif self.BC_E == 'Periodic' and self.BC_W == 'Periodic':
-      # In this case, the boundary-condition-related stacking has already 
-      # happened inside b.c.-handling function. This is because periodic
-      # boundary conditions require extra diagonals to exist on the edges of 
-      # the solution array
-      pass
+      # Periodic boundary conditions require extra diagonals to exist on the
+      # edges of the solution array, which wrap around to the other side.
+      # These are stacked from the rolled coefficients too, so that each row
+      # holds its own node's coefficients, as in the other cases.
+      self.diags = np.vstack((self.r1,self.r2,self.l2,self.l1,self.c0,self.r1,self.r2,self.l2,self.l1))
+      self.offsets = np.array([1-self.ncolsx,2-self.ncolsx,-2,-1,0,1,2,self.ncolsx-2,self.ncolsx-1])
     else:
       self.diags = np.vstack((self.l2,self.l1,self.c0,self.r1,self.r2))
       self.offsets = np.array([-2,-1,0,1,2])
@@ -382,7 +527,7 @@ class F1D(Flexure):
     """
     if self.BC_E == 'Periodic' and self.BC_W == 'Periodic':
       # If both boundaries are periodic, we are good to go (and self-consistent)
-      pass # It is just a shift in the coeff. matrix creation.
+      pass # It is just a shift in the coeff. matrix creation (build_diagonals)
     else:
       # If only one boundary is periodic and the other doesn't implicitly 
       # involve a periodic boundary, this is illegal!
@@ -394,8 +539,6 @@ class F1D(Flexure):
                "be fixed and not include an implicit periodic boundary\n"+
                "condition makes no physical sense.\n"+
                "Please fix the input boundary conditions. Aborting.")
-    self.diags = np.vstack((self.r1,self.r2,self.l2,self.l1,self.c0,self.r1,self.r2,self.l2,self.l1))
-    self.offsets = np.array([1-self.ncolsx,2-self.ncolsx,-2,-1,0,1,2,self.ncolsx-2,self.ncolsx-1])
 
   def BC_0Displacement0Slope(self):
     """
@@ -559,6 +702,20 @@ class F1D(Flexure):
       #self.r1[i] += np.nan
       #self.r2[i] += np.nan
     
+  def fd_factorize(self):
+    """
+    Banded LU factorization of the pentadiagonal coefficient matrix, with
+    the corner entries of periodic b.c.'s by the Woodbury identity (see 
+    banded.py): linear in time and memory with the number of nodes. Falls
+    back to general sparse LU for a matrix that is not of this form.
+    """
+    try:
+      return PentadiagonalLU(self.coeff_matrix)
+    except ValueError as e:
+      if self.Debug:
+        print("Banded factorization failed (" + str(e) + "): using sparse LU")
+      return super(F1D, self).fd_factorize()
+
   def calc_max_flexural_wavelength(self):
     """
     Returns the approximate maximum flexural wavelength
@@ -593,26 +750,23 @@ class F1D(Flexure):
       print("maxFlexuralWavelength_ncells', self.maxFlexuralWavelength_ncells")
     
     if self.Solver == "iterative" or self.Solver == "Iterative":
-      if self.Debug:
-        print("Using generalized minimal residual method for iterative solution")
-      if self.Verbose:
-        print("Converging to a tolerance of", self.iterative_ConvergenceTolerance, "m between iterations")
       # qs negative so bends down with positive load, bends up with neative load 
       # (i.e. material removed)
-      w = isolve.lgmres(self.coeff_matrix, -self.qs, tol=self.iterative_ConvergenceTolerance)  
-      self.w = w[0] # Reach into tuple to get my array back
+      self.w = self.fd_iterative_solve(-self.qs, x0=self.fd_initial_guess(-self.qs))
+      self.fd_record_solution(self.w)
     else:
       if self.Solver == 'direct' or self.Solver == 'Direct':
         if self.Debug:
-          print("Using direct solution with UMFpack")
+          print("Using direct solution with cached LU factorization")
       else:
         print("Solution type not understood:")
-        print("Defaulting to direct solution with UMFpack")
-      # UMFpack is now the default, but setting true just to be sure in case
-      # anything changes
+        print("Defaulting to direct solution with cached LU factorization")
+      # The banded LU factorization (see fd_factorize) is cached, so 
+      # repeated solves with the same coefficient matrix (e.g., new loads in
+      # a coupled model) are cheap
       # qs negative so bends down with positive load, bends up with neative load 
       # (i.e. material removed)
-      self.w = spsolve(self.coeff_matrix, -self.qs, use_umfpack=True)
+      self.w = self.coeff_matrix_factorization().solve(-self.qs)
     
     if self.Debug:
       print("w.shape:")
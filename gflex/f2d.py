@@ -19,8 +19,8 @@ along with gFlex.  If not, see <http://www.gnu.org/licenses/>.
 
 from __future__ import division, print_function # No automatic floor division
 from base import *
-import scipy
-from scipy.special import kei
+from kelvin import kei
+from pointloads import PlanarKelvin, SphericalKelvin, unit_vectors
 
 # class F2D inherits Flexure and overrides __init__ therefore setting up the same
 # three parameters as class Isostasy; and it then sets up more parameters specific
@@ -78,16 +78,21 @@ class F2D(Flexure):
   ########################################
 
   def FD(self):
+    self.fd_coeff_matrix()
+    self.fd_solve()
+
+  def fd_coeff_matrix(self):
     # Only generate coefficient matrix if it is not already provided
+    # (or if the plate has changed since it was built here)
+    self.coeff_matrix_check()
     if self.coeff_matrix is not None:
       pass
     else:
       self.elasprep()
       self.BC_selector_and_coeff_matrix_creator()
-    self.fd_solve()
 
   def FFT(self):
-    sys.exit("The fast Fourier transform solution method is not yet implemented.")
+    self.fft_solve()
 
   def SAS(self):
     self.spatialDomainVarsSAS()
@@ -125,53 +130,149 @@ class F2D(Flexure):
     # This pre-prepared solution will be for a unit load
     bigshape = 2*self.ny+1,2*self.nx+1 # Tuple shape
 
-    dist_ny = np.arange(bigshape[0]) - self.ny
-    dist_nx = np.arange(bigshape[1]) - self.nx
-
-    dist_x,dist_y = np.meshgrid(dist_nx*self.dx,dist_ny*self.dy)
-
-    bigdist = np.sqrt(dist_x**2 + dist_y**2) # Distances from center
-                                          # Center at [ny,nx]
+    # Now compute the deflections: the sum over all loaded cells of the
+    # unit-load solution centered on each of them, scaled by the load
+    # (multiplied by grid cell area), is the convolution of the loads with
+    # "biggrid". This is done by zero-padded FFTs. The shift of the solution
+    # to cell [j,i] is biggrid[ny-j:2*ny-j,nx-i:2*nx-i], so output cell [j,i]
+    # is at [ny+j, nx+i] in the convolution; padding to at least the size of
+    # biggrid keeps these cells free of any circular wrap-around.
+    from scipy.fftpack import next_fast_len
+    fftshape = next_fast_len(bigshape[0]), next_fast_len(bigshape[1])
+
+    # The transform of "biggrid" depends only on the grid and the plate, so
+    # it may be kept for later runs (e.g., of a time series) and shared 
+    # between model objects (see share_operators)
+    key = ('SAS kernel', bigshape, self.dx, self.dy, self.alpha, self.coeff)
+    kernel = None
+    if getattr(self, 'sas_kernel_of', None) == key:
+      kernel = self.sas_kernel
+    if kernel is None:
+      kernel = self.shared_get(key)
+    if kernel is None:
+      dist_ny = np.arange(bigshape[0]) - self.ny
+      dist_nx = np.arange(bigshape[1]) - self.nx
+
+      dist_x,dist_y = np.meshgrid(dist_nx*self.dx,dist_ny*self.dy)
+
+      bigdist = np.sqrt(dist_x**2 + dist_y**2) # Distances from center
+                                            # Center at [ny,nx]
     
-    biggrid = self.coeff * kei(bigdist/self.alpha) # Kelvin fcn solution
-
-    # Now compute the deflections
-    self.w = np.zeros((self.ny,self.nx)) # Deflection array
-    for i in range(self.nx):
-      for j in range(self.ny):
-        # Loop over locations that have loads, and sum
-        if self.qs[j,i]:
-          # Solve by summing portions of "biggrid" while moving origin
-          # to location of current cell
-          # Load must be multiplied by grid cell size
-          self.w += self.qs[j,i] * self.dx * self.dy \
-             * biggrid[self.ny-j:2*self.ny-j,self.nx-i:2*self.nx-i]
-      # No need to return: w already belongs to "self"
+      biggrid = self.coeff * kei(bigdist/self.alpha) # Kelvin fcn solution
+      kernel = np.fft.rfft2(biggrid, fftshape)
+      self.shared_put(key, kernel)
+    self.sas_kernel = kernel
+    self.sas_kernel_of = key
+
+    qhat = np.fft.rfft2(self.qs * self.dx * self.dy, fftshape)
+    qhat *= kernel
+    self.w = np.fft.irfft2(qhat, fftshape)[self.ny:2*self.ny, self.nx:2*self.nx]
+    # No need to return: w already belongs to "self"
 
   # NO GRID
 
   def spatialDomainNoGrid(self):
 
-    self.w = np.zeros(self.xw.shape)
+    # Truncation of the sum over loads: beyond a radius [m], or beyond the 
+    # radius at which the deflection that is left out is less than a
+    # tolerance [m]. With neither, all loads act on all points.
+    self.configDefault("float", "numerical2D", "SAS_NG_TruncationRadius", None)
+    self.configDefault("float", "numerical2D", "SAS_NG_TruncationTolerance", None)
+    if self.SAS_NG_TruncationRadius is not None \
+       or self.SAS_NG_TruncationTolerance is not None:
+      self.spatialDomainNoGridTruncated()
+      return
+
+    if self.latlon:
+      # Loads and points as unit vectors, found once
+      kernel = SphericalKelvin(self.PlanetaryRadius/self.alpha)
+      sources = unit_vectors(self.x, self.y)
+      points = unit_vectors(np.ravel(self.xw), np.ravel(self.yw))
+    else:
+      kernel = PlanarKelvin()
+      # Distances in units of the flexural parameter
+      sources = np.column_stack((self.x, self.y)) / self.alpha
+      points = np.column_stack((np.ravel(self.xw), np.ravel(self.yw))) / self.alpha
+    w = self.superposition(kernel, self.coeff * np.asarray(self.q), sources, points)
+    self.w = w.reshape(np.shape(self.xw))
     if self.Debug:
       print("w = ")
       print(self.w.shape)
-    
+
+  def spatialDomainNoGridTruncated(self):
+    """
+    SAS_NG, summing the response to each load only at the output points
+    within the truncation radius of it. These are found with a k-d tree
+    (scipy.spatial.cKDTree) of the output points, so the cost scales with
+    the number of load-point pairs within the radius, rather than with the
+    number of loads times the number of points.
+
+    |kei(x)| is less than sqrt(pi/(2x)) exp(-x/sqrt(2)) for all x, which 
+    decreases with x. The deflection that is left out at any point is 
+    therefore less than coeff * (sum of |q|) times this at the truncation 
+    radius; this bound [m] is stored as SAS_NG_truncation_error. If a
+    tolerance is given, the radius is increased until the bound meets it.
+    """
+    from scipy.spatial import cKDTree
+    from scipy.optimize import brentq
+    loaded = self.q != 0
+    q = self.q[loaded]
+    def log_bound(r):
+      # Logarithm of the largest neglected deflection for a truncation 
+      # radius r
+      if r <= 0:
+        return np.inf
+      x = r / self.alpha
+      return np.log(self.coeff * np.sum(np.abs(q))) + 0.5*np.log(np.pi/(2*x)) - x/np.sqrt(2)
+    radius = 0.
+    if self.SAS_NG_TruncationRadius is not None:
+      radius = self.SAS_NG_TruncationRadius
+    if self.SAS_NG_TruncationTolerance is not None and len(q) \
+       and log_bound(radius) > np.log(self.SAS_NG_TruncationTolerance):
+      # This decreases steadily with the radius
+      target = np.log(self.SAS_NG_TruncationTolerance)
+      radius = brentq(lambda r: log_bound(r) - target, 1E-12*self.alpha, 1E4*self.alpha)
+    if len(q):
+      self.SAS_NG_truncation_error = np.exp(log_bound(radius))
+    else:
+      self.SAS_NG_truncation_error = 0.
+
     if self.latlon:
-      for i in range(len(self.x)):
-        # More efficient if we have created some 0-load points
-        # (e.g., for where we want output)
-        if self.q[i] != 0:
-          # Create array of distances from point of load
-          r = self.greatCircleDistance(lat1=self.y[i], long1=self.x[i], lat2=self.yw, long2=self.xw, radius=self.PlanetaryRadius)
-          self.w += self.q[i] * self.coeff * kei(r/self.alpha)
-          # Compute and sum deflection
-          self.w += self.q[i] * self.coeff * kei(r/self.alpha)
+      # Points on the sphere: great-circle distance is a monotonic function
+      # of the chord length, which the tree measures
+      def points(lon, lat):
+        return self.PlanetaryRadius * unit_vectors(lon, lat)
+      radius = min(radius, np.pi*self.PlanetaryRadius)
+      search = 2*self.PlanetaryRadius * np.sin(radius / (2*self.PlanetaryRadius))
+      def distance(chord):
+        return 2*self.PlanetaryRadius * np.arcsin(np.minimum(chord / (2*self.PlanetaryRadius), 1.))
     else:
-      for i in range(len(self.x)):
-        if self.q[i] != 0:
-          r = ( (self.xw - self.x[i])**2 + (self.yw - self.y[i])**2 )**.5
-          self.w += self.q[i] * self.coeff * kei(r/self.alpha)
+      def points(x, y):
+        return np.column_stack((x, y))
+      search = radius
+      def distance(r):
+        return r
+    tree = cKDTree(points(np.ravel(self.xw), np.ravel(self.yw)))
+    sources = points(self.x[loaded], self.y[loaded])
+
+    # Loads are taken in groups with up to "block" load-point pairs within 
+    # the radius, to bound the memory that these take (see superposition)
+    self.configDefault("float", "numerical", "SAS_NG_block_bytes", 2.**22)
+    block = max(1, int(self.SAS_NG_block_bytes // self.SAS_NG_pair_bytes))
+    w = np.zeros(tree.n)
+    if len(q):
+      pairs = tree.query_ball_point(sources, search, return_length=True)
+      group = np.cumsum(pairs) // block
+      for k in np.unique(group):
+        members = np.flatnonzero(group == k)
+        near = cKDTree(sources[members]).sparse_distance_matrix(tree, search,
+                                                                output_type='ndarray')
+        w += np.bincount(near['j'], minlength=tree.n,
+                         weights=q[members][near['i']] * self.coeff * kei(distance(near['v'])/self.alpha))
+    self.w = w.reshape(np.shape(self.xw))
+    if self.Quiet == False:
+      print("SAS_NG truncated at", radius, "m: deflection left out <", \
+            self.SAS_NG_truncation_error, "m")
 
   ## FINITE DIFFERENCE
   ######################
@@ -225,15 +326,48 @@ class F2D(Flexure):
     # array
     self.BC_Rigidity()
     
-    # Second, build the coefficient arrays -- with the rigidity b.c.'s
-    self.get_coeff_values()
-    
-    # Third, apply boundary conditions to the coeff_arrays to create the 
-    # flexural solution
-    self.BC_Flexure()
-    
-    # Fourth, construct the sparse diagonal array
-    self.build_diagonals()
+    # 'stencil' (default) builds the sparse matrix directly from the stencil;
+    # 'diagonals' builds it from full-grid arrays of each diagonal, as 
+    # described above. These give the same matrix. For a plate of uniform
+    # elastic thickness, 'stencil' combines 1D operators instead (see 
+    # build_kron). 'matrixfree' builds no matrix, but an operator that 
+    # applies the stencil (see build_operator).
+    self.configDefault("string", "numerical2D", "Assembly", 'stencil')
+    if self.Assembly == 'matrixfree':
+      # No matrix: the operator applies the stencil on demand
+      if self.Solver != 'iterative' and self.Solver != 'Iterative':
+        sys.exit("Assembly = 'matrixfree' requires Solver = 'iterative'. Exiting.")
+      self.build_operator()
+    elif self.Assembly != 'stencil' and self.Assembly != 'diagonals':
+      sys.exit("Assembly must be 'stencil', 'diagonals', or 'matrixfree'. Exiting.")
+    elif self.Assembly == 'diagonals' and \
+         (self.BC_W == 'Periodic' or self.BC_E == 'Periodic'):
+      # The wrap-around coefficients of the diagonals are misplaced across
+      # a periodic E-W boundary (the solution does not move with the plate)
+      sys.exit("Assembly = 'diagonals' does not support periodic E-W boundary\n"+\
+               "conditions; use Assembly = 'stencil'. Exiting.")
+    elif self.coeff_matrix_load():
+      # Built by an earlier run, and kept in the on-disk cache
+      pass
+    else:
+      if self.Assembly == 'stencil':
+        if np.isscalar(self.Te) or (self.Te == self.Te.flat[0]).all():
+          # Uniform elastic thickness: the operator separates by axis
+          self.build_kron()
+        else:
+          self.build_stencil()
+      else:
+        # Second, build the coefficient arrays -- with the rigidity b.c.'s
+        self.get_coeff_values()
+      
+        # Third, apply boundary conditions to the coeff_arrays to create the 
+        # flexural solution
+        self.BC_Flexure()
+      
+        # Fourth, construct the sparse diagonal array
+        self.build_diagonals()
+      self.coeff_matrix_save()
+    self.coeff_matrix_record()
 
     # Finally, compute the total time this process took    
     self.coeff_creation_time = time.time() - self.coeff_start_time
@@ -292,9 +426,9 @@ class F2D(Flexure):
     if np.isscalar(self.Te):
       self.D *= np.ones(self.qs.shape) # And leave Te as a scalar for checks
     else:
-      self.Te_unpadded = self.Te.copy()
-      self.Te = np.hstack(( np.nan*np.zeros((self.Te.shape[0], 1)), self.Te, np.nan*np.zeros((self.Te.shape[0], 1)) ))
-      self.Te = np.vstack(( np.nan*np.zeros(self.Te.shape[1]), self.Te, np.nan*np.zeros(self.Te.shape[1]) ))
+      # Te itself is left unpadded: only D enters the coefficients, and the
+      # unpadded Te is needed to tell whether the plate changes between runs
+      self.Te_unpadded = self.Te
       self.D = np.hstack(( np.nan*np.zeros((self.D.shape[0], 1)), self.D, np.nan*np.zeros((self.D.shape[0], 1)) ))
       self.D = np.vstack(( np.nan*np.zeros(self.D.shape[1]), self.D, np.nan*np.zeros(self.D.shape[1]) ))
 
@@ -322,36 +456,41 @@ class F2D(Flexure):
     if self.BC_Rigidity_W == "periodic":
       self.D[:,0] = self.D[:,-2]
     if self.BC_Rigidity_E == "periodic":
-      self.D[:,-1] = self.D[:,-3]
+      self.D[:,-1] = self.D[:,1]
     if self.BC_Rigidity_N == "periodic":
       self.D[0,:] = self.D[-2,:]
     if self.BC_Rigidity_S == "periodic":
-      self.D[-1,:] = self.D[-3,:]
+      self.D[-1,:] = self.D[1,:]
       
-  def get_coeff_values(self):
+  def stencil_coefficients(self, out=None, cells=None, apply=None):
     """
-    Calculates the matrix of coefficients that is later used via sparse matrix
-    solution techniques (scipy.sparse.linalg.spsolve) to compute the flexural
-    response to the load. This step need only be performed once, and the
-    coefficient matrix can very rapidly compute flexural solutions to any load.
-    This makes this particularly good for probelms with time-variable loads or 
-    that require iteration (e.g., water loading, in which additional water 
-    causes subsidence, causes additional water detph, etc.).
-
-    These must be linearly combined to solve the equation.
-
-    13 coefficients: 13 matrices of the same size as the load
+    Calculates the 13 finite difference stencil coefficients at each cell,
+    before any boundary conditions are applied, and returns them as a 
+    dictionary of arrays of the same shape as the load, keyed by the names
+    used in get_coeff_values (e.g., "cj0i_2").
     
-    NOTATION FOR COEFFICIENT BIULDING MATRICES (e.g., "cj0i_2"):
-    c = "coefficient
-    j = columns = x-value
-    j0 = no offset: look at center of array
-    i = rows = y-value
-    i_2 = negative 2 offset (i2 = positive 2 offset)
+    If "out" is given, it is a dictionary of arrays (or array views) with the
+    same keys, and the coefficients are written into these in place, one at 
+    a time.
+
+    "cells" is an optional pair of slices (rows, columns) that restricts the
+    calculation to a block of the grid. If "apply" is given, it is called as
+    apply(name, coefficients) for each coefficient in turn, and nothing is
+    stored.
     """
 
     # don't want to keep typing "self." everwhere!
-    D = self.D
+    ny, nx = self.qs.shape
+    if cells is None:
+      cells = (slice(0, ny), slice(0, nx))
+    i0, i1 = cells[0].indices(ny)[:2]
+    j0, j1 = cells[1].indices(nx)[:2]
+    shape = (i1 - i0, j1 - j0)
+    if np.isscalar(self.Te):
+      D = self.D[i0:i1, j0:j1]
+    else:
+      # Padded by one cell on each side
+      D = self.D[i0:i1+2, j0:j1+2]
     drho = self.drho
     dx4 = self.dx4
     dy4 = self.dy4
@@ -359,51 +498,33 @@ class F2D(Flexure):
     nu = self.nu
     g = self.g
 
+    if out is None:
+      out = {}
+    def put(name, value):
+      if apply is not None:
+        apply(name, value)
+      elif name in out:
+        out[name][...] = value
+      else:
+        out[name] = value * np.ones(shape)
+
     if np.isscalar(self.Te):
       # So much simpler with constant D! And symmetrical stencil
-      self.cj2i0 = D/dy4
-      self.cj1i_1 = 2*D/dx2dy2
-      self.cj1i0 = -4*D/dy4 - 4*D/dx2dy2
-      self.cj1i1 = 2*D/dx2dy2
-      self.cj0i_2 = D/dx4
-      self.cj0i_1 = -4*D/dx4 - 4*D/dx2dy2
-      self.cj0i0 = 6*D/dx4 + 6*D/dy4 + 8*D/dx2dy2 + drho*g
-      self.cj0i1 = -4*D/dx4 - 4*D/dx2dy2 # Symmetry
-      self.cj0i2 = D/dx4 # Symmetry
-      self.cj_1i_1 = 2*D/dx2dy2 # Symmetry
-      self.cj_1i0 = -4*D/dy4 - 4*D/dx2dy2 # Symmetry
-      self.cj_1i1 = 2*D/dx2dy2 # Symmetry
-      self.cj_2i0 = D/dy4 # Symmetry
-      # Bring up to size
-      self.cj2i0 *= np.ones(self.qs.shape)
-      self.cj1i_1 *= np.ones(self.qs.shape)
-      self.cj1i0 *= np.ones(self.qs.shape)
-      self.cj1i1 *= np.ones(self.qs.shape)
-      self.cj0i_2 *= np.ones(self.qs.shape)
-      self.cj0i_1 *= np.ones(self.qs.shape)
-      self.cj0i0 *= np.ones(self.qs.shape)
-      self.cj0i1 *= np.ones(self.qs.shape)
-      self.cj0i2 *= np.ones(self.qs.shape)
-      self.cj_1i_1 *= np.ones(self.qs.shape)
-      self.cj_1i0 *= np.ones(self.qs.shape)
-      self.cj_1i1 *= np.ones(self.qs.shape)
-      self.cj_2i0 *= np.ones(self.qs.shape)
-      # Create coefficient arrays to manage boundary conditions
-      self.cj2i0_coeff_ij = self.cj2i0.copy()
-      self.cj1i_1_coeff_ij = self.cj1i_1.copy()
-      self.cj1i0_coeff_ij = self.cj1i0.copy()
-      self.cj1i1_coeff_ij = self.cj1i1.copy()
-      self.cj0i_2_coeff_ij = self.cj0i_2.copy()
-      self.cj0i_1_coeff_ij = self.cj0i_1.copy()
-      self.cj0i0_coeff_ij = self.cj0i0.copy()
-      self.cj0i1_coeff_ij = self.cj0i1.copy()
-      self.cj0i2_coeff_ij = self.cj0i2.copy()
-      self.cj_1i_1_coeff_ij = self.cj_1i_1.copy()
-      self.cj_1i0_coeff_ij = self.cj_1i0.copy()
-      self.cj_1i1_coeff_ij = self.cj_1i1.copy()
-      self.cj_2i0_coeff_ij = self.cj_2i0.copy()
+      put('cj2i0', D/dx4)
+      put('cj1i_1', 2*D/dx2dy2)
+      put('cj1i0', -4*D/dx4 - 4*D/dx2dy2)
+      put('cj1i1', 2*D/dx2dy2)
+      put('cj0i_2', D/dy4)
+      put('cj0i_1', -4*D/dy4 - 4*D/dx2dy2)
+      put('cj0i0', 6*D/dx4 + 6*D/dy4 + 8*D/dx2dy2 + drho*g)
+      put('cj0i1', -4*D/dy4 - 4*D/dx2dy2) # Symmetry
+      put('cj0i2', D/dy4) # Symmetry
+      put('cj_1i_1', 2*D/dx2dy2) # Symmetry
+      put('cj_1i0', -4*D/dx4 - 4*D/dx2dy2) # Symmetry
+      put('cj_1i1', 2*D/dx2dy2) # Symmetry
+      put('cj_2i0', D/dx4) # Symmetry
       
-    elif type(self.Te) == np.ndarray:
+    elif isinstance(self.Te, np.ndarray):
     
       #######################################################
       # GENERATE COEFFICIENT VALUES FOR EACH SOLUTION TYPE. #
@@ -434,34 +555,34 @@ class F2D(Flexure):
         # using a central difference approx. to 2nd order precision
         # NEW STENCIL
         # x = -2, y = 0
-        self.cj_2i0_coeff_ij = (D0 - Dx) / dx4
+        put('cj_2i0', (D0 - Dx) / dx4)
         # x = 0, y = -2
-        self.cj0i_2_coeff_ij = (D0 - Dy) / dy4
+        put('cj0i_2', (D0 - Dy) / dy4)
         # x = 0, y = 2
-        self.cj0i2_coeff_ij = (D0 + Dy) / dy4
+        put('cj0i2', (D0 + Dy) / dy4)
         # x = 2, y = 0
-        self.cj2i0_coeff_ij = (D0 + Dx) / dx4
+        put('cj2i0', (D0 + Dx) / dx4)
         # x = -1, y = -1
-        self.cj_1i_1_coeff_ij = (2.*D0 - Dx - Dy + Dxy*(1-nu)/2.) / dx2dy2
+        put('cj_1i_1', (2.*D0 - Dx - Dy + Dxy*(1-nu)/2.) / dx2dy2)
         # x = -1, y = 1
-        self.cj_1i1_coeff_ij = (2.*D0 - Dx + Dy - Dxy*(1-nu)/2.) / dx2dy2
+        put('cj_1i1', (2.*D0 - Dx + Dy - Dxy*(1-nu)/2.) / dx2dy2)
         # x = 1, y = -1
-        self.cj1i_1_coeff_ij = (2.*D0 + Dx - Dy - Dxy*(1-nu)/2.) / dx2dy2
+        put('cj1i_1', (2.*D0 + Dx - Dy - Dxy*(1-nu)/2.) / dx2dy2)
         # x = 1, y = 1
-        self.cj1i1_coeff_ij = (2.*D0 + Dx + Dy + Dxy*(1-nu)/2.) / dx2dy2
+        put('cj1i1', (2.*D0 + Dx + Dy + Dxy*(1-nu)/2.) / dx2dy2)
         # x = -1, y = 0
-        self.cj_1i0_coeff_ij = (-4.*D0 + 2.*Dx + Dxx)/dx4 + (-4.*D0 + 2.*Dx + nu*Dyy)/dx2dy2
+        put('cj_1i0', (-4.*D0 + 2.*Dx + Dxx)/dx4 + (-4.*D0 + 2.*Dx + nu*Dyy)/dx2dy2)
         # x = 0, y = -1
-        self.cj0i_1_coeff_ij = (-4.*D0 + 2.*Dy + Dyy)/dy4 + (-4.*D0 + 2.*Dy + nu*Dxx)/dx2dy2
+        put('cj0i_1', (-4.*D0 + 2.*Dy + Dyy)/dy4 + (-4.*D0 + 2.*Dy + nu*Dxx)/dx2dy2)
         # x = 0, y = 1
-        self.cj0i1_coeff_ij = (-4.*D0 - 2.*Dy + Dyy)/dy4 + (-4.*D0 - 2.*Dy + nu*Dxx)/dx2dy2
+        put('cj0i1', (-4.*D0 - 2.*Dy + Dyy)/dy4 + (-4.*D0 - 2.*Dy + nu*Dxx)/dx2dy2)
         # x = 1, y = 0
-        self.cj1i0_coeff_ij = (-4.*D0 - 2.*Dx + Dxx)/dx4 + (-4.*D0 - 2.*Dx + nu*Dyy)/dx2dy2
+        put('cj1i0', (-4.*D0 - 2.*Dx + Dxx)/dx4 + (-4.*D0 - 2.*Dx + nu*Dyy)/dx2dy2)
         # x = 0, y = 0
-        self.cj0i0_coeff_ij = (6.*D0 - 2.*Dxx)/dx4 \
+        put('cj0i0', (6.*D0 - 2.*Dxx)/dx4 \
                      + (6.*D0 - 2.*Dyy)/dy4 \
                      + (8.*D0 - 2.*nu*Dxx - 2.*nu*Dyy)/dx2dy2 \
-                     + drho*g
+                     + drho*g)
                      
       elif self.PlateSolutionType == 'G2009':
         # STENCIL FROM GOVERS ET AL. 2009 -- first-order differences
@@ -469,66 +590,70 @@ class F2D(Flexure):
         # Note that this breaks down with b.c.'s that place too much control 
         # on the solution -- harmonic wavetrains
         # x = -2, y = 0
-        self.cj_2i0_coeff_ij = D_10/dx4
+        put('cj_2i0', D_10/dx4)
         # x = -1, y = -1
-        self.cj_1i_1_coeff_ij = (D_10 + D0_1)/dx2dy2
+        put('cj_1i_1', (D_10 + D0_1)/dx2dy2)
         # x = -1, y = 0
-        self.cj_1i0_coeff_ij = -2. * ( (D0_1 + D00)/dx2dy2 + (D00 + D_10)/dx4 )
+        put('cj_1i0', -2. * ( (D0_1 + D00)/dx2dy2 + (D00 + D_10)/dx4 ))
         # x = -1, y = 1
-        self.cj_1i1_coeff_ij = (D_10 + D01)/dx2dy2
+        put('cj_1i1', (D_10 + D01)/dx2dy2)
         # x = 0, y = -2
-        self.cj0i_2_coeff_ij = D0_1/dy4
+        put('cj0i_2', D0_1/dy4)
         # x = 0, y = -1
-        self.cj0i_1_coeff_ij = -2. * ( (D0_1 + D00)/dx2dy2 + (D00 + D0_1)/dy4)
+        put('cj0i_1', -2. * ( (D0_1 + D00)/dx2dy2 + (D00 + D0_1)/dy4))
         # x = 0, y = 0
-        self.cj0i0_coeff_ij = (D10 + 4.*D00 + D_10)/dx4 + (D01 + 4.*D00 + D0_1)/dy4 + (8.*D00/dx2dy2) + drho*g
+        put('cj0i0', (D10 + 4.*D00 + D_10)/dx4 + (D01 + 4.*D00 + D0_1)/dy4 + (8.*D00/dx2dy2) + drho*g)
         # x = 0, y = 1
-        self.cj0i1_coeff_ij = -2. * ( (D01 + D00)/dy4 + (D00 + D01)/dx2dy2 )
+        put('cj0i1', -2. * ( (D01 + D00)/dy4 + (D00 + D01)/dx2dy2 ))
         # x = 0, y = 2
-        self.cj0i2_coeff_ij = D0_1/dy4
+        put('cj0i2', D0_1/dy4)
         # x = 1, y = -1
-        self.cj1i_1_coeff_ij = (D10+D0_1)/dx2dy2
+        put('cj1i_1', (D10+D0_1)/dx2dy2)
         # x = 1, y = 0
-        self.cj1i0_coeff_ij = -2. * ( (D10 + D00)/dx4 + (D10 + D00)/dx2dy2 )
+        put('cj1i0', -2. * ( (D10 + D00)/dx4 + (D10 + D00)/dx2dy2 ))
         # x = 1, y = 1
-        self.cj1i1_coeff_ij = (D10 + D01)/dx2dy2
+        put('cj1i1', (D10 + D01)/dx2dy2)
         # x = 2, y = 0
-        self.cj2i0_coeff_ij = D10/dx4
+        put('cj2i0', D10/dx4)
       else:
         sys.exit("Not an acceptable plate solution type. Please choose from:\n"+
                   "* vWC1994\n"+
                   "* G2009\n"+
                   "")
-                  
-      ################################################################
-      # CREATE COEFFICIENT ARRAYS: PLAIN, WITH NO B.C.'S YET APPLIED #
-      ################################################################
-      # x = -2, y = 0
-      self.cj_2i0 = self.cj_2i0_coeff_ij.copy()
-      # x = -1, y = -1
-      self.cj_1i_1 = self.cj_1i_1_coeff_ij.copy()
-      # x = -1, y = 0
-      self.cj_1i0 = self.cj_1i0_coeff_ij.copy()
-      # x = -1, y = 1
-      self.cj_1i1 = self.cj_1i1_coeff_ij.copy()
-      # x = 0, y = -2
-      self.cj0i_2 = self.cj0i_2_coeff_ij.copy()
-      # x = 0, y = -1
-      self.cj0i_1 = self.cj0i_1_coeff_ij.copy()
-      # x = 0, y = 0
-      self.cj0i0 = self.cj0i0_coeff_ij.copy()
-      # x = 0, y = 1
-      self.cj0i1 = self.cj0i1_coeff_ij.copy()
-      # x = 0, y = 2
-      self.cj0i2 = self.cj0i2_coeff_ij.copy()
-      # x = 1, y = -1
-      self.cj1i_1 = self.cj1i_1_coeff_ij.copy()
-      # x = 1, y = 0
-      self.cj1i0 = self.cj1i0_coeff_ij.copy()
-      # x = 1, y = 1
-      self.cj1i1 = self.cj1i1_coeff_ij.copy()
-      # x = 2, y = 0
-      self.cj2i0 = self.cj2i0_coeff_ij.copy()
+
+    return out
+
+  def get_coeff_values(self):
+    """
+    Calculates the matrix of coefficients that is later used via sparse matrix
+    solution techniques (scipy.sparse.linalg.spsolve) to compute the flexural
+    response to the load. This step need only be performed once, and the
+    coefficient matrix can very rapidly compute flexural solutions to any load.
+    This makes this particularly good for probelms with time-variable loads or 
+    that require iteration (e.g., water loading, in which additional water 
+    causes subsidence, causes additional water detph, etc.).
+
+    These must be linearly combined to solve the equation.
+
+    13 coefficients: 13 matrices of the same size as the load
+    
+    NOTATION FOR COEFFICIENT BIULDING MATRICES (e.g., "cj0i_2"):
+    c = "coefficient
+    j = columns = x-value
+    j0 = no offset: look at center of array
+    i = rows = y-value
+    i_2 = negative 2 offset (i2 = positive 2 offset)
+    """
+
+    ################################################################
+    # CREATE COEFFICIENT ARRAYS: PLAIN, WITH NO B.C.'S YET APPLIED #
+    ################################################################
+    # Keep an unaltered copy of each ("_coeff_ij") to manage boundary 
+    # conditions
+    coeffs = self.stencil_coefficients()
+    for name in coeffs:
+      setattr(self, name+'_coeff_ij', coeffs[name])
+      setattr(self, name, coeffs[name].copy())
 
     # Provide rows and columns in the 2D input to later functions
     self.ncolsx = self.cj0i0.shape[1]
@@ -1246,6 +1371,7 @@ class F2D(Flexure):
     # Nothing to be done here.
 
   def build_diagonals(self):
+    from scipy import sparse
 
     ##########################################################
     # INCORPORATE BOUNDARY CONDITIONS INTO COEFFICIENT ARRAY #
@@ -1387,7 +1513,7 @@ class F2D(Flexure):
                      ]
 
       # create banded sparse matrix
-      self.coeff_matrix = scipy.sparse.spdiags(self.diags, self.offsets,
+      self.coeff_matrix = sparse.spdiags(self.diags, self.offsets,
         self.ny*self.nx, self.ny*self.nx, format='csr') 
     
     elif (self.BC_W == 'Periodic' and self.BC_E == 'Periodic'):
@@ -1438,7 +1564,7 @@ class F2D(Flexure):
                       2*self.nx]
 
       # create banded sparse matrix
-      self.coeff_matrix = scipy.sparse.spdiags(self.diags, self.offsets,
+      self.coeff_matrix = sparse.spdiags(self.diags, self.offsets,
         self.ny*self.nx, self.ny*self.nx, format='csr') 
     
     elif (self.BC_N == 'Periodic' and self.BC_S == 'Periodic'):
@@ -1459,7 +1585,7 @@ class F2D(Flexure):
       #      Lower left
       #      Middle
       #      Upper right
-      self.coeff_matrix = scipy.sparse.spdiags(self.diags, [self.nx-self.ny*self.nx-1, self.nx-self.ny*self.nx, self.nx-self.ny*self.nx+1, 2*self.nx-self.ny*self.nx,
+      self.coeff_matrix = sparse.spdiags(self.diags, [self.nx-self.ny*self.nx-1, self.nx-self.ny*self.nx, self.nx-self.ny*self.nx+1, 2*self.nx-self.ny*self.nx,
                                                             -2*self.nx, -self.nx-1, -self.nx, -self.nx+1, -2, -1, 0, 1, 2, self.nx-1, self.nx, self.nx+1, 2*self.nx,
                                                             self.ny*self.nx-2*self.nx, self.ny*self.nx-self.nx-1, self.ny*self.nx-self.nx, self.ny*self.nx-self.nx+1],
                                                             self.ny*self.nx, self.ny*self.nx, format='csr')
@@ -1474,7 +1600,416 @@ class F2D(Flexure):
                                Up1,
                                Up2 ))
       # Create banded sparse matrix
-      self.coeff_matrix = scipy.sparse.spdiags(self.diags, [-2*self.nx, -self.nx-1, -self.nx, -self.nx+1, -2, -1, 0, 1, 2, self.nx-1, self.nx, self.nx+1, 2*self.nx], self.ny*self.nx, self.ny*self.nx, format='csr') # create banded sparse matrix
+      self.coeff_matrix = sparse.spdiags(self.diags, [-2*self.nx, -self.nx-1, -self.nx, -self.nx+1, -2, -1, 0, 1, 2, self.nx-1, self.nx, self.nx+1, 2*self.nx], self.ny*self.nx, self.ny*self.nx, format='csr') # create banded sparse matrix
+
+  # Finite difference stencil: name of each coefficient array and its 
+  # (x, y) offset, in the order in which they fall along a row of the
+  # coefficient matrix
+  stencil = [('cj0i_2', 0, -2), ('cj_1i_1', -1, -1), ('cj0i_1', 0, -1), ('cj1i_1', 1, -1),
+             ('cj_2i0', -2, 0), ('cj_1i0', -1, 0), ('cj0i0', 0, 0), ('cj1i0', 1, 0), ('cj2i0', 2, 0),
+             ('cj_1i1', -1, 1), ('cj0i1', 0, 1), ('cj1i1', 1, 1), ('cj0i2', 0, 2)]
+
+  # Boundary condition weights at the western edge, used by BC_stencil and
+  # line_matrix. For each b.c., there is a list for the cells along the edge
+  # and one for the next cells in. Each entry of these is (source, 
+  # destination, factor): factor * source coefficient is added to the 
+  # destination coefficient.
+  free_W = [('cj_2i0', 'cj2i0', 1), ('cj_1i0', 'cj1i0', 1),
+            ('cj_1i_1', 'cj1i_1', 1), ('cj_1i1', 'cj1i1', 1)]
+  BC_weights_W = {
+    '0Displacement0Slope': [[], []],
+    '0Moment0Shear': [[('cj_2i0', 'cj0i0', 4), ('cj_2i0', 'cj1i0', -4), ('cj_2i0', 'cj2i0', 1),
+                       ('cj_1i0', 'cj0i0', 2), ('cj_1i0', 'cj1i0', -1),
+                       ('cj_1i_1', 'cj0i_1', 2), ('cj_1i_1', 'cj1i_1', -1),
+                       ('cj_1i1', 'cj0i1', 2), ('cj_1i1', 'cj1i1', -1)],
+                      [('cj_2i0', 'cj_1i0', 2), ('cj_2i0', 'cj1i0', -2), ('cj_2i0', 'cj2i0', 1)]],
+    '0Slope0Shear': [free_W, [('cj_2i0', 'cj2i0', 1)]],
+    'Mirror': [free_W, [('cj_2i0', 'cj0i0', 1)]]
+    }
+  del free_W
+
+  def build_stencil(self):
+    """
+    Builds the coefficient matrix directly in compressed sparse row form.
+    
+    Each row of the matrix holds the (up to) 13 stencil coefficients of one
+    cell, so the coefficients are computed into an (ny, nx, 13) array and
+    the column of each is found by index arithmetic. Where the stencil 
+    reaches beyond the edge of the grid, its coefficient is moved onto cells
+    inside the grid by the boundary conditions (BC_stencil), and periodic
+    boundaries wrap the column indices around. This gives the same matrix as
+    get_coeff_values, BC_Flexure, and build_diagonals, without the 
+    full-grid copies, rolled arrays, and stacked diagonals that those use.
+    """
+    ny, nx = self.qs.shape
+    self.ny = self.nrowsy = ny
+    self.nx = self.ncolsx = nx
+    
+    # Coefficients, with no b.c.'s applied
+    values = self.stencil_values()
+    
+    # Boundary conditions
+    self.BC_stencil(values)
+
+    self.coeff_matrix = self.stencil_matrix(values, np.arange(ny).reshape(-1, 1),
+                                            np.arange(nx).reshape(1, -1))
+
+  def stencil_values(self, cells=None):
+    """
+    Returns the stencil coefficients (see stencil_coefficients) as an
+    (ny, nx, 13) array, in the order of "stencil", for all cells or for the
+    block given by "cells"
+    """
+    names = [name for name, dx, dy in self.stencil]
+    if cells is None:
+      shape = self.qs.shape
+    else:
+      shape = tuple(len(range(*c.indices(n))) for c, n in zip(cells, self.qs.shape))
+    values = np.empty(shape + (len(self.stencil),))
+    self.stencil_coefficients(out=dict( (name, values[:,:,k]) for k, name in enumerate(names) ),
+                              cells=cells)
+    return values
+
+  def stencil_matrix(self, values, i, j):
+    """
+    Returns the rows of the coefficient matrix for the cells in rows i and
+    columns j (broadcastable integer arrays) of the grid, as a CSR matrix,
+    given their stencil coefficients with the b.c.'s applied
+    """
+    from scipy import sparse
+    ny, nx = self.qs.shape
+    periodic_x = self.BC_W == 'Periodic'
+    periodic_y = self.BC_N == 'Periodic'
+    if ny*nx*len(self.stencil) < 2**31:
+      index_type = np.int32
+    else:
+      index_type = np.int64
+    # Column indices
+    cols = np.empty(values.shape, dtype=index_type)
+    for k, (name, dx, dy) in enumerate(self.stencil):
+      ik = i + dy
+      jk = j + dx
+      if periodic_y:
+        ik %= ny
+      if periodic_x:
+        jk %= nx
+      outside = (ik < 0) | (ik >= ny) | (jk < 0) | (jk >= nx)
+      cols[:,:,k] = np.where(outside, -1, ik*nx + jk)
+    
+    # Compress: drop entries that fall outside the grid (these have been
+    # handled by the b.c.'s) and zeros
+    nrows = values.shape[0] * values.shape[1]
+    keep = (cols >= 0) & (values != 0)
+    indptr = np.zeros(nrows+1, dtype=index_type)
+    np.cumsum(keep.reshape(nrows, -1).sum(axis=1), out=indptr[1:])
+    indices = cols[keep]
+    del cols
+    data = values[keep]
+    del keep
+    matrix = sparse.csr_matrix((data, indices, indptr), 
+                                     shape=(nrows, ny*nx))
+    if periodic_x or periodic_y:
+      # Wrapped columns are out of order, and may coincide on small grids
+      matrix.sum_duplicates()
+      matrix.eliminate_zeros()
+    return matrix
+
+  def edge_blocks(self, n):
+    """
+    Returns the two cells at each end of an axis of n cells, as a list of
+    (at most) two slices
+    """
+    if n <= 4:
+      return [slice(0, n)]
+    else:
+      return [slice(0, 2), slice(n-2, n)]
+
+  def stencil_rows(self, row_blocks, col_blocks):
+    """
+    Returns the cells (flat indices) in the given blocks of grid rows and 
+    columns, and their rows of the coefficient matrix, with the b.c.'s 
+    applied, as a CSR matrix. The blocks must hold both opposite edges of
+    any axis that they do not span, as BC_stencil expects.
+    """
+    ny, nx = self.qs.shape
+    values = np.concatenate([np.concatenate([self.stencil_values((r, c)) for c in col_blocks], axis=1)
+                             for r in row_blocks], axis=0)
+    self.BC_stencil(values)
+    i = np.concatenate([np.arange(ny)[r] for r in row_blocks]).reshape(-1, 1)
+    j = np.concatenate([np.arange(nx)[c] for c in col_blocks]).reshape(1, -1)
+    return (i*nx + j).ravel(), self.stencil_matrix(values, i, j)
+
+  def build_kron(self):
+    """
+    Builds the coefficient matrix of a plate of uniform elastic thickness
+    from 1D difference operators.
+    
+    With a constant rigidity, D, the operator is D times the biharmonic 
+    plus drho*g, and the biharmonic separates into the fourth differences
+    along x and y and the product of the second differences along each:
+    
+      A = D/dx^4 (Iy x Qx) + D/dy^4 (Qy x Ix) + 2D/(dx^2 dy^2) (Ly x Lx)
+          + drho*g I
+    
+    where "x" is the Kronecker product (scipy.sparse.kron). The b.c.'s are
+    applied to each 1D factor (line_matrix), as their weights act along one
+    axis only. At the corners, where the b.c.'s of two sides meet, they do
+    not separate, so the rows of the cells within two of each corner are
+    built from the stencil instead.
+    
+    The rows of the cells along one row of the grid form a block, and away
+    from the northern and southern edges (or everywhere, if these are
+    periodic), each block is the same as the one before it, shifted by nx
+    columns. So only a few blocks are built, and the rest are copied 
+    straight into the compressed sparse row arrays of the matrix: time and
+    memory scale with its number of non-zero entries, with no full-grid 
+    arrays of coefficients.
+    """
+    from scipy import sparse
+    ny, nx = self.qs.shape
+    self.ny = self.nrowsy = ny
+    self.nx = self.ncolsx = nx
+    N = ny*nx
+    periodic_y = self.BC_N == 'Periodic'
+
+    # Corners (also checks that periodic b.c.'s come in pairs)
+    cells, corner_rows = self.stencil_rows(self.edge_blocks(ny), self.edge_blocks(nx))
+
+    if np.isscalar(self.Te):
+      Te = self.Te
+    else:
+      Te = self.Te.flat[0]
+    D = self.E*Te**3/(12*(1-self.nu**2))
+    Qx = self.line_matrix([1., -4., 6., -4., 1.], nx, self.BC_W, self.BC_E)
+    Lx = self.line_matrix([0., 1., -2., 1., 0.], nx, self.BC_W, self.BC_E)
+    Qy = self.line_matrix([1., -4., 6., -4., 1.], ny, self.BC_N, self.BC_S)
+    Ly = self.line_matrix([0., 1., -2., 1., 0.], ny, self.BC_N, self.BC_S)
+    Iy = sparse.identity(ny, format='csr')
+    Ix = sparse.identity(nx, format='csr')
+    along_x = (D/self.dx4)*Qx + self.drho*self.g*Ix
+    
+    def block(i):
+      # Rows of the cells in row i of the grid
+      B = sparse.kron(Iy[i], along_x, format='csr') \
+          + sparse.kron((D/self.dy4)*Qy[i], Ix, format='csr') \
+          + sparse.kron((2*D/self.dx2dy2)*Ly[i], Lx, format='csr')
+      if not periodic_y:
+        # Replace the rows of the corner cells
+        corner = (cells // nx) == i
+        if corner.any():
+          others = np.ones(nx)
+          others[cells[corner] % nx] = 0
+          place = sparse.csr_matrix((np.ones(corner.sum()), (cells[corner] % nx, np.arange(corner.sum()))),
+                                    shape=(nx, corner.sum()))
+          B = sparse.diags(others, 0).dot(B) + place.dot(corner_rows[np.where(corner)[0]])
+      B = B.tocsr()
+      B.eliminate_zeros()
+      return B
+
+    # Blocks built on their own, and the block that is repeated (if any)
+    if periodic_y:
+      edges = []
+      repeated = 0
+    else:
+      edges = sorted(set([0, 1, ny-2, ny-1]) & set(range(ny)))
+      repeated = 2
+    blocks = dict( (i, block(i)) for i in edges )
+    copies = [i for i in range(ny) if i not in blocks]
+    if len(copies):
+      blocks[repeated] = block(repeated)
+      template = blocks[repeated]
+    
+    # Compressed sparse row arrays
+    if N*len(self.stencil) < 2**31:
+      index_type = np.int32
+    else:
+      index_type = np.int64
+    counts = np.empty(ny, dtype=index_type)
+    for i in range(ny):
+      if i in edges or not len(copies):
+        counts[i] = blocks[i].nnz
+      else:
+        counts[i] = template.nnz
+    indptr = np.zeros(N+1, dtype=index_type)
+    data = np.empty(counts.sum())
+    indices = np.empty(counts.sum(), dtype=index_type)
+    starts = np.concatenate(([0], np.cumsum(counts)))
+    for i in edges:
+      B = blocks[i]
+      data[starts[i]:starts[i+1]] = B.data
+      indices[starts[i]:starts[i+1]] = B.indices
+      indptr[i*nx+1:(i+1)*nx+1] = starts[i] + B.indptr[1:]
+    if len(copies):
+      # The copies are contiguous: rows 2 to ny-3, or all rows if periodic
+      first = copies[0]
+      last = copies[-1] + 1
+      n = last - first
+      nnz = template.nnz
+      data[starts[first]:starts[last]].reshape(n, nnz)[...] = template.data
+      shift = (np.arange(first, last, dtype=index_type) - repeated).reshape(-1, 1) * nx
+      columns = indices[starts[first]:starts[last]].reshape(n, nnz)
+      np.add(template.indices.astype(index_type), shift, out=columns)
+      if periodic_y:
+        columns %= N
+      indptr[first*nx+1:last*nx+1] = (starts[first] + nnz*np.arange(n, dtype=index_type).reshape(-1, 1) \
+                                      + template.indptr[1:].reshape(1, -1)).ravel()
+    self.coeff_matrix = sparse.csr_matrix((data, indices, indptr), shape=(N, N))
+    if periodic_y:
+      # Wrapped columns are out of order
+      self.coeff_matrix.sort_indices()
+
+  def line_matrix(self, coeffs, n, BC_low, BC_high):
+    """
+    Returns the n x n matrix of a 1D five-point stencil ("coeffs", at 
+    offsets -2 to 2) along one axis of the grid, as a CSR matrix, with the
+    boundary conditions at its low (western or northern) and high (eastern
+    or southern) ends applied with the weights that BC_stencil uses
+    """
+    from scipy import sparse
+    values = np.tile(np.asarray(coeffs, dtype=float), (n, 1))
+    # Position of each coefficient along the axis in the row of values
+    k = dict( (name, dx+2) for name, dx, dy in self.stencil if dy == 0 )
+    ends = [[BC_low, lambda m: m, 1], [BC_high, lambda m: -1-m, -1]]
+    unaltered = dict( ((sign, m), values[row(m)].copy()) for bc, row, sign in ends
+                      for m in range(2) )
+    for bc, row, sign in ends:
+      if bc == 'Periodic':
+        continue
+      for m in range(2):
+        for src, dest, f in self.BC_weights_W[bc][m]:
+          # Only the weights along this axis; the high end is mirrored
+          if src in k and dest in k:
+            values[row(m), 2 + sign*(k[dest]-2)] += f * unaltered[sign, m][2 + sign*(k[src]-2)]
+    i = np.arange(n).reshape(-1, 1) * np.ones((1, 5), dtype=int)
+    j = i + np.arange(-2, 3)
+    if BC_low == 'Periodic':
+      j %= n
+    keep = (j >= 0) & (j < n) & (values != 0)
+    return sparse.csr_matrix((values[keep], (i[keep], j[keep])), shape=(n, n))
+
+  def build_operator(self):
+    """
+    Builds the coefficient matrix as a matrix-free operator 
+    (matrixfree.StencilOperator), for iterative solutions on grids too
+    large to hold the sparse matrix.
+    
+    Away from the edges of the grid, the operator computes the stencil
+    coefficients from the padded rigidity (D) each time it is applied.
+    Only the rows of the cells within two of a non-periodic edge, which
+    the b.c.'s change, are built as a sparse matrix: O(nx + ny) rather 
+    than O(nx * ny) storage.
+    """
+    from scipy import sparse
+    from matrixfree import StencilOperator
+    ny, nx = self.qs.shape
+    self.ny = self.nrowsy = ny
+    self.nx = self.ncolsx = nx
+    strips = []
+    if self.BC_N != 'Periodic':
+      strips.append((self.edge_blocks(ny), [slice(0, nx)]))
+    if self.BC_W != 'Periodic':
+      strips.append(([slice(0, ny)], self.edge_blocks(nx)))
+    rows = []
+    cells = []
+    for row_blocks, col_blocks in strips:
+      strip_cells, strip_rows = self.stencil_rows(row_blocks, col_blocks)
+      rows.append(strip_rows)
+      cells.append(strip_cells)
+    if len(rows):
+      # Cells near the corners are in both strips
+      cells, first = np.unique(np.concatenate(cells), return_index=True)
+      rows = sparse.vstack(rows, format='csr')[first]
+    else:
+      cells = np.zeros(0, dtype=int)
+      rows = sparse.csr_matrix((0, ny*nx))
+    self.coeff_matrix = StencilOperator(self, rows, cells)
+
+  def BC_stencil(self, values):
+    """
+    Applies the flexural boundary conditions to the (ny, nx, 13) array of 
+    stencil coefficients from build_stencil.
+    
+    A coefficient that reaches past a non-periodic edge is added, with the 
+    weights given by the boundary condition, to coefficients that reach
+    cells inside the grid; the weights are the same as those in BC_Flexure.
+    The original coefficient is left in place and is later dropped, along
+    with everything else that falls outside the grid. Periodic boundaries
+    need nothing here: their coefficients wrap around the grid.
+    """
+    for pair in [[self.BC_W, self.BC_E], [self.BC_N, self.BC_S]]:
+      if (pair[0] == 'Periodic') != (pair[1] == 'Periodic'):
+        sys.exit("Not physical to have one wrap-around boundary but not its pair.")
+
+    k = dict( (name, n) for n, (name, dx, dy) in enumerate(self.stencil) )
+
+    # Weights at the western boundary (BC_weights_W, above) and the 
+    # northern boundary
+    rules_W = self.BC_weights_W
+    free_N = [('cj0i_2', 'cj0i2', 1), ('cj0i_1', 'cj0i1', 1),
+              ('cj_1i_1', 'cj_1i1', 1), ('cj1i_1', 'cj1i1', 1)]
+    rules_N = {
+      '0Displacement0Slope': [[], []],
+      '0Moment0Shear': [[('cj0i_2', 'cj0i0', 4), ('cj0i_2', 'cj0i1', -4), ('cj0i_2', 'cj0i2', 1),
+                         ('cj0i_1', 'cj0i0', 2), ('cj0i_1', 'cj0i1', -1),
+                         ('cj_1i_1', 'cj_1i0', 2), ('cj_1i_1', 'cj_1i1', -1),
+                         ('cj1i_1', 'cj1i0', 2), ('cj1i_1', 'cj1i1', -1)],
+                        [('cj0i_2', 'cj0i_1', 2), ('cj0i_2', 'cj0i1', -2), ('cj0i_2', 'cj0i2', 1)]],
+      '0Slope0Shear': [free_N, [('cj0i_2', 'cj0i2', 1)]],
+      'Mirror': [free_N, [('cj0i_2', 'cj0i0', 1)]]
+      }
+
+    # The eastern and southern boundaries mirror these
+    offsets = dict( ((dx, dy), name) for name, dx, dy in self.stencil )
+    def mirrored(rules, mx, my):
+      flip = dict( (name, offsets[(mx*dx, my*dy)]) for name, dx, dy in self.stencil )
+      return [[(flip[src], flip[dest], f) for src, dest, f in rule] for rule in rules]
+    sides = [['W', self.BC_W, rules_W, lambda n: (slice(None), n)],
+             ['E', self.BC_E, rules_W, lambda n: (slice(None), -1-n)],
+             ['N', self.BC_N, rules_N, lambda n: (n, slice(None))],
+             ['S', self.BC_S, rules_N, lambda n: (-1-n, slice(None))]]
+    
+    # Weights are applied to the coefficients as they were before any b.c.'s
+    unaltered = {}
+    for side, bc, rules, edge in sides:
+      for n in range(2):
+        unaltered[side, n] = values[edge(n)].copy()
+    corner = dict( ((i, j), values[i, j].copy()) for i in (0, -1) for j in (0, -1) )
+
+    for side, bc, rules, edge in sides:
+      if bc == 'Periodic':
+        continue
+      rules = rules[bc]
+      if side == 'E':
+        rules = mirrored(rules, -1, 1)
+      elif side == 'S':
+        rules = mirrored(rules, 1, -1)
+        if bc == '0Moment0Shear':
+          # As in BC_Flexure, the cross terms at the southern edge take 
+          # their weights from the coefficients mirrored in x
+          swap = {'cj_1i1': 'cj1i1', 'cj1i1': 'cj_1i1'}
+          rules[0] = [(swap.get(src, src), dest, f) if src in swap and dest[:4] != 'cj0i' \
+                      else (src, dest, f) for src, dest, f in rules[0]]
+      for n in range(2):
+        for src, dest, f in rules[n]:
+          values[edge(n) + (k[dest],)] += f * unaltered[side, n][:, k[src]]
+
+    # Corners: interference between boundary conditions (see BC_Flexure)
+    free = ['0Slope0Shear', 'Mirror']
+    for i, j, bc_y, bc_x, outside, opposite in [
+          [0, 0, self.BC_N, self.BC_W, 'cj_1i_1', 'cj1i1'],
+          [0, -1, self.BC_N, self.BC_E, 'cj1i_1', 'cj_1i1'],
+          [-1, 0, self.BC_S, self.BC_W, 'cj_1i1', 'cj1i_1'],
+          [-1, -1, self.BC_S, self.BC_E, 'cj1i1', 'cj_1i_1']]:
+      c = corner[i, j]
+      if (bc_y == '0Moment0Shear' and (bc_x == '0Moment0Shear' or bc_x in free)) \
+        or (bc_x == '0Moment0Shear' and bc_y in free):
+        values[i, j, k['cj0i0']] += 2*c[k['cj_1i_1']]
+        # (BC_Flexure's rule for 0Moment0Shear mixed with another b.c. at 
+        # the NE corner places this term outside the grid, so it drops out)
+        if bc_x == bc_y or (i, j) != (0, -1):
+          values[i, j, k[opposite]] -= c[k[outside]]
+      elif bc_y in free and bc_x in free:
+        values[i, j, k[opposite]] += c[k[outside]]
 
   def calc_max_flexural_wavelength(self):
     """
@@ -1495,14 +2030,117 @@ class F2D(Flexure):
     self.maxFlexuralWavelength_ncells_x = int(np.ceil(self.maxFlexuralWavelength / self.dx))
     self.maxFlexuralWavelength_ncells_y = int(np.ceil(self.maxFlexuralWavelength / self.dy))
     
+  def fd_multigrid(self):
+    """
+    Returns the multigrid solver for the coefficient matrix (see
+    multigrid.py). Like the LU factorization, it is built once per 
+    coefficient matrix and reused.
+    """
+    if self.coeff_multigrid is None \
+       or self.coeff_multigrid_of is not self.coeff_matrix:
+      from multigrid import Multigrid
+      self.coeff_multigrid = Multigrid(self.coeff_matrix, self.qs.shape,
+                                       periodic_x = self.BC_W == 'Periodic',
+                                       periodic_y = self.BC_N == 'Periodic',
+                                       coarse = self.coarse_coeff_matrix)
+      self.coeff_multigrid_of = self.coeff_matrix
+    return self.coeff_multigrid
+
+  def coarse_coeff_matrix(self, shape, k):
+    """
+    Coefficient matrix of the same plate on the grid of every 2**k-th cell,
+    of the given shape (see Multigrid.coarse_shape), for the multigrid 
+    preconditioner of a matrix-free operator. Te is taken at these cells 
+    (or, where the coarse grid extends beyond a non-periodic edge, at the 
+    edge), the grid spacing is multiplied by 2**k, and the b.c.'s are the
+    same. The matrix is multiplied by 4**k, as each Galerkin product that
+    it stands in for sums over about four cells per coarse cell.
+    """
+    import copy
+    coarse = copy.copy(self)
+    ny, nx = self.qs.shape
+    if not np.isscalar(self.Te):
+      i = np.minimum(2**k * np.arange(shape[0]), ny-1)
+      j = np.minimum(2**k * np.arange(shape[1]), nx-1)
+      coarse.Te = self.Te[i][:,j]
+    coarse.qs = np.zeros(shape)
+    coarse.dx = 2**k * self.dx
+    coarse.dy = 2**k * self.dy
+    coarse.elasprep()
+    coarse.BC_Rigidity()
+    coarse.build_stencil()
+    return 4**k * coarse.coeff_matrix
+
+  def fd_multigrid_solve(self, b, x0=None):
+    """
+    x = fd_multigrid_solve(b, x0=None)
+
+    Solves coeff_matrix * x = b by multigrid V-cycles, starting from x0 (or
+    0), to the tolerance given (in meters) by iterative_ConvergenceTolerance,
+    as for fd_iterative_solve. 
+    
+    Where the operator is not positive definite (e.g., near 0Slope0Shear 
+    edges or abrupt changes in Te), V-cycles alone may stop converging. If 
+    an iteration fails to reduce the residual by at least half, the 
+    solution is finished by the Krylov method ("IterativeMethod"), with the
+    V-cycle as its preconditioner.
+    """
+    tol = getattr(self, 'iterative_ConvergenceTolerance', None)
+    if tol is None:
+      tol = 1E-3
+    mg = self.fd_multigrid()
+    A = self.coeff_matrix
+    if x0 is None:
+      x = np.zeros(b.shape)
+      r = b.copy()
+    else:
+      x = x0.copy()
+      r = b - A.dot(x)
+    bnorm = np.linalg.norm(b)
+    rnorm = np.linalg.norm(r)
+    residuals = []
+    iterations = 0
+    converged = False
+    krylov = False
+    for i in range(100):
+      if rnorm <= tol * self.drho * self.g:
+        converged = True
+        break
+      x += mg.vcycle(r)
+      r = b - A.dot(x)
+      rnorm_old = rnorm
+      rnorm = np.linalg.norm(r)
+      residuals.append(rnorm / bnorm)
+      iterations += 1
+      if rnorm > 0.5 * rnorm_old:
+        if self.Verbose:
+          print("Multigrid V-cycles converging slowly: finishing with Krylov method")
+        x = self.fd_iterative_solve(b, x0=x, M=mg.operator())
+        residuals += self.iterative_residuals
+        iterations += self.iterative_iterations
+        converged = self.iterative_converged
+        krylov = True
+        break
+    self.iterative_residuals = residuals
+    self.iterative_iterations = iterations
+    self.iterative_converged = converged
+    if self.Verbose:
+      print("Multigrid solution:", self.iterative_iterations, "iterations;", \
+            ["did not converge", "converged"][converged], "to a tolerance of", \
+            tol, "m")
+    if not converged and not krylov:
+      # Shown even when Quiet (as is that of the Krylov method, if used)
+      print("Warning: multigrid solution did not converge to", tol, "m")
+    return x
+
   def fd_solve(self):
     """
     w = fd_solve()
     Sparse flexural response calculation.
-    Can be performed by direct factorization with UMFpack (defuault) 
-    or by an iterative minimum residual technique
-    These are both the fastest of the standard Scipy builtin techniques in 
-    their respective classes 
+    Can be performed by direct LU factorization (defuault), which is cached
+    and reused for as long as the coefficient matrix does not change,
+    or by a preconditioned Krylov method (see fd_iterative_solve), 
+    or by multigrid (see fd_multigrid_solve)
     Requires the coefficient matrix from "2D.coeff_matrix"
     """
     
@@ -1518,21 +2156,22 @@ class F2D(Flexure):
     
     q0vector = self.qs.reshape(-1, order='C')
     if self.Solver == "iterative" or self.Solver == "Iterative":
-      if self.Debug:
-        print("Using generalized minimal residual method for iterative solution")
-      if self.Verbose:
-        print("Converging to a tolerance of", self.iterative_ConvergenceTolerance, "m between iterations")
-      wvector = scipy.sparse.linalg.isolve.lgmres(self.coeff_matrix, q0vector)#, tol=1E-10)#,x0=woldvector)#,x0=wvector,tol=1E-15)    
-      wvector = wvector[0] # Reach into tuple to get my array back
+      wvector = self.fd_iterative_solve(q0vector, x0=self.fd_initial_guess(q0vector))
+      self.fd_record_solution(wvector)
+    elif self.Solver == "multigrid" or self.Solver == "Multigrid":
+      wvector = self.fd_multigrid_solve(q0vector, x0=self.fd_initial_guess(q0vector))
+      self.fd_record_solution(wvector)
     else:
       if self.Solver == "direct" or self.Solver == "Direct":
         if self.Debug:
-          print("Using direct solution with UMFpack")
+          print("Using direct solution with cached LU factorization")
       else:
         if self.Quiet == False:
           print("Solution type not understood:")
-          print("Defaulting to direct solution with UMFpack")
-      wvector = scipy.sparse.linalg.spsolve(self.coeff_matrix, q0vector, use_umfpack=True)
+          print("Defaulting to direct solution with cached LU factorization")
+      # Factorized once per coefficient matrix; later calls (e.g., with new
+      # loads in a coupled model) only back-substitute
+      wvector = self.coeff_matrix_factorization().solve(q0vector)
 
     # Reshape into grid
     self.w = -wvector.reshape(self.qs.shape)
@@ -45,6 +45,10 @@ def displayUsage():
   print("gflex <<path_to_configuration_file>>  # TO RUN STANDALONE")
   print("gflex -h  *OR*  gflex --help          # DISPLAY ADDITIONAL HELP")
   print("gflex -v  *OR*  gflex --version       # DISPLAY VERSION NUMBER")
+  print("gflex <<config>> <<config>> ... [-m <<manifest>>] [-j <<workers>>]")
+  print("                                      # TO RUN MANY: SEE gflex --batch-help")
+  print("gflex sweep -h                        # PARAMETER SWEEPS: SEE HELP")
+  print("gflex cache <<input directory>>       # CACHE ASCII INPUTS: SEE gflex cache -h")
   print("import gflex                          # WITHIN PYTHON SHELL OR SCRIPT")
   print("")
   
@@ -65,6 +69,25 @@ def furtherHelp():
   print("")
 
 def main():
+  # Parameter sweeps have their own command line
+  if len(sys.argv) > 1 and sys.argv[1] == 'sweep':
+    from sweep import main as sweep_main
+    sweep_main(sys.argv[2:])
+    return
+  # Pre-warming the cache of ASCII inputs
+  if len(sys.argv) > 1 and sys.argv[1] == 'cache':
+    from asciicache import main as cache_main
+    cache_main(sys.argv[2:])
+    return
+  # Many configuration files (or options for them): batch mode
+  if len(sys.argv) > 2 or (len(sys.argv) == 2 and sys.argv[1] not in
+                           ('-h', '--help', '-v', '--version') and
+                           sys.argv[1].startswith('-')):
+    from batch import main as batch_main
+    if sys.argv[1] == '--batch-help':
+      batch_main(['-h'])
+    batch_main(sys.argv[1:])
+    return
   # Choose how to instantiate
   if len(sys.argv) == 2:
     if sys.argv[1] == '--help' or sys.argv[1] == '-h':
@@ -85,13 +108,6 @@ def main():
     displayUsage()
     print("")
     sys.exit()
-  else:
-    welcome()
-    print(">>>> ERROR: Too many input parameters provided; exiting. <<<<")
-    print("")
-    displayUsage()
-    print("")
-    sys.exit()
   
   
   ########################################
@@ -114,7 +130,13 @@ def main():
   ############################################
   # obj.set_value('method','FD') # for example
 
-  obj.run()
+  if obj.LoadHistory is not None:
+    # Time series of loads: each frame's deflection is written out as it is
+    # solved (DeflectionHistoryOut)
+    for w in obj.run_series():
+      pass
+  else:
+    obj.run()
   obj.finalize()
 
   obj.output() # Not part of IRF or BMI: Does standalone plotting and file output
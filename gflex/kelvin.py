@@ -0,0 +1,128 @@
+"""
+This file is part of gFlex.
+gFlex computes lithospheric flexural isostasy with heterogeneous rigidity
+Copyright (C) 2010-2018 Andrew D. Wickert
+
+gFlex is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+gFlex is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with gFlex.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from __future__ import division, print_function # No automatic floor division
+import numpy as np
+
+class KeiTable(object):
+  """
+  The Kelvin function kei(x), for x >= 0, from a precomputed table: a fast
+  replacement for scipy.special.kei in the superposition of analytical 
+  solutions, which evaluates it at every distance between a load and an
+  output point.
+
+  On each interval of the table, kei is a cubic that matches scipy's values
+  and derivatives at both ends. Near 0, kei(x) = -ln(x) bei(x) + g(x), in
+  which bei and g are smooth; these are tabulated instead, as the 
+  logarithm would otherwise spoil the cubics. Beyond the table, kei is 
+  found from the asymptotic series for the modified Bessel function K0,
+  as ker(x) + i kei(x) = K0(x exp(i pi/4)).
+
+  The error is less than 2E-9 times the envelope of kei, 
+  min(pi/4, sqrt(pi/(2x)) exp(-x/sqrt(2))), at every x.
+  """
+
+  # Spacing of the table
+  spacing = 0.01
+  # Below this, tabulate bei and g instead of kei
+  split = 1.
+  # Extent of the table: kei is below 1E-13 beyond this
+  xmax = 40.
+  # Number of terms of the asymptotic series
+  nterms = 10
+
+  def __init__(self):
+    from scipy.special import kei, keip, bei, beip
+    h = self.spacing
+    x = np.arange(0, self.xmax + h/2., h)
+    self.kei = self.cubics(kei(x), keip(x))
+    # Near 0; g(0) = -pi/4 and g'(0) = 0
+    x = x[:int(round(self.split/h)) + 1]
+    self.bei = self.cubics(bei(x), beip(x))
+    x[0] = 1.
+    g = kei(x) + np.log(x)*bei(x)
+    dg = keip(x) + bei(x)/x + np.log(x)*beip(x)
+    g[0] = -np.pi/4.
+    dg[0] = 0.
+    self.g = self.cubics(g, dg)
+    # Coefficients of 1/z**k in the asymptotic series for K0(z)
+    self.series = [1.]
+    for k in range(1, self.nterms):
+      self.series.append(-self.series[-1] * (2*k - 1)**2 / (8.*k))
+
+  def cubics(self, f, df):
+    """
+    Coefficients of the cubic on each interval, in powers of the fraction
+    of the way across it, given the values and derivatives at the nodes
+    """
+    h = self.spacing
+    f0 = f[:-1]
+    f1 = f[1:]
+    d0 = df[:-1]*h
+    d1 = df[1:]*h
+    return np.column_stack((f0, d0, 3*(f1 - f0) - 2*d0 - d1, 2*(f0 - f1) + d0 + d1))
+
+  def evaluate(self, c, x):
+    """
+    Evaluates the table of cubics c at x
+    """
+    s = x / self.spacing
+    i = np.minimum(s.astype(np.intp), len(c) - 1)
+    t = s - i
+    c = c[i]
+    return ((c[:,3]*t + c[:,2])*t + c[:,1])*t + c[:,0]
+
+  def __call__(self, x):
+    x = np.asarray(x, dtype=float)
+    shape = x.shape
+    x = x.ravel()
+    # NaN in, NaN out, and NaN for x < 0, as for scipy.special.kei
+    undefined = np.isnan(x) | (x < 0)
+    if undefined.any():
+      x = np.where(undefined, 0., x)
+    out = self.evaluate(self.kei, np.clip(x, 0., self.xmax))
+    near = x < self.split
+    if near.any():
+      xn = x[near]
+      out[near] = -np.log(np.maximum(xn, np.finfo(float).tiny)) * self.evaluate(self.bei, xn) \
+                  + self.evaluate(self.g, xn)
+    far = x > self.xmax
+    if far.any():
+      z = x[far] * np.exp(1j*np.pi/4.)
+      s = 0.
+      for a in self.series[::-1]:
+        s = s/z + a
+      out[far] = (np.sqrt(np.pi/(2*z)) * np.exp(-z) * s).imag
+    if undefined.any():
+      out[undefined] = np.nan
+    return out.reshape(shape)
+
+# Built on first use, and shared by all later calls
+_kei_table = None
+
+def kei(x):
+  """
+  Kelvin function kei(x), for x >= 0, from a table (see KeiTable); the 
+  table is built on the first call. As for scipy.special.kei, NaN is 
+  returned for x < 0
+  """
+  global _kei_table
+  if _kei_table is None:
+    _kei_table = KeiTable()
+  return _kei_table(x)
@@ -0,0 +1,168 @@
+"""
+This file is part of gFlex.
+gFlex computes lithospheric flexural isostasy with heterogeneous rigidity
+Copyright (C) 2010-2018 Andrew D. Wickert
+
+gFlex is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+gFlex is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with gFlex.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from __future__ import division, print_function # No automatic floor division
+import numpy as np
+from scipy.sparse.linalg import LinearOperator
+
+class StencilOperator(LinearOperator):
+  """
+  The 2D finite difference coefficient matrix, applied without being
+  stored: a scipy.sparse.linalg.LinearOperator for the iterative solvers.
+
+  The stencil coefficients are computed from the plate's padded flexural 
+  rigidity by F2D.stencil_coefficients, one block of rows at a time, and 
+  each is multiplied by a shifted view of the deflection grid. This grid is
+  padded by two cells of zeros (or, for periodic b.c.'s, by the cells from
+  the opposite edge). The rows of the cells next to non-periodic edges, 
+  where the b.c.'s alter the stencil, are instead taken from a small sparse
+  matrix, built by F2D.build_operator.
+
+  Storage is the rigidity grid and a few block-sized work arrays, rather
+  than the 13 coefficients and column indices per cell of the sparse 
+  matrix; each product costs about as much as building the matrix once.
+  For the multigrid preconditioner (multigrid.py), the operator also gives
+  its diagonal, the l1 norms of its rows, and the rows of chosen cells.
+  """
+
+  # Cells per block of rows: sets the size of the work arrays
+  block = 2**18
+
+  def __init__(self, flex, edge_rows, edge_cells):
+    self.flex = flex
+    self.grid_shape = flex.qs.shape
+    self.periodic_x = flex.BC_W == 'Periodic'
+    self.periodic_y = flex.BC_N == 'Periodic'
+    self.offsets = dict( (name, (dx, dy)) for name, dx, dy in flex.stencil )
+    self.edge_rows = edge_rows
+    self.edge_cells = edge_cells
+    n = self.grid_shape[0] * self.grid_shape[1]
+    super(StencilOperator, self).__init__(np.dtype(float), (n, n))
+
+  def blocks(self):
+    """
+    Yields (rows, columns) slices that cover the grid in blocks of rows
+    """
+    ny, nx = self.grid_shape
+    nrows = max(1, self.block // nx)
+    for i0 in range(0, ny, nrows):
+      yield (slice(i0, min(ny, i0 + nrows)), slice(0, nx))
+
+  def _matvec(self, x):
+    ny, nx = self.grid_shape
+    x = np.ravel(x)
+    w = x.reshape(ny, nx)
+    if self.periodic_y:
+      w = np.pad(w, ((2, 2), (0, 0)), mode='wrap')
+    else:
+      w = np.pad(w, ((2, 2), (0, 0)), mode='constant')
+    if self.periodic_x:
+      w = np.pad(w, ((0, 0), (2, 2)), mode='wrap')
+    else:
+      w = np.pad(w, ((0, 0), (2, 2)), mode='constant')
+    y = np.zeros((ny, nx))
+    for cells in self.blocks():
+      i0, i1 = cells[0].start, cells[0].stop
+      yblock = y[cells]
+      def apply(name, coefficients):
+        dx, dy = self.offsets[name]
+        yblock[...] += coefficients * w[2+i0+dy:2+i1+dy, 2+dx:2+dx+nx]
+      self.flex.stencil_coefficients(cells=cells, apply=apply)
+    y = y.ravel()
+    if len(self.edge_cells):
+      y[self.edge_cells] = self.edge_rows.dot(x)
+    return y
+
+  def diagonal(self):
+    """
+    Main diagonal of the operator, as for a sparse matrix
+    """
+    d = np.zeros(self.grid_shape)
+    for cells in self.blocks():
+      dblock = d[cells]
+      def apply(name, coefficients):
+        if name == 'cj0i0':
+          dblock[...] = coefficients
+      self.flex.stencil_coefficients(cells=cells, apply=apply)
+    d = d.ravel()
+    if len(self.edge_cells):
+      d[self.edge_cells] = np.asarray(self.edge_rows[np.arange(len(self.edge_cells)),
+                                                     self.edge_cells]).ravel()
+    return d
+
+  def l1_norms(self):
+    """
+    Sum of the absolute values of each row of the operator. Away from the
+    edge rows, every coefficient reaches a cell of the (wrapped) grid.
+    """
+    l1 = np.zeros(self.grid_shape)
+    for cells in self.blocks():
+      l1block = l1[cells]
+      def apply(name, coefficients):
+        l1block[...] += np.abs(coefficients)
+      self.flex.stencil_coefficients(cells=cells, apply=apply)
+    l1 = l1.ravel()
+    if len(self.edge_cells):
+      l1[self.edge_cells] = np.asarray(abs(self.edge_rows).sum(axis=1)).ravel()
+    return l1
+
+  def rows(self, cells):
+    """
+    Rows of the operator for the given cells (flat indices), as a CSR 
+    matrix: the rows of a sparse coefficient matrix, built for these cells
+    alone
+    """
+    from scipy import sparse
+    ny, nx = self.grid_shape
+    cells = np.asarray(cells, dtype=int)
+    # Rows near non-periodic edges come from the sparse matrix of these
+    if len(self.edge_cells):
+      at = np.minimum(np.searchsorted(self.edge_cells, cells), len(self.edge_cells)-1)
+      edge = self.edge_cells[at] == cells
+    else:
+      edge = np.zeros(len(cells), dtype=bool)
+    i, j = np.divmod(cells, nx)
+    data = []
+    rows = []
+    cols = []
+    for block in self.blocks():
+      i0, i1 = block[0].start, block[0].stop
+      inblock = np.flatnonzero((i >= i0) & (i < i1) & ~edge)
+      if len(inblock) == 0:
+        continue
+      ib = i[inblock]
+      jb = j[inblock]
+      def apply(name, coefficients):
+        # Away from the edge rows, these reach cells of the (wrapped) grid
+        dx, dy = self.offsets[name]
+        data.append(coefficients[ib - i0, jb])
+        rows.append(inblock)
+        cols.append(((ib + dy) % ny)*nx + (jb + dx) % nx)
+      self.flex.stencil_coefficients(cells=block, apply=apply)
+    if edge.any():
+      edge_rows = self.edge_rows[at[edge]].tocoo()
+      data.append(edge_rows.data)
+      rows.append(np.flatnonzero(edge)[edge_rows.row])
+      cols.append(edge_rows.col)
+    if len(data) == 0:
+      return sparse.csr_matrix((len(cells), ny*nx))
+    # Duplicates (from wrapping on small periodic grids) are summed
+    return sparse.csr_matrix((np.concatenate(data),
+                              (np.concatenate(rows), np.concatenate(cols))),
+                             shape=(len(cells), ny*nx))
@@ -0,0 +1,240 @@
+"""
+This file is part of gFlex.
+gFlex computes lithospheric flexural isostasy with heterogeneous rigidity
+Copyright (C) 2010-2018 Andrew D. Wickert
+
+gFlex is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+gFlex is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with gFlex.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from __future__ import division, print_function # No automatic floor division
+import numpy as np
+from scipy import sparse
+from scipy.sparse.linalg import splu, LinearOperator
+from scipy.ndimage import binary_dilation
+
+class Multigrid(object):
+  """
+  Geometric multigrid V-cycle for the 2D finite difference coefficient
+  matrix, as built by F2D (for any plate solution type and any combination
+  of boundary conditions).
+
+  Each coarse grid takes every other cell of the one above it. Corrections
+  are interpolated from the coarse grid by cubic interpolation (as the
+  plate equation is of fourth order, linear interpolation is not enough),
+  and the coarse operators of a matrix are the Galerkin products P^T A P.
+  These coarsen the flexural rigidity and the boundary conditions 
+  consistently with the fine-grid stencil: the b.c.'s are defined by cells
+  at fixed offsets from the edge of the grid, so they cannot be exactly
+  rediscretized at a coarser spacing.
+
+  The smoother is a Chebyshev polynomial in the l1-Jacobi-scaled operator.
+  The stencil is not diagonally dominant, and near 0Slope0Shear and
+  0Moment0Shear edges and abrupt changes in Te, the operator is not even
+  positive definite. These places are smoothed by an exact solution:
+  within "frame" cells of each non-periodic edge, and around each cell
+  whose diagonal is not positive or is small relative to the rest of its
+  row. The coarsest grid is solved by LU factorization.
+
+  Work and memory are O(N) in the number of cells. Convergence is fastest
+  where Te varies smoothly. It degrades where Te jumps across a periodic
+  boundary; the direct solver is then the better choice.
+
+  A may also be a matrix-free operator (matrixfree.StencilOperator), which
+  supplies its diagonal, l1 row norms, and the rows of the cells that are
+  solved exactly. The Galerkin products, with their wider stencils, and
+  the interpolation matrices would then take as much memory as the matrix
+  that is not stored. Instead, the interpolation is applied one axis at a
+  time, and each coarse operator is rediscretized: coarse(shape, k) 
+  returns the assembled coefficient matrix of the plate on the grid of 
+  every 2**k-th cell, of the given shape, scaled as the Galerkin product 
+  would be. Together, these take about a third of the memory of the fine
+  matrix. The mismatch of their b.c.'s is made up for by the exact 
+  solution within the frame of each level.
+  """
+
+  # Chebyshev smoothing polynomial: degree, and ratio of the largest to the
+  # smallest eigenvalue that it targets
+  degree = 3
+  ratio = 10.
+  # Width [cells] of the strips along non-periodic edges that are solved
+  # exactly when smoothing
+  frame = 8
+  # Largest grid [cells] that is solved directly
+  coarsest = 2000
+
+  def __init__(self, A, shape, periodic_x=False, periodic_y=False, coarse=None):
+    self.periodic_x = periodic_x
+    self.periodic_y = periodic_y
+    self.levels = []
+    if sparse.issparse(A):
+      A = sparse.csr_matrix(A)
+      coarse = None
+    elif A.shape[0] <= self.coarsest or min(shape) <= 4:
+      # Matrix-free, but small enough to solve directly
+      A = A.rows(np.arange(A.shape[0]))
+    while A.shape[0] > self.coarsest and min(shape) > 4:
+      Py = self.interpolation(shape[0], periodic_y)
+      Px = self.interpolation(shape[1], periodic_x)
+      if coarse is None:
+        P = sparse.kron(Py, Px, format='csr')
+        self.levels.append(self.level(A, P, shape))
+        A = (P.T * A * P).tocsr()
+      else:
+        self.levels.append(self.level(A, self.separable(Py, Px), shape))
+        A = sparse.csr_matrix(coarse(self.coarse_shape(shape), len(self.levels)))
+      shape = self.coarse_shape(shape)
+    self.coarse_lu = splu(A.tocsc())
+
+  def coarse_shape(self, shape):
+    """
+    Shape of the grid of every other cell of a grid of the given shape
+    (see interpolation)
+    """
+    return ((shape[0]+1)//2 if self.periodic_y else shape[0]//2 + 1,
+            (shape[1]+1)//2 if self.periodic_x else shape[1]//2 + 1)
+
+  def interpolation(self, n, periodic):
+    """
+    Cubic interpolation from every other cell (0, 2, 4, ...) to all n cells
+    along one axis. Without periodic b.c.'s, the coarse grid extends to or
+    beyond the last cell, and interpolation is one-sided next to the edges
+    (or linear, if there are too few coarse cells for a cubic).
+    """
+    if periodic:
+      nc = (n+1)//2
+    else:
+      nc = n//2 + 1
+    even = np.arange(0, n, 2)
+    odd = np.arange(1, n, 2)
+    # Coarse cell to the west of each odd cell
+    a = ((odd - 1)//2).reshape(-1, 1)
+    if periodic or nc >= 4:
+      cols = a + np.array([-1, 0, 1, 2])
+      weights = np.tile([-1/16., 9/16., 9/16., -1/16.], (len(odd), 1))
+      if not periodic:
+        west = a[:,0] == 0
+        cols[west] = np.array([0, 1, 2, 3])
+        weights[west] = [5/16., 15/16., -5/16., 1/16.]
+        east = a[:,0] + 2 >= nc
+        cols[east] = a[east] + np.array([-2, -1, 0, 1])
+        weights[east] = [1/16., -5/16., 15/16., 5/16.]
+    else:
+      cols = a + np.array([0, 1])
+      weights = np.tile([.5, .5], (len(odd), 1))
+    rows = np.concatenate((even, np.repeat(odd, cols.shape[1])))
+    cols = np.concatenate((even//2, cols.ravel() % nc))
+    weights = np.concatenate((np.ones(len(even)), weights.ravel()))
+    return sparse.csr_matrix((weights, (rows, cols)), shape=(n, nc))
+
+  def separable(self, Py, Px):
+    """
+    The interpolation kron(Py, Px) as a LinearOperator, applied along one
+    axis and then the other without forming the product
+    """
+    ny, nyc = Py.shape
+    nx, nxc = Px.shape
+    PyT = Py.T.tocsr()
+    PxT = Px.T.tocsr()
+    def interpolate(x):
+      return Py.dot(Px.dot(np.reshape(x, (nyc, nxc)).T).T).ravel()
+    def restrict(r):
+      return PyT.dot(PxT.dot(np.reshape(r, (ny, nx)).T).T).ravel()
+    return LinearOperator((ny*nx, nyc*nxc), matvec=interpolate, rmatvec=restrict)
+
+  def level(self, A, P, shape):
+    """
+    Operators and smoother for one grid level
+    """
+    d = A.diagonal()
+    if sparse.issparse(A):
+      l1 = np.asarray(abs(A).sum(axis=1)).ravel()
+    else:
+      l1 = A.l1_norms()
+    # Cells to solve exactly when smoothing
+    exact = ((d <= 0) | (l1 - np.abs(d) > 3*d)).reshape(shape)
+    exact = binary_dilation(exact, iterations=2)
+    if not self.periodic_y:
+      exact[:self.frame] = exact[-self.frame:] = True
+    if not self.periodic_x:
+      exact[:,:self.frame] = exact[:,-self.frame:] = True
+    exact = np.flatnonzero(exact)
+    if len(exact):
+      # Their rows, for the residual there
+      if sparse.issparse(A):
+        exact_rows = A[exact]
+      else:
+        exact_rows = A.rows(exact)
+      exact_lu = splu(exact_rows[:,exact].tocsc())
+    else:
+      exact_rows = exact_lu = None
+    if sparse.issparse(P):
+      R = P.T.tocsr()
+    else:
+      R = P.H
+    return {'A': A, 'P': P, 'R': R, 'shape': shape, 'l1inv': 1./l1,
+            'exact': exact, 'exact_rows': exact_rows, 'exact_lu': exact_lu}
+
+  def smooth(self, level, b, x):
+    """
+    Chebyshev smoothing in the l1-Jacobi-scaled operator, whose eigenvalues
+    are no larger than 1, followed by the exact solution on the cells that
+    this cannot smooth. x = None starts from 0.
+    """
+    A = level['A']
+    l1inv = level['l1inv']
+    lmax = 1.
+    lmin = lmax/self.ratio
+    theta = (lmax + lmin)/2.
+    delta = (lmax - lmin)/2.
+    sigma = theta/delta
+    rho = 1./sigma
+    if x is None:
+      x = np.zeros(b.shape)
+      r = b
+    else:
+      r = b - A.dot(x)
+    d = l1inv*r/theta
+    for k in range(self.degree):
+      x = x + d
+      if k < self.degree - 1:
+        r = r - A.dot(d)
+        rho_new = 1./(2*sigma - rho)
+        d = rho_new*rho*d + 2*rho_new/delta * l1inv*r
+        rho = rho_new
+    if level['exact_lu'] is not None:
+      exact = level['exact']
+      x[exact] += level['exact_lu'].solve(b[exact] - level['exact_rows'].dot(x))
+    return x
+
+  def vcycle(self, b, k=0):
+    """
+    Approximate solution of A x = b by one V-cycle, starting from x = 0
+    """
+    b = np.ravel(b)
+    if k == len(self.levels):
+      return self.coarse_lu.solve(b)
+    level = self.levels[k]
+    x = self.smooth(level, b, None)
+    x += level['P'].dot(self.vcycle(level['R'].dot(b - level['A'].dot(x)), k+1))
+    return self.smooth(level, b, x)
+
+  def operator(self):
+    """
+    The V-cycle as a scipy.sparse.linalg.LinearOperator, for use as a
+    preconditioner
+    """
+    n = self.coarse_lu.shape[0]
+    if len(self.levels):
+      n = self.levels[0]['A'].shape[0]
+    return LinearOperator((n, n), self.vcycle)
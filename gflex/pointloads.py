@@ -0,0 +1,176 @@
+"""
+This file is part of gFlex.
+gFlex computes lithospheric flexural isostasy with heterogeneous rigidity
+Copyright (C) 2010-2018 Andrew D. Wickert
+
+gFlex is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+gFlex is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with gFlex.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+from __future__ import division, print_function # No automatic floor division
+import numpy as np
+from kelvin import kei
+
+# SOLUTIONS FOR UNIT POINT LOADS
+# Each takes the coordinates of the loads ("sources", one row per load) and 
+# of the output points (one row per point) and returns the (loads, points)
+# array of deflections. These are objects rather than closures so that they
+# can be sent to worker processes.
+
+class PlanarKelvin(object):
+  """
+  2D: kei of the distance, with coordinates in units of the flexural 
+  parameter
+  """
+  def __call__(self, sources, points):
+    return kei(np.hypot(points[:,0] - sources[:,0:1], points[:,1] - sources[:,1:2]))
+
+class SphericalKelvin(object):
+  """
+  2D, lat/lon: kei of the great-circle distance between points given as 3D
+  unit vectors (see unit_vectors), on a sphere whose radius is in units of
+  the flexural parameter. This is found from the chord between them, which
+  unlike the arccos of their dot product keeps its precision at short range.
+  """
+  def __init__(self, radius):
+    self.radius = radius
+
+  def __call__(self, sources, points):
+    chord = points[:,0] - sources[:,0:1]
+    chord *= chord
+    for k in (1, 2):
+      d = points[:,k] - sources[:,k:k+1]
+      d *= d
+      chord += d
+    np.sqrt(chord, out=chord)
+    return kei(2*self.radius * np.arcsin(np.minimum(chord/2., 1.)))
+
+def unit_vectors(lon, lat):
+  """
+  Points on the sphere, from their longitudes and latitudes in degrees, as
+  the rows of an array of 3D unit vectors
+  """
+  lon = np.radians(lon)
+  lat = np.radians(lat)
+  return np.column_stack((np.cos(lat)*np.cos(lon), np.cos(lat)*np.sin(lon),
+                          np.sin(lat)))
+
+class LineLoad(object):
+  """
+  1D: deflections due to unit line loads on a broken plate of flexural
+  parameter alpha
+  """
+  def __init__(self, coeff, alpha):
+    self.coeff = coeff
+    self.alpha = alpha
+
+  def __call__(self, sources, points):
+    dist = np.abs(points[:,0] - sources)
+    # Negative b/c pos load leads to neg (downward) deflection
+    return -self.coeff * np.exp(-dist/self.alpha) * \
+      ( np.cos(dist/self.alpha) + np.sin(dist/self.alpha) )
+
+# SUPERPOSITION
+
+def group_sum(kernel, q, sources, points, group, nloads):
+  """
+  Sum of the solutions for the tiles of loads that start at the indices in 
+  "group", each "nloads" long, at "points"
+  """
+  w = np.zeros(len(points))
+  for j in group:
+    w += q[j:j+nloads].dot(kernel(sources[j:j+nloads], points))
+  return w
+
+# Worker processes: the arrays, in shared memory, and the tiling
+_shared = {}
+
+def _shared_array(array):
+  """
+  A copy of "array" in a new block of shared memory
+  """
+  from multiprocessing import shared_memory
+  shm = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+  view = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+  view[...] = array
+  return shm, view
+
+def _attach(kernel, arrays, groups, nloads, npoints):
+  """
+  Worker initializer: attaches to the shared arrays, given as 
+  {name: (shared memory name, shape)}
+  """
+  from multiprocessing import shared_memory
+  _shared.clear()
+  _shared['memory'] = []
+  for key in arrays:
+    name, shape = arrays[key]
+    shm = shared_memory.SharedMemory(name=name)
+    _shared['memory'].append(shm)
+    _shared[key] = np.ndarray(shape, dtype=float, buffer=shm.buf)
+  _shared['kernel'] = kernel
+  _shared['groups'] = groups
+  _shared['nloads'] = nloads
+  _shared['npoints'] = npoints
+
+def _work(unit):
+  """
+  Worker: the partial sum for one group of loads and one tile of points
+  """
+  g, i = unit
+  npoints = _shared['npoints']
+  _shared['partial'][g, i:i+npoints] = group_sum(_shared['kernel'], _shared['q'],
+                                                 _shared['sources'],
+                                                 _shared['points'][i:i+npoints],
+                                                 _shared['groups'][g],
+                                                 _shared['nloads'])
+
+def parallel_sum(kernel, q, sources, points, groups, nloads, npoints, n_workers):
+  """
+  w = parallel_sum(kernel, q, sources, points, groups, nloads, npoints, n_workers)
+
+  The sum over loads that Flexure.superposition finds, divided among 
+  "n_workers" processes. Each unit of work is one group of loads (a list of
+  the first indices of tiles of "nloads" loads) at one tile of "npoints"
+  points; its partial sum is written to its own row of a (groups, points)
+  array in shared memory. These rows are then added in order, so the result
+  is the same as Flexure.superposition's, to the last bit, for any number of
+  workers.
+  """
+  from concurrent.futures import ProcessPoolExecutor
+  memory = []
+  shared = {}
+  try:
+    for key, array in [('q', q), ('sources', sources), ('points', points),
+                       ('partial', np.zeros((len(groups), len(points))))]:
+      shm, shared[key] = _shared_array(np.ascontiguousarray(array, dtype=float))
+      memory.append((key, shm))
+    arrays = dict( (key, (shm.name, shared[key].shape)) for key, shm in memory )
+    units = [(g, i) for g in range(len(groups))
+                    for i in range(0, len(points), npoints)]
+    with ProcessPoolExecutor(n_workers, initializer=_attach,
+                             initargs=(kernel, arrays, groups, nloads, npoints)) as pool:
+      for _ in pool.map(_work, units, chunksize=max(1, len(units) // (4*n_workers))):
+        pass
+    # Reduction, in a fixed order
+    w = np.zeros(len(points))
+    for g in range(len(groups)):
+      w += shared['partial'][g]
+  finally:
+    # The views must go before the memory can be released
+    shared.clear()
+    for key, shm in memory:
+      shm.close()
+      shm.unlink()
+  return w
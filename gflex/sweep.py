@@ -0,0 +1,266 @@
+"""
+This file is part of gFlex.
+gFlex computes lithospheric flexural isostasy with heterogeneous rigidity
+Copyright (C) 2010-2018 Andrew D. Wickert
+
+gFlex is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+gFlex is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with gFlex.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+from __future__ import division, print_function # No automatic floor division
+import sys, os
+import itertools
+import time
+import numpy as np
+from base import WhichModel
+from f1d import F1D
+from f2d import F2D
+
+class Sweep(object):
+  """
+  An ensemble of runs of one gFlex configuration file, with some of its
+  parameters set for each run, from:
+
+    grid: {name: [values]}: every combination of these values
+    samplers: {name: function(rng)}: "nsamples" draws for each combination,
+      where rng is a numpy RandomState seeded by (seed, sample number), so 
+      that each run's values are reproducible
+
+  Names are those of the model's attributes (e.g., Te, E, nu, rho_fill, qs),
+  and values are set after the configuration file is read. A string Te is 
+  a path to a Te grid, as in the configuration file. q0 gives the loads as
+  the configuration file does (an array, or the path to one), and replaces
+  those of the run before it. Run i is combination
+  i // nsamples of the grid (in the order of itertools.product over the 
+  sorted names) and sample i % nsamples.
+
+  Runs that differ only in their loads share a plate: these are done in 
+  turn by one model object, so the coefficient matrix is built (and, for the
+  direct solver, factorized) once for all of them. With n_workers > 1, 
+  these groups of runs are divided among a pool of processes; samplers must
+  then be functions that can be pickled (e.g., defined at the top level of 
+  a module).
+
+  The deflections are written to a .npy file (run, ...), as each run 
+  finishes, and a flag for each run to a ".done.npy" file next to it. Calling
+  run() again with the same output resumes an interrupted sweep: the runs 
+  that are flagged as done are skipped.
+  """
+
+  # Parameters that change only the loads, and not the plate
+  load_parameters = ('q0', 'qs')
+
+  def __init__(self, filename, grid=None, samplers=None, nsamples=1, seed=0,
+               n_workers=1, Quiet=True):
+    self.filename = filename
+    self.grid = grid or {}
+    self.samplers = samplers or {}
+    self.nsamples = nsamples
+    self.seed = seed
+    self.n_workers = n_workers
+    self.Quiet = Quiet
+    self.names = sorted(self.grid)
+    self.combinations = list(itertools.product(*[range(len(self.grid[name]))
+                                                  for name in self.names]))
+    self.nruns = len(self.combinations) * nsamples
+    self.dimension = WhichModel(filename).dimension
+
+  def parameters(self, i):
+    """
+    The parameters that are set for run i, as {name: value}
+    """
+    combination = self.combinations[i // self.nsamples]
+    values = dict( (name, self.grid[name][j]) for name, j in zip(self.names, combination) )
+    rng = np.random.RandomState([self.seed, i % self.nsamples])
+    for name in sorted(self.samplers):
+      values[name] = self.samplers[name](rng)
+    return values
+
+  def groups(self):
+    """
+    Lists of the runs that share a plate
+    """
+    plate = [k for k, name in enumerate(self.names) if name not in self.load_parameters]
+    sampled = [name for name in self.samplers if name not in self.load_parameters]
+    groups = {}
+    order = []
+    for i in range(self.nruns):
+      key = tuple(self.combinations[i // self.nsamples][k] for k in plate)
+      if sampled:
+        key += (i % self.nsamples,)
+      if key not in groups:
+        groups[key] = []
+        order.append(key)
+      groups[key].append(i)
+    return [groups[key] for key in order]
+
+  def model(self):
+    """
+    A model object, initialized from the configuration file
+    """
+    if self.dimension == 1:
+      flex = F1D(self.filename)
+    else:
+      flex = F2D(self.filename)
+    flex.Quiet = self.Quiet
+    flex.initialize(self.filename)
+    if self.Quiet:
+      flex.Quiet = True
+      flex.Verbose = False
+      flex.Debug = False
+    return flex
+
+  def open_output(self, output, shape=None):
+    """
+    The output array and the flags for the runs that are done, as memory
+    maps; created, for deflections of the given shape, if they do not exist
+    """
+    done = os.path.splitext(output)[0] + '.done.npy'
+    if os.path.exists(output) and os.path.exists(done):
+      w = np.load(output, mmap_mode='r+')
+      flags = np.load(done, mmap_mode='r+')
+      if len(w) != self.nruns or len(flags) != self.nruns:
+        sys.exit("Sweep output "+output+" is for a different number of runs\n"+\
+                 "("+str(len(w))+", rather than "+str(self.nruns)+"). Exiting.")
+      return w, flags
+    if shape is None:
+      return None, None
+    flags = np.lib.format.open_memmap(done, mode='w+', dtype=bool, shape=(self.nruns,))
+    w = np.lib.format.open_memmap(output, mode='w+', dtype=float,
+                                  shape=(self.nruns,) + tuple(shape))
+    return w, flags
+
+  def set_loads(self, flex, q0):
+    """
+    Replaces the loads of the model with q0, an array or the path to one, 
+    given as in the configuration file: the load grid, or, for SAS_NG, the 
+    [x, (y), q] points
+    """
+    if isinstance(q0, str):
+      q0 = flex.loadFile(q0)
+    if flex.Method == 'SAS_NG':
+      # Parsed again from q0 by the next run
+      for name in ('x', 'y', 'q'):
+        if hasattr(flex, name):
+          delattr(flex, name)
+      flex.q0 = q0
+    else:
+      flex.qs = q0
+
+  def run_group(self, runs, output):
+    """
+    Does the runs (a list of run numbers) that are not yet done, with one
+    model object, and writes each to the output as it finishes. Returns the
+    number of runs that were done.
+    """
+    w, flags = self.open_output(output)
+    flex = None
+    count = 0
+    for i in runs:
+      if flags is not None and flags[i]:
+        continue
+      if flex is None:
+        flex = self.model()
+      values = self.parameters(i)
+      for name in values:
+        if name == 'q0':
+          self.set_loads(flex, values[name])
+        else:
+          setattr(flex, name, values[name])
+      flex.drho = flex.rho_m - flex.rho_fill
+      flex.run()
+      if not flex.iterative_converged:
+        # Shown even when Quiet: this run's deflections are not to be trusted
+        print("Warning: iterative solution of sweep run", i, "did not converge")
+      if w is None:
+        w, flags = self.open_output(output, np.shape(flex.w))
+      w[i] = flex.w
+      w.flush()
+      # Flagged only once the deflections are on disk
+      flags[i] = True
+      flags.flush()
+      count += 1
+    if flex is not None:
+      flex.finalize()
+    return count
+
+  def run(self, output):
+    """
+    Does every run of the sweep that is not yet done, writing the 
+    deflections to "output" (a .npy file). Returns them, as a read-only 
+    memory map.
+    """
+    start = time.time()
+    groups = self.groups()
+    count = 0
+    if self.open_output(output)[0] is None:
+      # The first group sets the shape of the output array
+      count += self.run_group(groups.pop(0), output)
+    if self.n_workers > 1 and len(groups) > 1:
+      from concurrent.futures import ProcessPoolExecutor
+      with ProcessPoolExecutor(self.n_workers) as pool:
+        for n in pool.map(_run_group, [(self, runs, output) for runs in groups]):
+          count += n
+    else:
+      for runs in groups:
+        count += self.run_group(runs, output)
+    if self.Quiet == False:
+      print("Sweep:", count, "of", self.nruns, "runs done in", time.time() - start, "s")
+    return np.load(output, mmap_mode='r')
+
+def _run_group(task):
+  """
+  Worker: Sweep.run_group for (sweep, runs, output)
+  """
+  sweep, runs, output = task
+  return sweep.run_group(runs, output)
+
+def parse_value(text):
+  """
+  A number, if the text is one, or else the text
+  """
+  try:
+    return float(text)
+  except ValueError:
+    return text
+
+def main(argv=None):
+  """
+  Command line: gflex sweep <configuration file> -o <output.npy> 
+                  [--set NAME=VALUE,VALUE,...] ... [-j WORKERS]
+  """
+  import argparse
+  parser = argparse.ArgumentParser(prog='gflex sweep',
+             description='Runs a gFlex configuration file for every combination '+\
+                         'of the given parameter values, writing the deflections '+\
+                         'to one .npy array (run, ...). Rerun to resume.')
+  parser.add_argument('filename', help='configuration file')
+  parser.add_argument('-o', '--output', required=True, help='output .npy file')
+  parser.add_argument('--set', action='append', default=[], metavar='NAME=VALUES',
+                      help='comma-separated values of a model attribute '+\
+                           '(e.g., Te=20000,30000 or rho_fill=0,1000); repeatable')
+  parser.add_argument('-j', '--workers', type=int, default=1,
+                      help='number of worker processes (default 1)')
+  args = parser.parse_args(argv)
+  grid = {}
+  for item in args.set:
+    if '=' not in item:
+      parser.error('--set takes NAME=VALUE,VALUE,...')
+    name, values = item.split('=', 1)
+    grid[name.strip()] = [parse_value(value.strip()) for value in values.split(',')]
+  sweep = Sweep(args.filename, grid=grid, n_workers=args.workers)
+  start = time.time()
+  sweep.run(args.output)
+  print("Sweep of", sweep.nruns, "runs written to", args.output, \
+        "in", time.time() - start, "s")
@@ -0,0 +1,78 @@
+"""
+This file is part of gFlex.
+gFlex computes lithospheric flexural isostasy with heterogeneous rigidity
+Copyright (C) 2010-2018 Andrew D. Wickert
+
+gFlex is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+gFlex is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with gFlex.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+from __future__ import division, print_function # No automatic floor division
+import threading
+from six.moves import queue
+import numpy as np
+
+# READING A TIME SERIES OF LOADS AHEAD OF ITS SOLUTION
+# (see Flexure.run_series). Frames are read in a background thread, which
+# overlaps the I/O (memory-mapped pages, or files parsed one per frame) 
+# with the solution of the frame before; numpy and the sparse solvers 
+# release the GIL for most of their work.
+
+class _End(object):
+  """
+  Marks the end of the frames
+  """
+
+def prefetch(frames, depth=1):
+  """
+  Iterates over "frames" as arrays of floats (copies, so that any that are
+  memory-mapped are read from disk), reading up to "depth" frames ahead of
+  the one in use in a background thread. An error in reading a frame is 
+  raised when that frame is reached.
+  """
+  ready = queue.Queue(depth)
+  stop = threading.Event()
+
+  def put(item):
+    while not stop.is_set():
+      try:
+        ready.put(item, timeout=0.1)
+        return True
+      except queue.Full:
+        pass
+    return False
+
+  def read():
+    try:
+      for frame in frames:
+        if not put((np.array(frame, dtype=float), None)):
+          return # The frames are no longer wanted
+    except BaseException as e: # Including SystemExit from loadFile
+      put((None, e))
+      return
+    put((_End, None))
+
+  thread = threading.Thread(target=read)
+  thread.daemon = True
+  thread.start()
+  try:
+    while True:
+      frame, error = ready.get()
+      if error is not None:
+        raise error
+      if frame is _End:
+        return
+      yield frame
+  finally:
+    stop.set()
@@ -0,0 +1,51 @@
+#! /usr/bin/env python
+
+import gflex
+import numpy as np
+from scipy.sparse.linalg import splu
+
+def solve(BC_W, BC_E, Te, qs):
+    flex = gflex.F1D()
+    flex.Quiet = True
+    flex.Method = 'FD'
+    flex.Solver = 'direct'
+    flex.g = 9.8
+    flex.E = 65E9
+    flex.nu = 0.25
+    flex.rho_m = 3300.
+    flex.rho_fill = 0.
+    flex.Te = Te
+    flex.qs = qs
+    flex.dx = 5000.
+    flex.BC_W = BC_W
+    flex.BC_E = BC_E
+    flex.initialize()
+    flex.run()
+    return flex
+
+def test_main():
+    n = 400
+    Te = 20000. + 5000.*np.sin(np.arange(n)/30.)
+    qs = np.zeros(n)
+    qs[150:200] = 1E6
+    for BC_W, BC_E in [('Periodic', 'Periodic'),
+                       ('0Displacement0Slope', '0Moment0Shear'),
+                       ('Mirror', '0Slope0Shear')]:
+        flex = solve(BC_W, BC_E, Te, qs)
+        assert isinstance(flex.coeff_factor, gflex.banded.PentadiagonalLU)
+        # Same as general sparse LU, for one and for many right-hand sides
+        lu = splu(flex.coeff_matrix.tocsc())
+        w = lu.solve(-qs)
+        assert np.abs(flex.w - w).max() < 1E-10 * np.abs(w).max()
+        b = np.random.RandomState(0).rand(n, 3)
+        assert np.abs(flex.coeff_factor.solve(b) - lu.solve(b)).max() \
+               < 1E-10 * np.abs(lu.solve(b)).max()
+        flex.finalize()
+
+    # Periodic: moving the plate and its loads moves the deflection with them
+    w = solve('Periodic', 'Periodic', Te, qs).w
+    w_rolled = solve('Periodic', 'Periodic', np.roll(Te, 100), np.roll(qs, 100)).w
+    assert np.abs(np.roll(w, 100) - w_rolled).max() < 1E-10 * np.abs(w).max()
+
+if __name__ == '__main__':
+    test_main()
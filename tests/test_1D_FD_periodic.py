@@ -0,0 +1,38 @@
+#! /usr/bin/env python
+
+import gflex
+import numpy as np
+
+def solve(BC, Te, qs):
+    flex = gflex.F1D()
+    flex.Quiet = True
+    flex.Method = 'FD'
+    flex.Solver = 'direct'
+    flex.g = 9.8
+    flex.E = 65E9
+    flex.nu = 0.25
+    flex.rho_m = 3300.
+    flex.rho_fill = 0.
+    flex.Te = Te
+    flex.qs = qs
+    flex.dx = 5000.
+    flex.BC_W = BC
+    flex.BC_E = BC
+    flex.initialize()
+    flex.run()
+    flex.finalize()
+    return flex.w
+
+def test_main():
+    # Far from its ends, a periodic plate of variable Te bends as a free one
+    # does: each node's wrap-around coefficients are its own
+    n = 600
+    Te = 20000. + 8000.*np.sin(np.arange(n)/7.)
+    qs = np.zeros(n)
+    qs[280:320] = 1E6
+    w_periodic = solve('Periodic', Te, qs)
+    w_free = solve('0Moment0Shear', Te, qs)
+    assert np.abs(w_periodic - w_free)[200:400].max() < 1E-6 * np.abs(w_free).max()
+
+if __name__ == '__main__':
+    test_main()
@@ -0,0 +1,50 @@
+#! /usr/bin/env python
+
+import gflex
+import numpy as np
+
+def model(BC_W, BC_E, Te, qs):
+    flex = gflex.F1D()
+    flex.Quiet = True
+    flex.Method = 'FD'
+    flex.Solver = 'direct'
+    flex.g = 9.8
+    flex.E = 65E9
+    flex.nu = 0.25
+    flex.rho_m = 3300.
+    flex.rho_fill = 0.
+    flex.Te = Te
+    flex.qs = qs
+    flex.dx = 5000.
+    flex.BC_W = BC_W
+    flex.BC_E = BC_E
+    flex.initialize()
+    return flex
+
+def test_main():
+    rng = np.random.RandomState(2)
+    Te = 20000. + 8000.*rng.rand(20, 200)
+    qs = np.zeros(Te.shape)
+    qs[:, 60:90] = 1E6 * rng.rand(20, 1)
+    for BC_W, BC_E in [('Periodic', 'Periodic'),
+                       ('0Displacement0Slope', '0Moment0Shear'),
+                       ('Mirror', '0Slope0Shear')]:
+        flex = model(BC_W, BC_E, Te[0], qs[0])
+        w = flex.run_profiles(Te, qs)
+        # The model's own plate is left as it was
+        assert np.all(flex.Te == Te[0])
+        for p in range(len(qs)):
+            single = model(BC_W, BC_E, Te[p], qs[p])
+            single.run()
+            assert np.abs(w[p] - single.w).max() < 1E-9 * np.abs(single.w).max()
+        # The factorization is kept for new loads, and a scalar Te is shared
+        factor = flex.profiles_factor
+        assert np.abs(flex.run_profiles(Te, 2*qs) - 2*w).max() < 1E-9 * np.abs(w).max()
+        assert flex.profiles_factor is factor
+        w = flex.run_profiles(25000., qs)
+        single = model(BC_W, BC_E, 25000., qs[-1])
+        single.run()
+        assert np.abs(w[-1] - single.w).max() < 1E-9 * np.abs(single.w).max()
+
+if __name__ == '__main__':
+    test_main()
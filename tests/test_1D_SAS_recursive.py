@@ -0,0 +1,53 @@
+#! /usr/bin/env python
+
+import gflex
+import numpy as np
+
+def flexure_1D(Method, SAS_evaluator):
+    flex = gflex.F1D()
+    flex.Quiet = True
+    flex.Method = Method
+    flex.SAS_evaluator = SAS_evaluator
+    flex.g = 9.8
+    flex.E = 65E9
+    flex.nu = 0.25
+    flex.rho_m = 3300.
+    flex.rho_fill = 1000.
+    flex.Te = 20000.
+    return flex
+
+def test_main():
+    np.random.seed(0)
+
+    # Gridded
+    qs = np.zeros(400)
+    qs[50:120] += 1E6
+    qs[300] += 5E6
+    w = {}
+    for SAS_evaluator in ['direct', 'recursive']:
+        flex = flexure_1D('SAS', SAS_evaluator)
+        flex.qs = qs.copy()
+        flex.dx = 4000.
+        flex.initialize()
+        flex.run()
+        flex.finalize()
+        w[SAS_evaluator] = flex.w
+    assert np.allclose(w['recursive'], w['direct'], rtol=1E-10, atol=1E-12)
+
+    # Ungridded, with unsorted points and separate output points
+    x = np.random.rand(200) * 2E6
+    q = np.random.rand(200) * 1E10
+    xw = np.hstack(( np.random.rand(100) * 3E6 - 5E5, x[:10] ))
+    for SAS_evaluator in ['direct', 'recursive']:
+        flex = flexure_1D('SAS_NG', SAS_evaluator)
+        flex.x = x.copy()
+        flex.q = q.copy()
+        flex.xw = xw.copy()
+        flex.initialize()
+        flex.run()
+        flex.finalize()
+        w[SAS_evaluator] = flex.w
+    assert np.allclose(w['recursive'], w['direct'], rtol=1E-10, atol=1E-12)
+
+if __name__ == '__main__':
+    test_main()
@@ -0,0 +1,56 @@
+#! /usr/bin/env python
+
+import gflex
+import numpy as np
+
+def test_main(Solver='direct'):
+    flex = gflex.F2D()
+
+    flex.Quiet = True
+
+    flex.Method = 'FD'
+    flex.PlateSolutionType = 'vWC1994'
+    flex.Solver = Solver
+    flex.iterative_ConvergenceTolerance = 1E-6
+
+    flex.g = 9.8
+    flex.E = 65E9
+    flex.nu = 0.25
+    flex.rho_m = 3300.
+    flex.rho_fill = 0.
+
+    flex.Te = 35000.*np.ones((30, 40))
+    flex.Te[:,-3:] = 10000.
+    flex.dx = 5000.
+    flex.dy = 5000.
+    flex.BC_W = '0Displacement0Slope'
+    flex.BC_E = '0Moment0Shear'
+    flex.BC_S = 'Mirror'
+    flex.BC_N = '0Slope0Shear'
+
+    # A few different load scenarios
+    qs_stack = np.zeros((5, 30, 40))
+    for k in range(5):
+        qs_stack[k, 5+k:20+k, 10:15+3*k] = 1E6 * (k+1)
+    flex.qs = qs_stack[0]
+
+    flex.initialize()
+    w_stack = flex.run_batch(qs_stack, block_size=2)
+    if Solver == 'multigrid':
+        # Solved without factorizing the matrix
+        assert flex.coeff_factor is None
+    flex.finalize()
+
+    # Each deflection matches its own single run
+    for k in range(5):
+        flex.qs = qs_stack[k].copy()
+        flex.run()
+        flex.finalize()
+        assert np.allclose(w_stack[k], flex.w)
+
+def test_multigrid():
+    test_main('multigrid')
+
+if __name__ == '__main__':
+    test_main()
+    test_multigrid()
@@ -0,0 +1,111 @@
+#! /usr/bin/env python
+
+import gflex
+import numpy as np
+
+def make_flex(Solver, BC, Te):
+    flex = gflex.F2D()
+
+    flex.Quiet = True
+
+    flex.Method = 'FD'
+    flex.PlateSolutionType = 'vWC1994'
+    flex.Solver = Solver
+    flex.iterative_ConvergenceTolerance = 1E-4
+
+    flex.g = 9.8
+    flex.E = 65E9
+    flex.nu = 0.25
+    flex.rho_m = 3300.
+    flex.rho_fill = 0.
+
+    flex.Te = Te
+    flex.qs = np.zeros(Te.shape)
+    flex.qs[10:20, 15:25] = 1E7
+    flex.dx = 5000.
+    flex.dy = 4000.
+    flex.BC_W = BC
+    flex.BC_E = BC
+    flex.BC_S = BC
+    flex.BC_N = BC
+    return flex
+
+def solve(flex):
+    flex.initialize()
+    flex.run()
+    flex.finalize()
+    return flex.w
+
+def test_preconditioners():
+    # Variable Te: tolerance is met by each Krylov method
+    Te = 30000.*np.ones((32, 40))
+    Te[:,25:] = 8000.
+    w_direct = solve(make_flex('direct', '0Slope0Shear', Te))
+    for IterativeMethod, Preconditioner in [('lgmres', 'ilu'),
+                                            ('gmres', 'ilu'),
+                                            ('bicgstab', 'ilu'),
+                                            ('lgmres', 'block-jacobi')]:
+        flex = make_flex('iterative', '0Slope0Shear', Te)
+        flex.IterativeMethod = IterativeMethod
+        flex.Preconditioner = Preconditioner
+        w = solve(flex)
+        assert np.abs(w - w_direct).max() < 1E-4
+        assert flex.iterative_iterations > 0
+        assert flex.iterative_converged
+        if IterativeMethod == 'gmres':
+            # Reported by the solver itself
+            assert flex.iterative_iterations == len(flex.iterative_residuals)
+        else:
+            assert len(flex.iterative_residuals) == 0
+    # With Debug, every method records the residual of each iteration
+    flex = make_flex('iterative', '0Slope0Shear', Te)
+    flex.IterativeMethod = 'bicgstab'
+    flex.initialize()
+    flex.Debug = True
+    flex.run()
+    flex.finalize()
+    assert flex.iterative_iterations == len(flex.iterative_residuals)
+    assert flex.iterative_residuals[-1] < flex.iterative_residuals[0]
+
+def test_spectral():
+    # Constant Te and mirror b.c.'s: the spectral preconditioner is exact
+    Te = 25000.*np.ones((32, 40))
+    w_direct = solve(make_flex('direct', 'Mirror', Te))
+    flex = make_flex('iterative', 'Mirror', Te)
+    flex.Preconditioner = 'spectral'
+    w = solve(flex)
+    assert np.abs(w - w_direct).max() < 1E-4
+    assert flex.iterative_iterations <= 2
+
+def test_not_converged():
+    # A tolerance that is not met within IterativeMaxIterations is flagged,
+    # also for batches of loads
+    Te = 30000.*np.ones((12, 14))
+    flex = make_flex('iterative', '0Slope0Shear', Te)
+    flex.qs = np.zeros(Te.shape)
+    flex.qs[4:8, 5:9] = 1E7
+    flex.IterativeMethod = 'bicgstab'
+    flex.Preconditioner = 'none'
+    flex.IterativeMaxIterations = 3
+    flex.initialize()
+    flex.run()
+    assert not flex.iterative_converged
+    assert flex.iterative_iterations == 3
+    flex.run_batch(np.array([flex.qs, 2*flex.qs]))
+    assert not flex.iterative_converged
+    flex.IterativeMaxIterations = 1000
+    flex.run_batch(np.array([flex.qs, 2*flex.qs]))
+    assert flex.iterative_converged
+    # gmres counts inner iterations, and stops after whole restart cycles
+    flex.IterativeMethod = 'gmres'
+    flex.IterativeMaxIterations = 5
+    flex.WarmStart = 'none'
+    flex.run()
+    assert not flex.iterative_converged
+    assert flex.iterative_iterations <= 20
+    flex.finalize()
+
+if __name__ == '__main__':
+    test_preconditioners()
+    test_spectral()
+    test_not_converged()
@@ -0,0 +1,83 @@
+#! /usr/bin/env python
+
+import gflex
+import numpy as np
+
+def make_flex(Assembly, BC, PlateSolutionType='vWC1994', load=1E7,
+              Solver='iterative', Preconditioner='spectral', shape=(32, 40)):
+    flex = gflex.F2D()
+
+    flex.Quiet = True
+
+    flex.Method = 'FD'
+    flex.PlateSolutionType = PlateSolutionType
+    flex.Solver = Solver
+    flex.Assembly = Assembly
+    flex.Preconditioner = Preconditioner
+    flex.iterative_ConvergenceTolerance = 1E-5
+
+    flex.g = 9.8
+    flex.E = 65E9
+    flex.nu = 0.25
+    flex.rho_m = 3300.
+    flex.rho_fill = 0.
+
+    y, x = np.mgrid[0:shape[0], 0:shape[1]]
+    flex.Te = 20000. + 5000.*np.sin(2*np.pi*x/shape[1])*np.cos(2*np.pi*y/shape[0])
+    flex.qs = np.zeros(flex.Te.shape)
+    flex.qs[10:20, 15:25] = load
+    flex.dx = 5000.
+    flex.dy = 4000.
+    flex.BC_W = BC[0]
+    flex.BC_E = BC[0]
+    flex.BC_S = BC[1]
+    flex.BC_N = BC[1]
+
+    flex.initialize()
+    flex.run()
+    return flex
+
+def test_operator():
+    # Matrix-free operator and sparse matrix give the same products
+    # (no load, so that the solutions are trivial)
+    x = np.random.RandomState(0).randn(32*40)
+    for BC in [('0Slope0Shear', '0Moment0Shear'),
+               ('0Displacement0Slope', 'Mirror'),
+               ('Periodic', 'Periodic')]:
+        for PlateSolutionType in ['vWC1994', 'G2009']:
+            A = make_flex('stencil', BC, PlateSolutionType, 0.).coeff_matrix
+            op = make_flex('matrixfree', BC, PlateSolutionType, 0.).coeff_matrix
+            Ax = A.dot(x)
+            assert np.abs(op.dot(x) - Ax).max() < 1E-12 * np.abs(Ax).max()
+            assert np.allclose(op.diagonal(), A.diagonal(), rtol=1E-12)
+            l1 = np.asarray(abs(A).sum(axis=1)).ravel()
+            assert np.allclose(op.l1_norms(), l1, rtol=1E-12)
+            cells = np.array([0, 41, 100, 655, 1279])
+            assert np.abs(op.rows(cells) - A[cells]).max() < 1E-12 * np.abs(A).max()
+
+def test_solve():
+    w_matrix = make_flex('stencil', ('Mirror', 'Mirror')).w
+    flex = make_flex('matrixfree', ('Mirror', 'Mirror'))
+    assert np.abs(flex.w - w_matrix).max() < 1E-4
+    assert flex.iterative_iterations > 0
+
+def test_multigrid():
+    # Free and mixed edges with variable Te, where the spectral 
+    # preconditioner fails, with the multigrid preconditioner (the default),
+    # on a grid large enough for a matrix-free level and a rediscretized one
+    shape = (52, 60)
+    for BC in [('0Moment0Shear', '0Moment0Shear'),
+               ('0Slope0Shear', '0Moment0Shear'),
+               ('Periodic', '0Moment0Shear')]:
+        w_direct = make_flex('stencil', BC, Solver='direct', shape=shape).w
+        flex = make_flex('matrixfree', BC, Preconditioner=None, shape=shape)
+        assert flex.Preconditioner == 'multigrid'
+        assert len(flex.fd_multigrid().levels) == 1
+        assert flex.iterative_converged
+        assert flex.iterative_iterations < 10
+        assert np.abs(flex.w - w_direct).max() < 1E-4
+
+if __name__ == '__main__':
+    test_operator()
+    test_solve()
+    test_multigrid()
@@ -0,0 +1,56 @@
+#! /usr/bin/env python
+
+import gflex
+import numpy as np
+
+def solve(Solver, BC, PlateSolutionType='vWC1994', Preconditioner='ilu'):
+    flex = gflex.F2D()
+
+    flex.Quiet = True
+
+    flex.Method = 'FD'
+    flex.PlateSolutionType = PlateSolutionType
+    flex.Solver = Solver
+    flex.Preconditioner = Preconditioner
+    flex.iterative_ConvergenceTolerance = 1E-5
+
+    flex.g = 9.8
+    flex.E = 65E9
+    flex.nu = 0.25
+    flex.rho_m = 3300.
+    flex.rho_fill = 0.
+
+    y, x = np.mgrid[0:72, 0:80]
+    flex.Te = 20000. + 10000.*np.sin(2*np.pi*x/80.)*np.cos(2*np.pi*y/72.)
+    flex.qs = np.zeros(flex.Te.shape)
+    flex.qs[20:35, 25:40] = 1E7
+    flex.dx = 5000.
+    flex.dy = 4000.
+    flex.BC_W = BC
+    flex.BC_E = BC
+    flex.BC_S = BC
+    flex.BC_N = BC
+
+    flex.initialize()
+    flex.run()
+    flex.finalize()
+    return flex
+
+def test_main():
+    for BC in ['0Slope0Shear', '0Moment0Shear', '0Displacement0Slope',
+               'Mirror', 'Periodic']:
+        for PlateSolutionType in ['vWC1994', 'G2009']:
+            w_direct = solve('direct', BC, PlateSolutionType).w
+            flex = solve('multigrid', BC, PlateSolutionType)
+            assert np.abs(flex.w - w_direct).max() < 1E-4
+            assert flex.iterative_iterations > 0
+
+def test_preconditioner():
+    w_direct = solve('direct', '0Moment0Shear').w
+    flex = solve('iterative', '0Moment0Shear', Preconditioner='multigrid')
+    assert np.abs(flex.w - w_direct).max() < 1E-4
+    assert flex.iterative_iterations < 10
+
+if __name__ == '__main__':
+    test_main()
+    test_preconditioner()
@@ -0,0 +1,52 @@
+#! /usr/bin/env python
+
+import gflex
+import numpy as np
+
+def series(WarmStart, Solver='iterative'):
+    flex = gflex.F2D()
+    flex.Quiet = True
+    flex.Method = 'FD'
+    flex.PlateSolutionType = 'vWC1994'
+    flex.Solver = Solver
+    flex.IterativeMethod = 'bicgstab'
+    flex.iterative_ConvergenceTolerance = 1E-5
+    flex.WarmStart = WarmStart
+    flex.g = 9.8
+    flex.E = 65E9
+    flex.nu = 0.25
+    flex.rho_m = 3300.
+    flex.rho_fill = 0.
+    y, x = np.mgrid[0:48, 0:60]
+    flex.Te = 20000. + 10000.*np.sin(2*np.pi*x/60.)*np.cos(2*np.pi*y/48.)
+    flex.dx = 5000.
+    flex.dy = 4000.
+    flex.BC_W = '0Moment0Shear'
+    flex.BC_E = '0Moment0Shear'
+    flex.BC_N = '0Moment0Shear'
+    flex.BC_S = '0Moment0Shear'
+    # A load that grows steadily with time
+    frames = [1E7*np.exp(-((x-25)**2 + (y-20)**2)/50.)*(1 + 0.01*t)
+              for t in range(6)]
+    flex.qs = frames[0]
+    flex.initialize()
+    w = np.array(list(flex.run_series(frames)))
+    flex.finalize()
+    return flex, w
+
+def test_main():
+    w_direct = series('none', 'direct')[1]
+    cold, w = series('none')
+    assert np.abs(w - w_direct).max() < 1E-4
+    assert len(cold.iterative_iterations_per_run) == 6
+    previous, w = series('previous')
+    assert np.abs(w - w_direct).max() < 1E-4
+    assert sum(previous.iterative_iterations_per_run) < \
+           sum(cold.iterative_iterations_per_run)
+    # Exact for loads that change linearly
+    extrapolate, w = series('extrapolate')
+    assert np.abs(w - w_direct).max() < 1E-4
+    assert max(extrapolate.iterative_iterations_per_run[2:]) <= 1
+
+if __name__ == '__main__':
+    test_main()
@@ -0,0 +1,48 @@
+#! /usr/bin/env python
+
+import gflex
+import numpy as np
+from scipy.special import kei
+
+def test_main():
+    flex = gflex.F2D()
+
+    flex.Quiet = True
+
+    flex.Method = 'SAS'
+
+    flex.g = 9.8
+    flex.E = 65E9
+    flex.nu = 0.25
+    flex.rho_m = 3300.
+    flex.rho_fill = 0.
+
+    flex.Te = 30000.
+    flex.qs = np.zeros((25, 30))
+    flex.qs[5:12, 8:20] += 1E6
+    flex.qs[18, 3] += 3E6
+    flex.dx = 5000.
+    flex.dy = 7000.
+    flex.BC_W = 'NoOutsideLoads'
+    flex.BC_E = 'NoOutsideLoads'
+    flex.BC_S = 'NoOutsideLoads'
+    flex.BC_N = 'NoOutsideLoads'
+
+    flex.initialize()
+    flex.run()
+    flex.finalize()
+
+    # Compare against explicit superposition of the point-load solutions
+    ny, nx = flex.qs.shape
+    x = (np.arange(2*nx+1) - nx) * flex.dx
+    y = (np.arange(2*ny+1) - ny) * flex.dy
+    x, y = np.meshgrid(x, y)
+    biggrid = flex.coeff * kei(np.sqrt(x**2 + y**2)/flex.alpha)
+    w = np.zeros((ny, nx))
+    for j, i in zip(*np.nonzero(flex.qs)):
+        w += flex.qs[j,i] * flex.dx * flex.dy \
+             * biggrid[ny-j:2*ny-j, nx-i:2*nx-i]
+    assert np.allclose(flex.w, w, rtol=1E-10, atol=1E-10*np.abs(w).max())
+
+if __name__ == '__main__':
+    test_main()
@@ -0,0 +1,70 @@
+#! /usr/bin/env python
+
+import gflex
+import numpy as np
+from scipy.special import kei
+
+def solve(**kwargs):
+    flex = gflex.F2D()
+
+    flex.Quiet = True
+
+    flex.Method = 'SAS_NG'
+    flex.latlon = True
+    flex.PlanetaryRadius = 6371000.
+
+    flex.g = 9.8
+    flex.E = 65E9
+    flex.nu = 0.25
+    flex.rho_m = 3300.
+    flex.rho_fill = 0.
+    flex.Te = 30000.
+
+    rng = np.random.RandomState(7)
+    flex.x = rng.rand(200)*40. - 20.
+    flex.y = rng.rand(200)*40. + 30.
+    flex.q = rng.rand(200)*1E12
+    # Some output points are at loads
+    flex.xw = np.concatenate((flex.x[:10], rng.rand(1000)*40. - 20.))
+    flex.yw = np.concatenate((flex.y[:10], rng.rand(1000)*40. + 30.))
+    flex.BC_W = 'NoOutsideLoads'
+    flex.BC_E = 'NoOutsideLoads'
+    flex.BC_S = 'NoOutsideLoads'
+    flex.BC_N = 'NoOutsideLoads'
+
+    for key in kwargs:
+        setattr(flex, key, kwargs[key])
+
+    flex.initialize()
+    flex.run()
+    flex.finalize()
+    return flex
+
+def test_main():
+    flex = solve()
+    assert np.all(np.isfinite(flex.w))
+    w = np.zeros(flex.xw.shape)
+    for i in range(len(flex.q)):
+        r = flex.greatCircleDistance(flex.y[i], flex.x[i], flex.yw, flex.xw,
+                                     flex.PlanetaryRadius)
+        w += flex.q[i] * flex.coeff * kei(r / flex.alpha)
+    assert np.abs(flex.w - w).max() < 1E-8 * np.abs(w).max()
+
+def test_greatCircleDistance():
+    flex = gflex.F2D()
+    R = 6371000.
+    # Quarter of a great circle, a point to itself, and 1 mm along a meridian
+    assert abs(flex.greatCircleDistance(0., 0., 0., 90., R) - np.pi*R/2.) < 1E-6
+    assert flex.greatCircleDistance(45., 10., 45., 10., R) == 0.
+    d = np.degrees(1E-3 / R)
+    assert abs(flex.greatCircleDistance(0., 10., d, 10., R) - 1E-3) < 1E-12
+
+def test_truncated():
+    w = solve().w
+    w_truncated = solve(SAS_NG_TruncationRadius=3E6).w
+    assert np.abs(w_truncated - w).max() < 1E-8 * np.abs(w).max()
+
+if __name__ == '__main__':
+    test_main()
+    test_greatCircleDistance()
+    test_truncated()
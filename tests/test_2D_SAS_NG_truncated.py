@@ -0,0 +1,61 @@
+#! /usr/bin/env python
+
+import gflex
+import numpy as np
+
+def solve(latlon=False, **truncation):
+    flex = gflex.F2D()
+
+    flex.Quiet = True
+
+    flex.Method = 'SAS_NG'
+    flex.g = 9.8
+    flex.E = 65E9
+    flex.nu = 0.25
+    flex.rho_m = 3300.
+    flex.rho_fill = 0.
+    flex.Te = 30000.
+
+    rng = np.random.RandomState(0)
+    if latlon:
+        flex.latlon = True
+        flex.PlanetaryRadius = 6371000.
+        flex.x = 10.*rng.rand(200)
+        flex.y = 40. + 10.*rng.rand(200)
+        flex.xw = -1. + 12.*rng.rand(5000)
+        flex.yw = 39. + 12.*rng.rand(5000)
+    else:
+        flex.x = 1E6*rng.rand(200)
+        flex.y = 1E6*rng.rand(200)
+        flex.xw = 1.2E6*rng.rand(5000) - 1E5
+        flex.yw = 1.2E6*rng.rand(5000) - 1E5
+        # Some output points on the loads
+        flex.xw[:200] = flex.x
+        flex.yw[:200] = flex.y
+    flex.q = 1E12*rng.rand(200)
+    for name in truncation:
+        setattr(flex, name, truncation[name])
+    flex.BC_W = 'NoOutsideLoads'
+    flex.BC_E = 'NoOutsideLoads'
+    flex.BC_S = 'NoOutsideLoads'
+    flex.BC_N = 'NoOutsideLoads'
+
+    flex.initialize()
+    flex.run()
+    flex.finalize()
+    return flex
+
+def test_main():
+    for latlon in [False, True]:
+        w_full = solve(latlon).w
+        # The deflection that is left out is within the reported bound
+        for truncation in [{'SAS_NG_TruncationRadius': 2E5},
+                           {'SAS_NG_TruncationTolerance': 1E-5}]:
+            flex = solve(latlon, **truncation)
+            error = np.abs(flex.w - w_full).max()
+            assert error <= flex.SAS_NG_truncation_error
+            if 'SAS_NG_TruncationTolerance' in truncation:
+                assert flex.SAS_NG_truncation_error <= 1E-5
+
+if __name__ == '__main__':
+    test_main()
@@ -0,0 +1,79 @@
+#! /usr/bin/env python
+
+import gflex
+import numpy as np
+import os
+import glob
+import shutil
+import tempfile
+
+def solve(cache, Te, CoeffMatrixCacheSize=None, Assembly='stencil', BC='Periodic'):
+    flex = gflex.F2D()
+
+    flex.Quiet = True
+
+    flex.Method = 'FD'
+    flex.PlateSolutionType = 'vWC1994'
+    flex.Solver = 'direct'
+    flex.CoeffMatrixCache = cache
+    flex.CoeffMatrixCacheSize = CoeffMatrixCacheSize
+    flex.Assembly = Assembly
+
+    flex.g = 9.8
+    flex.E = 65E9
+    flex.nu = 0.25
+    flex.rho_m = 3300.
+    flex.rho_fill = 0.
+
+    flex.Te = Te
+    flex.qs = np.zeros(Te.shape)
+    flex.qs[10:20, 15:25] = 1E7
+    flex.dx = 5000.
+    flex.dy = 4000.
+    flex.BC_W = BC
+    flex.BC_E = BC
+    flex.BC_S = '0Moment0Shear'
+    flex.BC_N = '0Moment0Shear'
+
+    flex.initialize()
+    flex.run()
+    A = flex.coeff_matrix
+    flex.finalize()
+    return flex.w, A
+
+def test_main():
+    cache = tempfile.mkdtemp()
+    try:
+        Te = 20000.*np.ones((30, 40))
+        Te[:,20:] = 10000.
+        w_built, A_built = solve(cache, Te)
+        assert len(glob.glob(os.path.join(cache, '*.npz'))) == 1
+        # Second run: loaded from the cache, not rebuilt
+        w_cached, A_cached = solve(cache, Te)
+        assert (A_cached != A_built).nnz == 0
+        assert np.all(w_cached == w_built)
+        # A new plate is added; with a small cache, the old one is evicted
+        solve(cache, 1.5*Te, CoeffMatrixCacheSize=1E-3)
+        assert len(glob.glob(os.path.join(cache, '*.npz'))) == 1
+        w_rebuilt, A_rebuilt = solve(cache, Te)
+        assert np.all(w_rebuilt == w_built)
+    finally:
+        shutil.rmtree(cache)
+
+def test_assembly():
+    # Matrices from one assembly method are not reused by another
+    cache = tempfile.mkdtemp()
+    try:
+        Te = 20000.*np.ones((30, 40))
+        Te[:,20:] = 10000.
+        solve(cache, Te, Assembly='diagonals', BC='Mirror')
+        w_cached, A_cached = solve(cache, Te, Assembly='stencil', BC='Mirror')
+        assert len(glob.glob(os.path.join(cache, '*.npz'))) == 2
+        w_built, A_built = solve(None, Te, Assembly='stencil', BC='Mirror')
+        assert (A_cached != A_built).nnz == 0
+    finally:
+        shutil.rmtree(cache)
+
+if __name__ == '__main__':
+    test_main()
+    test_assembly()
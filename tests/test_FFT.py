@@ -0,0 +1,65 @@
+#! /usr/bin/env python
+
+import gflex
+import numpy as np
+
+def flexure(model, Method):
+    flex = model()
+    flex.Quiet = True
+    flex.Method = Method
+    flex.g = 9.8
+    flex.E = 65E9
+    flex.nu = 0.25
+    flex.rho_m = 3300.
+    flex.rho_fill = 0.
+    flex.Te = 30000.
+    return flex
+
+def test_1D():
+    x = np.arange(300)
+    qs = 1E6 * np.exp(-((x-100)/10.)**2)
+    w = {}
+    for Method in ['SAS', 'FFT']:
+        flex = flexure(gflex.F1D, Method)
+        flex.qs = qs.copy()
+        flex.dx = 5000.
+        flex.initialize()
+        flex.run()
+        flex.finalize()
+        w[Method] = flex.w
+    assert np.abs(w['FFT'] - w['SAS']).max() < 1E-5 * np.abs(w['SAS']).max()
+
+def test_2D():
+    y, x = np.mgrid[:50, :70]
+    qs = 1E6 * np.exp(-((x-30)**2 + (y-20)**2)/40.)
+    w = {}
+    for Method in ['SAS', 'FFT']:
+        flex = flexure(gflex.F2D, Method)
+        flex.qs = qs.copy()
+        flex.dx = 5000.
+        flex.dy = 6000.
+        flex.initialize()
+        flex.run()
+        flex.finalize()
+        w[Method] = flex.w
+    assert np.abs(w['FFT'] - w['SAS']).max() < 1E-4 * np.abs(w['SAS']).max()
+
+def test_2D_periodic():
+    # A uniform load is balanced by isostasy alone
+    flex = flexure(gflex.F2D, 'FFT')
+    flex.qs = 1E6 * np.ones((20, 30))
+    flex.dx = 5000.
+    flex.dy = 5000.
+    flex.BC_W = 'Periodic'
+    flex.BC_E = 'Periodic'
+    flex.BC_S = 'Periodic'
+    flex.BC_N = 'Periodic'
+    flex.initialize()
+    flex.run()
+    flex.finalize()
+    assert np.allclose(flex.w, -1E6 / (flex.drho * flex.g))
+
+if __name__ == '__main__':
+    test_1D()
+    test_2D()
+    test_2D_periodic()
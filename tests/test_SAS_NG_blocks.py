@@ -0,0 +1,53 @@
+#! /usr/bin/env python
+
+import gflex
+import numpy as np
+
+def solve(model, block_bytes, **kwargs):
+    flex = model()
+
+    flex.Quiet = True
+
+    flex.Method = 'SAS_NG'
+
+    flex.g = 9.8
+    flex.E = 65E9
+    flex.nu = 0.25
+    flex.rho_m = 3300.
+    flex.rho_fill = 0.
+    flex.Te = 30000.
+
+    for key in kwargs:
+        setattr(flex, key, kwargs[key])
+    flex.SAS_NG_block_bytes = block_bytes
+
+    flex.initialize()
+    flex.run()
+    flex.finalize()
+    return flex.w
+
+def test_2D():
+    rng = np.random.RandomState(3)
+    kwargs = {'x': rng.rand(300)*1E6, 'y': rng.rand(300)*1E6,
+              'q': rng.rand(300)*1E12,
+              'xw': rng.rand(2000)*1E6, 'yw': rng.rand(2000)*1E6,
+              'BC_W': 'NoOutsideLoads', 'BC_E': 'NoOutsideLoads',
+              'BC_S': 'NoOutsideLoads', 'BC_N': 'NoOutsideLoads'}
+    kwargs['q'][::5] = 0.
+    w = solve(gflex.F2D, 2.**22, **kwargs)
+    w_blocks = solve(gflex.F2D, 2.**12, **kwargs)
+    assert w.shape == (2000,)
+    assert np.abs(w_blocks - w).max() <= 1E-12 * np.abs(w).max()
+
+def test_1D_direct():
+    rng = np.random.RandomState(4)
+    kwargs = {'x': rng.rand(300)*1E6, 'q': rng.rand(300)*1E12,
+              'xw': rng.rand(2000)*1E6,
+              'BC_W': 'NoOutsideLoads', 'BC_E': 'NoOutsideLoads'}
+    w = solve(gflex.F1D, 2.**12, SAS_evaluator='direct', **kwargs)
+    w_recursive = solve(gflex.F1D, 2.**22, **kwargs)
+    assert np.abs(w - w_recursive).max() <= 1E-12 * np.abs(w_recursive).max()
+
+if __name__ == '__main__':
+    test_2D()
+    test_1D_direct()
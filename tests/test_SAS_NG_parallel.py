@@ -0,0 +1,52 @@
+#! /usr/bin/env python
+
+import gflex
+import numpy as np
+
+def solve(model, n_workers, **kwargs):
+    flex = model()
+
+    flex.Quiet = True
+
+    flex.Method = 'SAS_NG'
+
+    flex.g = 9.8
+    flex.E = 65E9
+    flex.nu = 0.25
+    flex.rho_m = 3300.
+    flex.rho_fill = 0.
+    flex.Te = 30000.
+
+    for key in kwargs:
+        setattr(flex, key, kwargs[key])
+    flex.n_workers = n_workers
+    # Small blocks, so the work is divided into many units
+    flex.SAS_NG_block_bytes = 2.**14
+
+    flex.initialize()
+    flex.run()
+    flex.finalize()
+    return flex.w
+
+def test_2D():
+    rng = np.random.RandomState(5)
+    kwargs = {'x': rng.rand(400)*1E6, 'y': rng.rand(400)*1E6,
+              'q': rng.rand(400)*1E12,
+              'xw': rng.rand(1000)*1E6, 'yw': rng.rand(1000)*1E6,
+              'BC_W': 'NoOutsideLoads', 'BC_E': 'NoOutsideLoads',
+              'BC_S': 'NoOutsideLoads', 'BC_N': 'NoOutsideLoads'}
+    w = solve(gflex.F2D, 1, **kwargs)
+    for n_workers in [2, 3]:
+        assert np.array_equal(solve(gflex.F2D, n_workers, **kwargs), w)
+
+def test_1D_direct():
+    rng = np.random.RandomState(6)
+    kwargs = {'x': rng.rand(400)*1E6, 'q': rng.rand(400)*1E12,
+              'xw': rng.rand(1000)*1E6, 'SAS_evaluator': 'direct',
+              'BC_W': 'NoOutsideLoads', 'BC_E': 'NoOutsideLoads'}
+    w = solve(gflex.F1D, 1, **kwargs)
+    assert np.array_equal(solve(gflex.F1D, 2, **kwargs), w)
+
+if __name__ == '__main__':
+    test_2D()
+    test_1D_direct()
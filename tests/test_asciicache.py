@@ -0,0 +1,57 @@
+#! /usr/bin/env python
+
+import gflex
+import numpy as np
+import os
+import shutil
+import tempfile
+import time
+
+def test_main():
+    path = tempfile.mkdtemp()
+    try:
+        grid = os.path.join(path, 'Te.txt')
+        Te = 20000. + 5000.*np.random.RandomState(3).rand(30, 40)
+        np.savetxt(grid, Te)
+        with open(os.path.join(path, 'notes.ini'), 'w') as f:
+            f.write('[input]\nLoads=q0\n')
+
+        # Sidecar: parsed and cached once, then memory-mapped
+        sidecar = gflex.asciicache.cache_file(grid)
+        assert os.path.dirname(sidecar) == os.path.realpath(path)
+        assert np.all(gflex.asciicache.load(grid) == np.loadtxt(grid))
+        assert os.path.isfile(sidecar)
+        out = gflex.asciicache.load(grid)
+        assert isinstance(out, np.memmap)
+        assert np.all(out == np.loadtxt(grid))
+        del out
+
+        # A changed file is parsed again, and its old copy removed
+        np.savetxt(grid, 2*Te)
+        os.utime(grid, (time.time() + 10, time.time() + 10))
+        assert not gflex.asciicache.is_fresh(grid)
+        assert np.all(gflex.asciicache.load(grid) == np.loadtxt(grid))
+        assert not os.path.isfile(sidecar)
+        assert len([name for name in os.listdir(path) if name.endswith('.npy')]) == 1
+
+        # Pre-warming a tree into a cache directory: the grid, but not the 
+        # configuration file nor the sidecar
+        cache_dir = os.path.join(path, 'cache')
+        assert gflex.asciicache.prewarm(path, cache_dir, Quiet=True) == (1, 0)
+        assert gflex.asciicache.prewarm(path, cache_dir, Quiet=True) == (0, 1)
+        assert gflex.asciicache.is_fresh(grid, cache_dir)
+
+        # Through the model
+        flex = gflex.F2D()
+        flex.Verbose = False
+        flex.ascii_cache = 'cache'
+        flex.inpath = path + '/'
+        out = flex.loadFile('Te.txt')
+        assert isinstance(out, np.memmap)
+        assert np.all(out == 2*Te)
+        del out
+    finally:
+        shutil.rmtree(path)
+
+if __name__ == '__main__':
+    test_main()
@@ -0,0 +1,88 @@
+#! /usr/bin/env python
+
+import gflex
+import numpy as np
+import os
+import shutil
+import tempfile
+
+batch = gflex.batch
+
+config = """
+[mode]
+dimension=2
+method=%s
+PlateSolutionType=vWC1994
+
+[parameter]
+YoungsModulus=6.5E10
+PoissonsRatio=0.25
+GravAccel=9.8
+MantleDensity=3300
+InfillMaterialDensity=0
+
+[input]
+Loads=%s
+ElasticThickness=25000
+
+[output]
+DeflectionOut=%s
+Plot=
+
+[numerical]
+GridSpacing_x=5000
+BoundaryCondition_West=0Moment0Shear
+BoundaryCondition_East=0Displacement0Slope
+Solver=direct
+ConvergenceTolerance=1E-3
+
+[numerical2D]
+GridSpacing_y=4000
+BoundaryCondition_North=Mirror
+BoundaryCondition_South=0Slope0Shear
+
+[verbosity]
+Verbose=false
+Debug=false
+Quiet=true
+"""
+
+def test_main():
+    path = tempfile.mkdtemp()
+    try:
+        qs = np.zeros((30, 40))
+        qs[10:20, 15:25] = 1E7
+        np.savetxt(os.path.join(path, 'loads.txt'), qs)
+        runs = [('FD', 'loads.txt'), ('FD', 'loads.txt'), ('SAS', 'loads.txt'),
+                ('SAS', 'loads.txt'), ('FD', 'missing.txt')]
+        for i, (method, loads) in enumerate(runs):
+            with open(os.path.join(path, 'c%d' % i), 'w') as f:
+                f.write(config % (method, loads, os.path.join(path, 'w%d.npy' % i)))
+        with open(os.path.join(path, 'manifest'), 'w') as f:
+            f.write('# Runs\nc2\nc3\n\nc4\n')
+        filenames = [os.path.join(path, 'c0'), os.path.join(path, 'c1')] + \
+                    batch.read_manifest(os.path.join(path, 'manifest'))
+        rows = batch.run_files(filenames)
+        assert [row['status'] for row in rows[:4]] == ['ok']*4
+        assert rows[4]['status'].startswith('exit')
+        assert [row['method'] for row in rows[:4]] == ['FD', 'FD', 'SAS', 'SAS']
+        assert rows[0]['output'] == os.path.join(path, 'w0.npy')
+        # Runs on the same plate share a matrix (or kernel), with the same answer
+        w = [np.load(os.path.join(path, 'w%d.npy' % i)) for i in range(4)]
+        assert np.all(w[0] == w[1]) and np.all(w[2] == w[3])
+        # Sharing is only for the batch
+        assert gflex.Flexure.shared_operators is None
+        rows_pool = batch.run_files(filenames[:4], n_workers=2)
+        assert [row['status'] for row in rows_pool] == ['ok']*4
+        assert np.all(np.load(os.path.join(path, 'w0.npy')) == w[0])
+        with open(os.path.join(path, 'summary'), 'w') as f:
+            batch.write_summary(rows, f)
+        with open(os.path.join(path, 'summary')) as f:
+            lines = f.read().splitlines()
+        assert lines[0].split('\t') == batch.columns
+        assert len(lines) == 6
+    finally:
+        shutil.rmtree(path)
+
+if __name__ == '__main__':
+    test_main()
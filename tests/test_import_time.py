@@ -0,0 +1,37 @@
+#! /usr/bin/env python
+
+import os
+import subprocess
+import sys
+
+# Importing gflex should not load the plotting stack or the sparse solvers:
+# these come in only when a plot or a solver is first used
+heavy = ['matplotlib', 'scipy.sparse', 'scipy.special', 'scipy.spatial']
+# Nor the helper modules, which are imported on first use (Python 3.7+)
+helpers = ['sweep', 'batch', 'asciicache', 'timeseries']
+
+script = """
+import sys, time
+start = time.time()
+import gflex
+print(time.time() - start)
+print(' '.join(sorted(m for m in %r if m in sys.modules)))
+""" % (heavy + (helpers if sys.version_info >= (3, 7) else []),)
+
+def import_gflex():
+    root = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..')
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([root, env.get('PYTHONPATH', '')])
+    out = subprocess.check_output([sys.executable, '-c', script], env=env)
+    seconds, loaded = (out.decode().split('\n') + [''])[:2]
+    return float(seconds), loaded.split()
+
+def test_main():
+    seconds, loaded = import_gflex()
+    assert loaded == [], "Loaded at import: " + ', '.join(loaded)
+
+if __name__ == '__main__':
+    seconds, loaded = import_gflex()
+    print("import gflex: %.3f s" % seconds)
+    print("Heavy modules loaded:", ', '.join(loaded) or 'none')
+    test_main()
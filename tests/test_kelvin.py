@@ -0,0 +1,21 @@
+#! /usr/bin/env python
+
+import gflex
+from gflex.kelvin import kei
+import numpy as np
+from scipy import special
+
+def test_main():
+    # Across the table, the series near 0, and the asymptotic tail
+    x = np.concatenate(([0., 1E-12, 1., 40.], np.linspace(0, 60, 600001)))
+    envelope = np.minimum(np.pi/4, np.sqrt(np.pi/(2*np.maximum(x, 1E-12))) \
+                                   * np.exp(-x/np.sqrt(2)))
+    assert np.all(np.abs(kei(x) - special.kei(x)) < 2E-9*envelope)
+    # Undefined for negative x, as in scipy
+    x = np.array([-1E-12, -1., -100., np.nan, -0.])
+    assert np.array_equal(np.isnan(kei(x)), np.isnan(special.kei(x)))
+    # Shape is kept
+    assert kei(np.ones((3, 4))).shape == (3, 4)
+
+if __name__ == '__main__':
+    test_main()
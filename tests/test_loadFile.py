@@ -0,0 +1,69 @@
+#! /usr/bin/env python
+
+import gflex
+import numpy as np
+import os
+import shutil
+import tempfile
+
+def solve(Te, qs):
+    flex = gflex.F2D()
+    flex.Quiet = True
+    flex.Method = 'FD'
+    flex.PlateSolutionType = 'vWC1994'
+    flex.Solver = 'direct'
+    flex.g = 9.8
+    flex.E = 65E9
+    flex.nu = 0.25
+    flex.rho_m = 3300.
+    flex.rho_fill = 0.
+    flex.Te = Te # array or path
+    flex.q0 = qs # array or path
+    flex.dx = 5000.
+    flex.dy = 4000.
+    flex.BC_W = '0Displacement0Slope'
+    flex.BC_E = '0Moment0Shear'
+    flex.BC_N = 'Periodic'
+    flex.BC_S = 'Periodic'
+    flex.initialize()
+    flex.run()
+    return flex
+
+def test_main():
+    path = tempfile.mkdtemp()
+    try:
+        Te = 20000. + 5000.*np.random.RandomState(8).rand(30, 40)
+        qs = np.zeros(Te.shape)
+        qs[10:20, 15:25] = 1E7
+        np.save(os.path.join(path, 'Te.npy'), Te)
+        np.savetxt(os.path.join(path, 'Te.txt'), Te)
+        np.save(os.path.join(path, 'qs.npy'), qs)
+
+        flex = gflex.F2D()
+        flex.Verbose = False
+        flex.inpath = path + '/'
+        # Binary: memory-mapped, read-only, found relative to the 
+        # configuration file's directory
+        out = flex.loadFile('Te.npy')
+        assert isinstance(out, np.memmap)
+        assert not out.flags.writeable
+        assert np.all(out == Te)
+        # ASCII
+        out = flex.loadFile(os.path.join(path, 'Te.txt'))
+        assert np.abs(out - Te).max() < 1E-9
+        # Missing
+        assert flex.loadFile('missing.npy', close_on_fail=False) is None
+
+        # The solution takes memory-mapped grids as they are: read-only, and
+        # without copies
+        flex = solve(os.path.join(path, 'Te.npy'), os.path.join(path, 'qs.npy'))
+        assert isinstance(flex.Te, np.memmap)
+        assert isinstance(flex.qs, np.memmap)
+        assert np.all(flex.w == solve(Te, qs).w)
+        flex.finalize()
+        del flex
+    finally:
+        shutil.rmtree(path)
+
+if __name__ == '__main__':
+    test_main()
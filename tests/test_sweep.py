@@ -0,0 +1,171 @@
+#! /usr/bin/env python
+
+import gflex
+import numpy as np
+import os
+import shutil
+import tempfile
+
+config = """
+[mode]
+dimension=2
+method=FD
+PlateSolutionType=vWC1994
+
+[parameter]
+YoungsModulus=6.5E10
+PoissonsRatio=0.25
+GravAccel=9.8
+MantleDensity=3300
+InfillMaterialDensity=0
+
+[input]
+Loads=loads.txt
+ElasticThickness=25000
+
+[output]
+DeflectionOut=
+Plot=
+
+[numerical]
+GridSpacing_x=5000
+BoundaryCondition_West=0Moment0Shear
+BoundaryCondition_East=0Displacement0Slope
+Solver=direct
+ConvergenceTolerance=1E-3
+
+[numerical2D]
+GridSpacing_y=4000
+BoundaryCondition_North=Mirror
+BoundaryCondition_South=0Slope0Shear
+
+[verbosity]
+Verbose=false
+Debug=false
+Quiet=true
+"""
+
+def load(rng):
+    qs = np.zeros((30, 40))
+    qs[10:20, 15:25] = 1E7 * rng.uniform(0.5, 1.5)
+    return qs
+
+def solve(Te, rho_fill, qs):
+    flex = gflex.F2D()
+    flex.Quiet = True
+    flex.Method = 'FD'
+    flex.PlateSolutionType = 'vWC1994'
+    flex.Solver = 'direct'
+    flex.g = 9.8
+    flex.E = 6.5E10
+    flex.nu = 0.25
+    flex.rho_m = 3300.
+    flex.rho_fill = rho_fill
+    flex.Te = Te
+    flex.qs = qs
+    flex.dx = 5000.
+    flex.dy = 4000.
+    flex.BC_W = '0Moment0Shear'
+    flex.BC_E = '0Displacement0Slope'
+    flex.BC_N = 'Mirror'
+    flex.BC_S = '0Slope0Shear'
+    flex.initialize()
+    flex.run()
+    flex.finalize()
+    return flex.w
+
+def test_main():
+    path = tempfile.mkdtemp()
+    try:
+        filename = os.path.join(path, 'input')
+        with open(filename, 'w') as f:
+            f.write(config)
+        np.savetxt(os.path.join(path, 'loads.txt'), np.zeros((30, 40)))
+        output = os.path.join(path, 'w.npy')
+        grid = {'Te': [20000., 30000.], 'rho_fill': [0., 1000.]}
+        sweep = gflex.Sweep(filename, grid=grid, samplers={'qs': load}, nsamples=2)
+        # Runs that differ only in their loads share a plate
+        assert sweep.groups() == [[0, 1], [2, 3], [4, 5], [6, 7]]
+        w = sweep.run(output)
+        assert w.shape == (8, 30, 40)
+        for i in range(8):
+            p = sweep.parameters(i)
+            assert np.abs(w[i] - solve(p['Te'], p['rho_fill'], p['qs'])).max() < 1E-12
+        # Resume: only the run that is not flagged as done is repeated
+        expected = np.array(w)
+        del w
+        flags = np.load(os.path.join(path, 'w.done.npy'), mmap_mode='r+')
+        flags[5] = False
+        flags.flush()
+        del flags
+        assert sweep.run_group(range(8), output) == 1
+        assert np.all(np.load(output) == expected)
+        # The same, divided among processes
+        sweep = gflex.Sweep(filename, grid=grid, samplers={'qs': load}, nsamples=2,
+                            n_workers=2)
+        w = sweep.run(os.path.join(path, 'w2.npy'))
+        assert np.all(w == expected)
+        del w
+    finally:
+        shutil.rmtree(path)
+
+def test_loads():
+    # Each run's loads replace those of the run before it
+    path = tempfile.mkdtemp()
+    try:
+        filename = os.path.join(path, 'input')
+        with open(filename, 'w') as f:
+            f.write(config)
+        np.savetxt(os.path.join(path, 'loads.txt'), np.zeros((30, 40)))
+        loads = []
+        for k in range(2):
+            qs = np.zeros((30, 40))
+            qs[5+10*k:10+10*k, 5+20*k:15+20*k] = 1E7
+            loads.append(qs)
+            np.savetxt(os.path.join(path, 'q'+str(k)+'.txt'), qs)
+        for q0 in [loads, [os.path.join(path, 'q0.txt'), os.path.join(path, 'q1.txt')]]:
+            sweep = gflex.Sweep(filename, grid={'q0': q0, 'Te': [20000., 30000.]})
+            assert sweep.groups() == [[0, 1], [2, 3]]
+            output = os.path.join(path, 'w.npy')
+            w = sweep.run(output)
+            for i in range(4):
+                p = sweep.parameters(i)
+                assert np.abs(w[i] - solve(p['Te'], 0., loads[i % 2])).max() < 1E-12
+            del w
+            os.remove(output)
+            os.remove(os.path.join(path, 'w.done.npy'))
+    finally:
+        shutil.rmtree(path)
+
+def test_FFT():
+    # Te set for each run replaces that of the configuration file
+    path = tempfile.mkdtemp()
+    try:
+        filename = os.path.join(path, 'input')
+        with open(filename, 'w') as f:
+            text = config.replace('method=FD', 'method=FFT')
+            for BC in ['0Moment0Shear', '0Displacement0Slope', 'Mirror', '0Slope0Shear']:
+                text = text.replace('='+BC, '=NoOutsideLoads')
+            f.write(text)
+        qs = np.zeros((30, 40))
+        qs[10:20, 15:25] = 1E7
+        np.savetxt(os.path.join(path, 'loads.txt'), qs)
+        sweep = gflex.Sweep(filename, grid={'Te': [20000., 60000.]})
+        w = sweep.run(os.path.join(path, 'w.npy'))
+        for i, Te in enumerate([20000., 60000.]):
+            flex = gflex.F2D(filename)
+            flex.Quiet = True
+            flex.initialize(filename)
+            flex.Te = Te
+            flex.run()
+            flex.finalize()
+            assert np.abs(w[i] - flex.w).max() < 1E-12
+        assert np.abs(w[0]).max() > 1.5 * np.abs(w[1]).max()
+        del w
+    finally:
+        shutil.rmtree(path)
+
+if __name__ == '__main__':
+    test_main()
+    test_loads()
+    test_FFT()
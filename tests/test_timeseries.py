@@ -0,0 +1,113 @@
+#! /usr/bin/env python
+
+import gflex
+import numpy as np
+import os
+import shutil
+import tempfile
+
+def model(Method='FD'):
+    flex = gflex.F2D()
+    flex.Quiet = True
+    flex.Method = Method
+    flex.PlateSolutionType = 'vWC1994'
+    flex.Solver = 'direct'
+    flex.g = 9.8
+    flex.E = 65E9
+    flex.nu = 0.25
+    flex.rho_m = 3300.
+    flex.rho_fill = 0.
+    flex.dx = 5000.
+    flex.dy = 4000.
+    flex.BC_W = '0Displacement0Slope'
+    flex.BC_E = '0Moment0Shear'
+    flex.BC_N = 'Periodic'
+    flex.BC_S = 'Periodic'
+    return flex
+
+def solve(Te, qs, Method='FD'):
+    flex = model(Method)
+    flex.Te = Te
+    flex.qs = qs
+    flex.initialize()
+    flex.run()
+    flex.finalize()
+    return flex.w
+
+def history(nframes, shape):
+    qs = np.zeros((nframes,) + shape)
+    for k in range(nframes):
+        qs[k, 5:15, 5+2*k:15+2*k] = 1E6 * (k+1)
+    return qs
+
+def test_main():
+    path = tempfile.mkdtemp()
+    try:
+        Te = 20000. + 5000.*np.random.RandomState(5).rand(24, 30)
+        qs = history(4, Te.shape)
+        np.save(os.path.join(path, 'qs.npy'), qs)
+        for k in range(len(qs)):
+            np.savetxt(os.path.join(path, 'qs_%d.txt' % k), qs[k])
+
+        # Memory-mapped frames, written to a .npy file, on one factorization
+        flex = model()
+        flex.Te = Te
+        flex.LoadHistory = os.path.join(path, 'qs.npy')
+        flex.DeflectionHistoryOut = os.path.join(path, 'w.npy')
+        flex.initialize()
+        factors = []
+        for k, w in enumerate(flex.run_series()):
+            assert np.abs(w - solve(Te, qs[k])).max() < 1E-9
+            factors.append(flex.coeff_factor)
+        assert all(factor is factors[0] for factor in factors)
+        w_out = np.load(os.path.join(path, 'w.npy'))
+        assert w_out.shape == qs.shape
+        assert np.all(w_out[-1] == flex.w)
+        flex.finalize()
+
+        # One file per frame, and a generator without prefetching, both into
+        # an array
+        for frames in [os.path.join(path, 'qs_*.txt'),
+                       (qs[k] for k in range(len(qs)))]:
+            flex = model()
+            flex.Te = Te
+            flex.qs = qs[0]
+            flex.initialize()
+            out = np.zeros(qs.shape)
+            for w in flex.run_series(frames, out=out, prefetch=False):
+                pass
+            assert np.abs(out - w_out).max() < 1E-9
+            flex.finalize()
+
+        # SAS: one kernel
+        flex = model('SAS')
+        flex.Te = 25000.
+        flex.qs = qs[0]
+        flex.initialize()
+        kernels = []
+        for k, w in enumerate(flex.run_series(qs)):
+            assert np.abs(w - solve(25000., qs[k], 'SAS')).max() < 1E-9
+            kernels.append(flex.sas_kernel)
+        assert all(kernel is kernels[0] for kernel in kernels)
+        flex.finalize()
+    finally:
+        shutil.rmtree(path)
+
+def test_prefetch():
+    frames = list(gflex.timeseries.prefetch(iter(np.ones((5, 3)) * np.arange(5)[:,None])))
+    assert [frame[0] for frame in frames] == [0, 1, 2, 3, 4]
+    # Errors in reading are raised where they happen
+    def broken():
+        yield np.zeros(3)
+        raise ValueError('unreadable frame')
+    frames = gflex.timeseries.prefetch(broken())
+    next(frames)
+    try:
+        next(frames)
+        assert False
+    except ValueError:
+        pass
+
+if __name__ == '__main__':
+    test_main()
+    test_prefetch()